@@ -0,0 +1,142 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from Apimatic.endpoint import Endpoint
+
+DEFAULT_CACHE_DIR = ".apimatic-cache"
+CACHE_FILE = "extract.json"
+
+# (size, mtime_ns) of a file, or None if it does not exist
+Fingerprint = Optional[Tuple[int, int]]
+
+
+def fingerprint(path: Path) -> Fingerprint:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class ExtractionCache:
+    """
+    Persistent per-file cache of extracted endpoints.
+
+    Entries are keyed by the file's root-relative path and validated against its
+    size, mtime and content hash, plus the fingerprints of any other files the
+    result was derived from (e.g. a Django urls.py depends on its views.py).
+    The whole cache is dropped when the parser version changes.
+    """
+
+    def __init__(self, root: Path, cache_dir: Path, parser_version: int) -> None:
+        self.root = root
+        self.cache_dir = cache_dir
+        self.parser_version = parser_version
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, Dict] = {}
+        self._dirty = False
+        self._load()
+
+    @property
+    def path(self) -> Path:
+        return self.cache_dir / CACHE_FILE
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("parser_version") == self.parser_version:
+            self._entries = data.get("entries", {})
+
+    def _key(self, path: Path) -> str:
+        return path.relative_to(self.root).as_posix()
+
+    def _deps_fresh(self, entry: Dict) -> bool:
+        for rel, fp in entry.get("deps", {}).items():
+            current = fingerprint(self.root / rel)
+            if (list(current) if current else None) != fp:
+                return False
+        return True
+
+    def lookup(self, path: Path, names: Iterable[str]) -> Optional[Dict[str, List[Endpoint]]]:
+        """
+        Returns the cached results of matchers `names` for `path`, or None.
+
+        A matching size and mtime is trusted without reading the file; otherwise
+        the content hash decides, which keeps `touch`ed or re-checked-out files
+        as hits.
+        """
+        entry = self._entries.get(self._key(path))
+        fp = fingerprint(path)
+        results = entry.get("results", {}) if entry else {}
+        if (entry is None or fp is None or entry["size"] != fp[0]
+                or any(n not in results for n in names) or not self._deps_fresh(entry)):
+            self.misses += 1
+            return None
+
+        if entry["mtime_ns"] != fp[1]:
+            try:
+                data = path.read_bytes()
+            except OSError:
+                self.misses += 1
+                return None
+            if content_hash(data) != entry["sha256"]:
+                self.misses += 1
+                return None
+            entry["size"], entry["mtime_ns"] = fp
+            self._dirty = True
+
+        self.hits += 1
+        return {n: [Endpoint.from_record(r, self.root) for r in results[n]] for n in names}
+
+    def store(self, path: Path, digest: str, results: Dict[str, List[Endpoint]], deps: Iterable[Path] = ()) -> None:
+        """Records `results` for `path`, whose content hashed to `digest` when it was read."""
+        fp = fingerprint(path)
+        if fp is None:
+            return
+        key = self._key(path)
+        entry = self._entries.get(key)
+        if not entry or entry.get("sha256") != digest:
+            entry = {"results": {}, "deps": {}}
+        entry.update(size=fp[0], mtime_ns=fp[1], sha256=digest)
+        for name, endpoints in results.items():
+            entry["results"][name] = [ep.to_record(self.root) for ep in endpoints]
+        for dep in deps:
+            dep_fp = fingerprint(dep)
+            entry["deps"][self._key(dep)] = list(dep_fp) if dep_fp else None
+        self._entries[key] = entry
+        self._dirty = True
+
+    def save(self) -> None:
+        """Writes the cache atomically, dropping entries for deleted files."""
+        if not self._dirty:
+            return
+        entries = {k: v for k, v in self._entries.items() if (self.root / k).exists()}
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(
+            json.dumps({"parser_version": self.parser_version, "entries": entries}),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = (100.0 * self.hits / total) if total else 0.0
+        return f"Cache: {self.hits}/{total} files reused ({rate:.1f}% hit rate)"
+
+
+def clear_cache(cache_dir: Path) -> None:
+    shutil.rmtree(cache_dir, ignore_errors=True)
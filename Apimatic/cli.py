@@ -1,96 +1,269 @@
 from __future__ import annotations
 import argparse
+import os
 import sys
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 
+from Apimatic.cache import DEFAULT_CACHE_DIR, ExtractionCache, clear_cache
 from Apimatic.detect import autodetect_frameworks
-from Apimatic.parsers import get_parser
+from Apimatic.endpoint import has_static_details
+from Apimatic.parsers import get_parser, scan_python_routes
 from Apimatic.generator import generate_markdown
-from Apimatic.usedAllAI.ollama import enhance_with_ollama
-from Apimatic.usedAllAI.openAI import enhance_with_openai, update_api_key as update_openai_key
-from Apimatic.usedAllAI.googleGemini import enhance_with_gemini, update_api_key as update_gemini_key
-from Apimatic.usedAllAI.groq import enhance_with_groq, update_api_key as update_groq_key
+from Apimatic.profiling import DEFAULT_TOP_FILES, Profiler
+from Apimatic.registry import ENHANCERS, KEY_UPDATERS
+from Apimatic.scanner import PARSER_VERSION, ScanContext, default_jobs
 
 def handle_generation(args: argparse.Namespace) -> None:
-    """Handles the 'generate' command."""
+    """Handles the 'generate' command, profiling it if asked to."""
+    profiler = Profiler(enabled=bool(args.profile or args.profile_trace or args.profile_pstats))
+    stats_profile = None
+    if args.profile_pstats:
+        import cProfile
+        stats_profile = cProfile.Profile()
+        stats_profile.enable()
+    try:
+        with profiler.phase("total"):
+            generate(args, profiler)
+    finally:
+        if stats_profile is not None:
+            stats_profile.disable()
+            stats_profile.dump_stats(args.profile_pstats)
+            print(f"[INFO] Wrote cProfile stats: {args.profile_pstats} (view with python -m pstats)")
+        if profiler.enabled:
+            print("[PROFILE]")
+            print(profiler.report(args.profile_top))
+        if args.profile_trace:
+            profiler.write_trace(Path(args.profile_trace))
+            print(f"[INFO] Wrote Chrome trace: {args.profile_trace} (open in chrome://tracing or ui.perfetto.dev)")
+
+def ollama_hosts(args: argparse.Namespace) -> Optional[List[str]]:
+    return [h.strip() for h in args.ollama_hosts.split(",") if h.strip()] if args.ollama_hosts else None
+
+def ai_provider_specs(args: argparse.Namespace) -> list:
+    """The AI providers selected on the command line, as forecast.ProviderSpec."""
+    from Apimatic.usedAllAI.forecast import ProviderSpec
+    from Apimatic.usedAllAI.ollama import ollama_concurrency
+    # Only the temperatures are read; no transport (or SDK) is created
+    from Apimatic.usedAllAI.transport import GeminiTransport, OllamaTransport, OpenAICompatibleTransport
+
+    specs = []
+    if args.use_ollama:
+        hosts = len(ollama_hosts(args) or [None])
+        specs.append(ProviderSpec("ollama", "Ollama", args.ollama_model, OllamaTransport.temperature,
+                                  ollama_concurrency(args.ollama_parallel, hosts, args.ai_concurrency)))
+    if args.use_openai:
+        specs.append(ProviderSpec("openai", "OpenAI", args.openai_model, OpenAICompatibleTransport.temperature, args.ai_concurrency))
+    if args.use_google_gemini:
+        specs.append(ProviderSpec("gemini", "Gemini", args.google_gemini_model, GeminiTransport.temperature, args.ai_concurrency))
+    if args.use_groq:
+        specs.append(ProviderSpec("groq", "Groq", args.groq_model, OpenAICompatibleTransport.temperature, args.ai_concurrency))
+    if args.use_openai_compatible:
+        specs.append(ProviderSpec("openai-compatible", "OpenAI-compatible server", args.openai_compatible_model or "?",
+                                  OpenAICompatibleTransport.temperature, args.ai_concurrency))
+    return specs
+
+def generate(args: argparse.Namespace, profiler: Profiler) -> None:
     src = Path(args.src).resolve()
     if not src.exists():
         print(f"[ERROR] Source path not found: {src}")
         sys.exit(2)
 
-    frameworks: List[str] = args.framework or autodetect_frameworks(src)
+    if args.framework:
+        frameworks: List[str] = args.framework
+    else:
+        with profiler.phase("detect frameworks"):
+            frameworks = autodetect_frameworks(src)
     if not frameworks:
         print("[WARNING] No framework detected. You can force one with --framework <name>.")
         sys.exit(1)
 
     print(f"[INFO] Framework(s): {', '.join(frameworks)}")
 
+    cache_dir = Path(args.cache_dir) if args.cache_dir else src / DEFAULT_CACHE_DIR
+    if args.clear_cache:
+        clear_cache(cache_dir)
+        print(f"[INFO] Cleared caches: {cache_dir}")
+    cache = None if args.no_cache else ExtractionCache(src, cache_dir, PARSER_VERSION)
+    ctx = ScanContext(cache=cache, jobs=args.jobs, exclude=args.exclude, profiler=profiler)
+
+    # Python frameworks share one read + parse of every file
+    with profiler.phase("scan python") as phase:
+        scanned = scan_python_routes(src, frameworks, ctx)
+        if phase is not None:
+            phase.counts.update(endpoints=sum(len(found) for found in scanned.values()))
+
     endpoints: List[Dict] = []
     for fw in frameworks:
         parser_fn = get_parser(fw)
         if not parser_fn:
             print(f"[WARNING] Parser not available for: {fw}")
             continue
-        found = parser_fn(src)
+        if fw.lower() in scanned:
+            found = scanned[fw.lower()]
+        else:
+            with profiler.phase(f"parse {fw}") as phase:
+                found = parser_fn(src, ctx)
+                if phase is not None:
+                    phase.counts.update(endpoints=len(found))
+        profiler.count_framework(fw, found)
         if found:
             print(f"* {fw}: {len(found)} endpoints")
             endpoints.extend(found)
 
+    if cache is not None:
+        with profiler.phase("save cache"):
+            try:
+                cache.save()
+            except OSError as e:
+                print(f"[WARNING] Could not write extraction cache: {e}")
+        print(f"[INFO] {cache.summary()}")
+    print(f"[INFO] {ctx.stats.summary()}")
+
     if not endpoints:
         print("[WARNING] No endpoints found.")
         sys.exit(0)
 
-    # LLM enhancements
+    documented = sum(1 for ep in endpoints if has_static_details(ep))
+    print(f"[INFO] Query params and request bodies extracted statically for {documented} of {len(endpoints)} endpoints")
+
+    if args.dry_run:
+        specs = ai_provider_specs(args)
+        if not specs:
+            from Apimatic.usedAllAI.engine import RequestPlan
+            planned = [ep for ep in endpoints if not (args.static_only and has_static_details(ep))]
+            print(f"[DRY RUN] AI enhancement would send {RequestPlan(planned).summary()}")
+            print("[DRY RUN] Add --use-<provider> options to forecast their tokens, cost and time.")
+        else:
+            from Apimatic.usedAllAI.forecast import forecast, format_duration
+            from Apimatic.usedAllAI.response_cache import AI_CACHE_FILE, ResponseCache
+            from Apimatic.usedAllAI.scheduler import Limits
+            # An existing cache is only read; a dry run does not create one
+            ai_cache = None
+            if not args.no_ai_cache and (cache_dir / AI_CACHE_FILE).exists():
+                ai_cache = ResponseCache(cache_dir / AI_CACHE_FILE)
+            print("[DRY RUN] Forecast of the AI enhancement (token counts approximated locally, speeds assumed):")
+            forecasts = [
+                forecast(endpoints, spec, ai_cache, args.ai_batch_size, args.ai_batch_tokens,
+                         Limits(args.ai_rpm, args.ai_tpm, args.ai_max_retries), args.static_only,
+                         tuple(args.ai_price) if args.ai_price else None)
+                for spec in specs
+            ]
+            if ai_cache is not None:
+                ai_cache.close()
+            for f in forecasts:
+                print(f"  {f.summary()}")
+            if len(forecasts) > 1:
+                costs = [f.cost for f in forecasts]
+                cost = f"~${sum(costs):.2f}" if all(c is not None for c in costs) else "cost partly unknown"
+                print(f"  Total: {sum(f.requests for f in forecasts)} requests, {cost}, "
+                      f"~{format_duration(sum(f.seconds for f in forecasts))} (providers run one after another)")
+        print("[DRY RUN] No requests sent and no documentation written.")
+        return
+
+    # LLM enhancements; each provider module (and its SDK) is imported only when selected
+    ai_cache = None
+    telemetry = None
+    ai_options = {}
+    if args.use_ollama or args.use_openai or args.use_google_gemini or args.use_groq or args.use_openai_compatible:
+        from Apimatic.usedAllAI.response_cache import AI_CACHE_FILE, ResponseCache
+        from Apimatic.usedAllAI.scheduler import Limits
+        from Apimatic.usedAllAI.telemetry import Telemetry
+        telemetry = Telemetry(price=tuple(args.ai_price) if args.ai_price else None)
+        if not args.no_ai_cache:
+            ai_cache = ResponseCache(cache_dir / AI_CACHE_FILE, max_bytes=int(args.ai_cache_size * 2**20))
+        ai_options = dict(
+            concurrency=args.ai_concurrency, cache=ai_cache,
+            batch_size=args.ai_batch_size, batch_tokens=args.ai_batch_tokens,
+            limits=Limits(args.ai_rpm, args.ai_tpm, args.ai_max_retries), static_only=args.static_only,
+            telemetry=telemetry,
+        )
+
     if args.use_ollama:
-        try:
-            endpoints = enhance_with_ollama(endpoints, model=args.ollama_model)
-        except Exception as e:
-            print(f"[WARNING] Ollama enhancement failed: {e}")
-            print("   Guidance: Ensure Ollama is running and the specified model is installed.")
+        with profiler.phase("enhance ollama"):
+            try:
+                endpoints = ENHANCERS["ollama"](
+                    endpoints, model=args.ollama_model, host=args.ollama_host, keep_alive=args.ollama_keep_alive,
+                    num_ctx=args.ollama_num_ctx, stream=args.ollama_stream, parallel=args.ollama_parallel,
+                    hosts=ollama_hosts(args),
+                    **ai_options,
+                )
+            except Exception as e:
+                print(f"[WARNING] Ollama enhancement failed: {e}")
+                print("   Guidance: Ensure Ollama is running and the specified model is installed.")
 
     if args.use_openai:
-        try:
-            endpoints = enhance_with_openai(endpoints, model=args.openai_model)
-        except Exception as e:
-            print(f"[WARNING] OpenAI enhancement failed: {e}")
-            print("   Guidance: Check your internet connection and API key.")
-            print("   You can set your key with: apimatic config --set-openai-key YOUR_KEY")
+        with profiler.phase("enhance openai"):
+            try:
+                endpoints = ENHANCERS["openai"](endpoints, model=args.openai_model, **ai_options)
+            except Exception as e:
+                print(f"[WARNING] OpenAI enhancement failed: {e}")
+                print("   Guidance: Check your internet connection and API key.")
+                print("   You can set your key with: apimatic config --set-openai-key YOUR_KEY")
 
     if args.use_google_gemini:
-        try:
-            endpoints = enhance_with_gemini(endpoints, model_name=args.google_gemini_model)
-        except Exception as e:
-            print(f"[WARNING] Google Gemini enhancement failed: {e}")
-            print("   Guidance: Check your internet connection and API key.")
-            print("   You can set your key with: apimatic config --set-gemini-key YOUR_KEY")
+        with profiler.phase("enhance gemini"):
+            try:
+                endpoints = ENHANCERS["gemini"](endpoints, model_name=args.google_gemini_model, **ai_options)
+            except Exception as e:
+                print(f"[WARNING] Google Gemini enhancement failed: {e}")
+                print("   Guidance: Check your internet connection and API key.")
+                print("   You can set your key with: apimatic config --set-gemini-key YOUR_KEY")
 
     if args.use_groq:
-        try:
-            endpoints = enhance_with_groq(endpoints, model=args.groq_model)
-        except Exception as e:
-            print(f"[WARNING] Groq enhancement failed: {e}")
-            print("   Guidance: Check your internet connection and API key.")
-            print("   You can set your key with: apimatic config --set-groq-key YOUR_KEY")
+        with profiler.phase("enhance groq"):
+            try:
+                endpoints = ENHANCERS["groq"](endpoints, model=args.groq_model, **ai_options)
+            except Exception as e:
+                print(f"[WARNING] Groq enhancement failed: {e}")
+                print("   Guidance: Check your internet connection and API key.")
+                print("   You can set your key with: apimatic config --set-groq-key YOUR_KEY")
+
+    if args.use_openai_compatible:
+        with profiler.phase("enhance openai-compatible"):
+            try:
+                if not args.openai_compatible_model:
+                    raise ValueError("--openai-compatible-model is required")
+                endpoints = ENHANCERS["openai-compatible"](
+                    endpoints, base_url=args.openai_compatible_url, model=args.openai_compatible_model,
+                    api_key=os.environ.get("OPENAI_COMPATIBLE_API_KEY"), **ai_options,
+                )
+            except Exception as e:
+                print(f"[WARNING] OpenAI-compatible enhancement failed: {e}")
+                print("   Guidance: Check that the server is running at --openai-compatible-url and serves the model.")
+
+    if ai_cache is not None:
+        ai_cache.close()
+        print(f"[INFO] {ai_cache.summary()}")
+    if telemetry is not None:
+        print(f"[INFO] AI usage: {telemetry.total()}")
+        for path, write in ((args.ai_metrics_json, telemetry.write_json), (args.ai_metrics_prom, telemetry.write_prometheus)):
+            if path:
+                try:
+                    write(Path(path))
+                    print(f"[INFO] Wrote AI metrics: {path}")
+                except OSError as e:
+                    print(f"[WARNING] Could not write AI metrics to {path}: {e}")
 
     # Output generation
     if args.format == "markdown":
-        try:
-            content = generate_markdown(endpoints)
-            out = Path(args.output or src / "API_Docs.md")
-            out.write_text(content, encoding="utf-8")
-            print(f"[SUCCESS] Wrote Markdown: {out}")
-        except Exception as e:
-            print(f"[WARNING] Markdown generation failed: {e}")
+        with profiler.phase("write markdown"):
+            try:
+                content = generate_markdown(endpoints)
+                out = Path(args.output or src / "API_Docs.md")
+                out.write_text(content, encoding="utf-8")
+                print(f"[SUCCESS] Wrote Markdown: {out}")
+            except Exception as e:
+                print(f"[WARNING] Markdown generation failed: {e}")
 
 def handle_config(args: argparse.Namespace) -> None:
     """Handles the 'config' command."""
     if args.set_openai_key:
-        update_openai_key(args.set_openai_key)
+        KEY_UPDATERS["openai"](args.set_openai_key)
     elif args.set_gemini_key:
-        update_gemini_key(args.set_gemini_key)
+        KEY_UPDATERS["gemini"](args.set_gemini_key)
     elif args.set_groq_key:
-        update_groq_key(args.set_groq_key)
+        KEY_UPDATERS["groq"](args.set_groq_key)
     else:
         print("Please specify which key to set, e.g., --set-openai-key")
         sys.exit(1)
@@ -108,14 +281,45 @@ def main() -> None:
     gen_p.add_argument("--framework", nargs="*", default=None, help="Force a specific framework.")
     gen_p.add_argument("--format", choices=["markdown"], default="markdown", help="Output format.")
     gen_p.add_argument("--output", default=None, help="Full path for the output file.")
+    gen_p.add_argument("--exclude", nargs="*", default=[], metavar="GLOB", help="Skip files and directories matching these globs.")
+    gen_p.add_argument("--jobs", "-j", type=int, default=default_jobs(), help="Worker processes for parsing (Default: CPU count; 1 parses serially).")
+    gen_p.add_argument("--no-cache", action="store_true", help="Re-extract every file, ignoring the extraction cache.")
+    gen_p.add_argument("--clear-cache", action="store_true", help="Delete the extraction and AI response caches before scanning.")
+    gen_p.add_argument("--cache-dir", default=None, help=f"Directory of the extraction and AI response caches (Default: <src>/{DEFAULT_CACHE_DIR}).")
+    gen_p.add_argument("--profile", action="store_true", help="Print the wall and CPU time of each phase, counts per framework and the slowest files to parse.")
+    gen_p.add_argument("--profile-top", type=int, default=DEFAULT_TOP_FILES, metavar="N", help=f"Slowest files listed by --profile (Default: {DEFAULT_TOP_FILES}).")
+    gen_p.add_argument("--profile-pstats", default=None, metavar="FILE", help="Also run under cProfile and write its stats to FILE; parsing workers are not included, use --jobs 1 to profile parsing.")
+    gen_p.add_argument("--profile-trace", default=None, metavar="FILE", help="Also write the phases and per-file parse times as a Chrome trace-event JSON file.")
+    gen_p.add_argument("--dry-run", action="store_true", help="Scan and report the AI requests a run would send, without sending them or writing output; with --use-<provider> options, forecast their tokens, cost and time.")
+    gen_p.add_argument("--static-only", action="store_true", help="Do not send endpoints whose query params and request body were extracted from the source to the AI provider.")
+    gen_p.add_argument("--ai-concurrency", type=int, default=4, metavar="N", help="Requests sent to the AI provider at once (Default: 4).")
+    gen_p.add_argument("--ai-batch-size", type=int, default=1, metavar="N", help="Endpoints analyzed per AI request; above 1 the system prompt is sent once per batch (Default: 1).")
+    gen_p.add_argument("--ai-batch-tokens", type=int, default=6000, metavar="N", help="Approximate source tokens per batched AI request (Default: 6000).")
+    gen_p.add_argument("--ai-rpm", type=float, default=None, metavar="N", help="Requests per minute allowed per AI provider and model (Default: unlimited).")
+    gen_p.add_argument("--ai-tpm", type=float, default=None, metavar="N", help="Estimated tokens per minute allowed per AI provider and model (Default: unlimited).")
+    gen_p.add_argument("--ai-max-retries", type=int, default=5, metavar="N", help="Retries of a throttled or transiently failing AI request (Default: 5).")
+    gen_p.add_argument("--no-ai-cache", action="store_true", help="Send every endpoint to the AI provider, ignoring cached responses.")
+    gen_p.add_argument("--ai-cache-size", type=float, default=256, metavar="MB", help="Size limit of the AI response cache; least recently used responses are evicted (Default: 256).")
+    gen_p.add_argument("--ai-metrics-json", default=None, metavar="FILE", help="Write per-provider AI metrics (latency, time to first byte, tokens, retries, outcomes, cost, cache hits) and every request to FILE as JSON.")
+    gen_p.add_argument("--ai-metrics-prom", default=None, metavar="FILE", help="Write the AI metrics in Prometheus text format to FILE, e.g. for node_exporter's textfile collector.")
+    gen_p.add_argument("--ai-price", type=float, nargs=2, default=None, metavar=("PROMPT", "COMPLETION"), help="USD per million prompt and completion tokens, for models without a built-in price.")
     gen_p.add_argument("--use-ollama", action="store_true", help="Enhance with Ollama.")
     gen_p.add_argument("--ollama-model", default="phi3:mini", help="Ollama model to use.")
+    gen_p.add_argument("--ollama-host", default=None, help="Ollama server, e.g. http://gpu-box:11434 (Default: $OLLAMA_HOST or http://localhost:11434).")
+    gen_p.add_argument("--ollama-hosts", default=None, metavar="HOST,HOST,...", help="Several Ollama servers serving the model; requests go to the least busy healthy one.")
+    gen_p.add_argument("--ollama-keep-alive", default="30m", help="How long Ollama keeps the model loaded after each request, e.g. 30m, or -1 for always (Default: 30m).")
+    gen_p.add_argument("--ollama-num-ctx", type=int, default=None, metavar="N", help="Context window for the Ollama model; raise it for batched prompts (Default: the model's).")
+    gen_p.add_argument("--ollama-parallel", type=int, default=None, metavar="N", help="Requests sent to each Ollama server at once (Default: $OLLAMA_NUM_PARALLEL or --ai-concurrency).")
+    gen_p.add_argument("--ollama-stream", action="store_true", help="Stream Ollama responses and report the time to first token.")
     gen_p.add_argument("--use-openai", action="store_true", help="Enhance with OpenAI.")
     gen_p.add_argument("--openai-model", default="gpt-4o-mini", help="OpenAI model to use.")
     gen_p.add_argument("--use-google-gemini", action="store_true", help="Enhance with Google Gemini.")
     gen_p.add_argument("--google-gemini-model", default="gemini-1.5-flash", help="Google Gemini model.")
     gen_p.add_argument("--use-groq", action="store_true", help="Enhance with Groq.")
     gen_p.add_argument("--groq-model", default="llama3-8b-8192", help="Groq model to use.")
+    gen_p.add_argument("--use-openai-compatible", action="store_true", help="Enhance with an OpenAI-compatible server such as vLLM or llama.cpp.")
+    gen_p.add_argument("--openai-compatible-url", default="http://localhost:8000/v1", help="Base URL of the OpenAI-compatible API (Default: http://localhost:8000/v1).")
+    gen_p.add_argument("--openai-compatible-model", default=None, help="Model name served by the OpenAI-compatible server.")
     gen_p.set_defaults(func=handle_generation)
 
     # 'config' command
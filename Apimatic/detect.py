@@ -2,7 +2,6 @@ from __future__ import annotations
 from pathlib import Path
 from typing import List, Dict, Tuple
 import json
-import tomllib
 import functools
 
 # =======================
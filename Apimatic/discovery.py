@@ -0,0 +1,130 @@
+from __future__ import annotations
+import fnmatch
+import os
+import subprocess
+from pathlib import Path
+from typing import List, Tuple
+
+# Directories never worth scanning for routes: VCS metadata, dependencies,
+# virtualenvs, build output and tool caches.
+PRUNED_DIRS = frozenset({
+    ".git", ".hg", ".svn",
+    "node_modules", "bower_components",
+    ".venv", "venv", "env", "site-packages",
+    "dist", "build", "__pycache__",
+    ".tox", ".nox", ".mypy_cache", ".pytest_cache", ".ruff_cache",
+    ".apimatic-cache",
+})
+
+
+class _IgnoreRules:
+    """A small .gitignore matcher: globs, `/` anchoring, trailing-`/` directory rules and `!` negation."""
+
+    def __init__(self) -> None:
+        # (base dir relative to root, pattern, negated, directories only, anchored)
+        self._rules: List[Tuple[str, str, bool, bool, bool]] = []
+
+    def load(self, base: str, gitignore: Path) -> None:
+        try:
+            lines = gitignore.read_text(encoding="utf-8", errors="ignore").splitlines()
+        except OSError:
+            return
+        for line in lines:
+            line = line.rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            if negated:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.strip("/") if dir_only else line
+            anchored = "/" in line
+            self._rules.append((base, line.lstrip("/"), negated, dir_only, anchored))
+
+    def ignored(self, rel: str, is_dir: bool) -> bool:
+        result = False
+        for base, pattern, negated, dir_only, anchored in self._rules:
+            if dir_only and not is_dir:
+                continue
+            if base:
+                if not rel.startswith(base + "/"):
+                    continue
+                sub = rel[len(base) + 1:]
+            else:
+                sub = rel
+            target = sub if anchored else sub.rsplit("/", 1)[-1]
+            if fnmatch.fnmatchcase(target, pattern):
+                result = not negated
+        return result
+
+
+def _excluded(rel: str, exclude: Tuple[str, ...]) -> bool:
+    """True if an `--exclude` glob matches the path, one of its parent directories, or any path component."""
+    if not exclude:
+        return False
+    parts = rel.split("/")
+    prefixes = ["/".join(parts[:i]) for i in range(1, len(parts) + 1)]
+    return any(
+        fnmatch.fnmatchcase(candidate, pat)
+        for pat in exclude
+        for candidate in (*prefixes, *parts)
+    )
+
+
+def _git_files(root: Path) -> List[str]:
+    """Tracked and untracked-but-not-ignored files, or raises if `root` is not in a git work tree."""
+    cmd = ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"]
+    result = subprocess.run(cmd, cwd=root, capture_output=True)
+    if result.returncode != 0:
+        raise OSError(result.stderr.decode("utf-8", errors="ignore").strip())
+    # --cached lists a merge-conflicted file once per stage
+    return list(dict.fromkeys(p for p in result.stdout.decode("utf-8", errors="surrogateescape").split("\0") if p))
+
+
+def _walk_files(root: Path, exclude: Tuple[str, ...]) -> List[str]:
+    """An os.scandir walk that prunes PRUNED_DIRS, .gitignore'd and excluded paths as it descends."""
+    rules = _IgnoreRules()
+    found: List[str] = []
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        abs_dir = root / rel_dir if rel_dir else root
+        if (abs_dir / ".gitignore").is_file():
+            rules.load(rel_dir, abs_dir / ".gitignore")
+        try:
+            entries = sorted(os.scandir(abs_dir), key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir:
+                if entry.name in PRUNED_DIRS or rules.ignored(rel, True) or _excluded(rel, exclude):
+                    continue
+                subdirs.append(rel)
+            elif not rules.ignored(rel, False) and not _excluded(rel, exclude):
+                found.append(rel)
+        stack.extend(reversed(subdirs))
+    return found
+
+
+def discover_files(root: Path, exclude: Tuple[str, ...] = ()) -> Tuple[Path, ...]:
+    """
+    Lists the project's files. `ScanContext.files` keeps the listing for the
+    rest of a run, so every parser shares one listing.
+
+    Inside a git work tree this is a single `git ls-files` call, so .gitignore
+    rules apply exactly as git sees them. Otherwise the tree is walked with
+    os.scandir, skipping dependency/build directories and honouring .gitignore
+    files. `exclude` globs are matched against root-relative paths and names.
+    """
+    try:
+        rels = _git_files(root)
+        rels = [rel for rel in rels if not _excluded(rel, exclude)]
+    except OSError:
+        rels = _walk_files(root, exclude)
+    return tuple(root / rel for rel in rels)
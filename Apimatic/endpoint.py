@@ -0,0 +1,235 @@
+from __future__ import annotations
+import mmap
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from Apimatic.utils import decode_source
+
+# (absolute file path, start byte, end byte) of a handler's source in its file
+Span = Tuple[str, int, int]
+# A handler is either a span or literal text, e.g. an unresolved handler name
+Handler = Union[str, Span]
+
+# Files kept mapped by the shared reader; older ones are unmapped first
+MAX_OPEN_FILES = 64
+
+
+class SourceReader:
+    """
+    Reads handler spans straight out of source files through mmap.
+
+    Only the bytes of the requested span are copied and decoded; the most
+    recently used files stay mapped so spans of the same file are cheap.
+    Safe to use from several threads.
+    """
+
+    def __init__(self, max_open: int = MAX_OPEN_FILES) -> None:
+        self.max_open = max_open
+        self._maps: "OrderedDict[str, Optional[mmap.mmap]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _map(self, path: str) -> Optional[mmap.mmap]:
+        if path in self._maps:
+            self._maps.move_to_end(path)
+            return self._maps[path]
+        mapped = None
+        try:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Missing, unreadable or empty (which mmap refuses) files read as ""
+            mapped = None
+        self._maps[path] = mapped
+        while len(self._maps) > self.max_open:
+            _, old = self._maps.popitem(last=False)
+            if old is not None:
+                old.close()
+        return mapped
+
+    def read(self, span: Span) -> str:
+        path, start, end = span
+        with self._lock:
+            mapped = self._map(path)
+            data = mapped[start:end] if mapped is not None else b""
+        # Decoded like the whole file was when the span was measured
+        return decode_source(data)
+
+    def close(self) -> None:
+        with self._lock:
+            for mapped in self._maps.values():
+                if mapped is not None:
+                    mapped.close()
+            self._maps.clear()
+
+
+READER = SourceReader()
+
+
+def load_handler(handler: Handler) -> str:
+    return handler if isinstance(handler, str) else READER.read(handler)
+
+
+class Endpoint(MutableMapping):
+    """
+    One extracted endpoint, in as little memory as possible.
+
+    Handlers are kept as spans into their source files and only read when
+    `handlers` or `source` is accessed, so tens of thousands of endpoints do not
+    hold every handler's text, and the endpoints of a view's HTTP methods share
+    one tuple of spans. Framework, method and file strings are interned.
+
+    Endpoints behave like the plain dicts parsers used to return: `ep["source"]`,
+    `ep.get("handlers")` and `ep["ai_details"] = ...` all work, and other keys are
+    kept alongside.
+
+    `static_details` marks ai_details that a parser extracted from the source
+    itself, as opposed to ones an AI provider filled in earlier in the run.
+    """
+
+    __slots__ = ("framework", "file", "method", "path", "spans", "_summary", "ai_details", "static_details", "extra")
+
+    KEYS = ("framework", "file", "method", "path", "handlers", "source", "summary")
+
+    def __init__(
+        self, framework: str, file: str, method: str, path: str,
+        spans: Sequence[Handler], summary: Optional[str] = None,
+    ) -> None:
+        self.framework = sys.intern(framework)
+        self.file = sys.intern(file)
+        self.method = sys.intern(method)
+        # The endpoints of a view's methods share one path string
+        self.path = sys.intern(path) if isinstance(path, str) else path
+        self.spans: Tuple[Handler, ...] = tuple(spans)
+        # None while the summary is the default "METHOD /path", built on access
+        self._summary = summary
+        self.ai_details: Optional[Dict] = None
+        self.static_details = False
+        self.extra: Optional[Dict[str, Any]] = None
+
+    @property
+    def summary(self) -> str:
+        return self._summary if self._summary is not None else f"{self.method} {self.path}"
+
+    @summary.setter
+    def summary(self, value: str) -> None:
+        self._summary = value
+
+    @property
+    def handlers(self) -> List[str]:
+        return [load_handler(h) for h in self.spans]
+
+    @property
+    def source(self) -> str:
+        return "\n\n".join(self.handlers)
+
+    # ---- mapping interface ----
+    def __getitem__(self, key: str) -> Any:
+        if key in self.KEYS:
+            return getattr(self, key)
+        if key == "ai_details" and self.ai_details is not None:
+            return self.ai_details
+        if key == "static_details" and self.static_details:
+            return True
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key == "handlers":
+            self.spans = tuple(value)
+        elif key == "source":
+            # A replaced source stands in for all handlers
+            self.spans = (value,)
+        elif key == "ai_details":
+            self.ai_details = value
+        elif key == "static_details":
+            self.static_details = bool(value)
+        elif key in ("framework", "file", "method"):
+            setattr(self, key, sys.intern(value))
+        elif key in ("path", "summary"):
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key == "ai_details" and self.ai_details is not None:
+            self.ai_details = None
+        elif key == "static_details" and self.static_details:
+            self.static_details = False
+        elif self.extra and key in self.extra:
+            del self.extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.KEYS
+        if self.ai_details is not None:
+            yield "ai_details"
+        if self.static_details:
+            yield "static_details"
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return len(self.KEYS) + (self.ai_details is not None) + self.static_details + len(self.extra or ())
+
+    def __repr__(self) -> str:
+        return f"Endpoint({self.framework!r}, {self.method} {self.path!r}, {self.file!r})"
+
+    # ---- serialization (extraction cache and worker processes) ----
+    def to_record(self, root: Optional[Path] = None) -> Dict[str, Any]:
+        """A JSON-ready dict; span paths are stored relative to `root` when given."""
+        handlers: List[Any] = []
+        for h in self.spans:
+            if isinstance(h, str):
+                handlers.append(h)
+            else:
+                path = h[0]
+                if root is not None:
+                    try:
+                        path = Path(path).relative_to(root).as_posix()
+                    except ValueError:
+                        pass  # outside the project, e.g. a module imported from `../`
+                handlers.append([path, h[1], h[2]])
+        record: Dict[str, Any] = {
+            "framework": self.framework, "file": self.file, "method": self.method,
+            "path": self.path, "handlers": handlers, "summary": self._summary,
+        }
+        if self.ai_details is not None:
+            record["ai_details"] = self.ai_details
+        if self.static_details:
+            record["static_details"] = True
+        if self.extra:
+            record["extra"] = self.extra
+        return record
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any], root: Optional[Path] = None) -> "Endpoint":
+        spans: List[Handler] = []
+        paths: Dict[str, str] = {}
+        for h in record["handlers"]:
+            if isinstance(h, str):
+                spans.append(h)
+            else:
+                if h[0] not in paths:
+                    paths[h[0]] = sys.intern(str(root / h[0]) if root is not None else h[0])
+                spans.append((paths[h[0]], h[1], h[2]))
+        ep = cls(record["framework"], record["file"], record["method"], record["path"], spans, record.get("summary"))
+        ep.ai_details = record.get("ai_details")
+        ep.static_details = record.get("static_details", False)
+        ep.extra = record.get("extra")
+        return ep
+
+    def __reduce__(self):
+        return Endpoint.from_record, (self.to_record(),)
+
+
+def has_static_details(endpoint: Dict) -> bool:
+    """Whether a parser extracted the endpoint's query params and request body itself."""
+    return bool(endpoint.get("static_details"))
@@ -1,17 +1,69 @@
 from __future__ import annotations
-from typing import Callable, Dict
-from .flask import parse_flask_routes
-from .fastapi import parse_fastapi_routes
-from .django import parse_django_routes
-from .express import parse_express_routes
-
-PARSERS: Dict[str, Callable] = {
-    "flask": parse_flask_routes,
-    "fastapi": parse_fastapi_routes,
-    "django": parse_django_routes,
-    "express": parse_express_routes,
+import importlib
+from pathlib import Path
+from typing import Dict, List, Optional
+from Apimatic.endpoint import Endpoint
+from Apimatic.registry import LazyRegistry
+from Apimatic.scanner import ScanContext, scan_tree
+
+# Parser modules are imported the first time their framework is looked up
+PARSERS = LazyRegistry({
+    "flask": "Apimatic.parsers.flask:parse_flask_routes",
+    "fastapi": "Apimatic.parsers.fastapi:parse_fastapi_routes",
+    "django": "Apimatic.parsers.django:parse_django_routes",
+    "express": "Apimatic.parsers.express:parse_express_routes",
+})
+
+# Frameworks whose routes are found by the shared single-pass Python scanner
+PYTHON_MATCHERS = LazyRegistry({
+    "flask": "Apimatic.parsers.flask:FlaskMatcher",
+    "fastapi": "Apimatic.parsers.fastapi:FastAPIMatcher",
+    "django": "Apimatic.parsers.django:DjangoMatcher",
+})
+
+# Names re-exported from the parser modules, resolved on first access
+_EXPORTS = {
+    "parse_flask_routes": "flask", "FlaskMatcher": "flask",
+    "parse_fastapi_routes": "fastapi", "FastAPIMatcher": "fastapi",
+    "parse_django_routes": "django", "resolve_django_routes": "django", "DjangoMatcher": "django",
+    "UrlconfMatcher": "django",
+    "parse_express_routes": "express",
 }
 
 
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        module = importlib.import_module(f"{__name__}.{_EXPORTS[name]}")
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def get_parser(name: str):
     return PARSERS.get(name.lower())
+
+
+def scan_python_routes(
+    src: Path, frameworks: List[str], ctx: Optional[ScanContext] = None
+) -> Dict[str, List[Endpoint]]:
+    """
+    Scans the Python files under `src` once for all given frameworks.
+    Returns the endpoints keyed by framework name, identical to calling each
+    `parse_*_routes` function separately.
+    """
+    names = list(dict.fromkeys(fw.lower() for fw in frameworks if fw.lower() in PYTHON_MATCHERS))
+    if not names:
+        return {}
+    ctx = ctx or ScanContext()
+    matchers = []
+    for name in names:
+        if name == "django":
+            # A project with ROOT_URLCONF is resolved from it instead of urls.py by urls.py
+            from .django import django_matcher
+            matchers.append(django_matcher(src, ctx))
+        else:
+            matchers.append(PYTHON_MATCHERS[name]())
+    found = scan_tree(src, (".py",), matchers, ctx)
+    if "django" in names:
+        from .django import django_routes
+        found["django"] = django_routes(found)
+    return {name: found[name] for name in names}
@@ -2,79 +2,157 @@ from __future__ import annotations
 import ast
 import re
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 
-from Apimatic.utils import iter_files
+from Apimatic.endpoint import Endpoint, Handler
+from Apimatic.scanner import Matcher, ScanContext, SourceFile, scan_tree
+from Apimatic.utils import decode_source
+from .urlconf import ModuleIndex, find_root_urlconfs, is_settings_module, resolve_settings_urlconf, root_urlconf
 
 # This regex is slightly more robust to handle additional arguments in the path() function
 PATH_RE = re.compile(r"""\bpath\(\s*['"]([^'" ]+)['"],\s*([\w\.]+)(?:\.as_view\(\))?\s*.*\)""", re.VERBOSE)
 
-def get_source_from_views_file(views_file: Path, view_name: str) -> Optional[str]:
-    """Finds and returns the source code for a specific view function or class."""
-    if not views_file.exists():
-        return None
-    try:
-        text = views_file.read_text(encoding="utf-8", errors="ignore")
-        tree = ast.parse(text)
-        for node in ast.walk(tree):
-            # Check for both function and class definitions that match the view name
-            if isinstance(node, (ast.FunctionDef, ast.ClassDef)) and node.name == view_name:
-                return ast.get_source_segment(text, node)
-    except Exception:
-        # Silently fail on parsing errors for robust scanning
-        return None
-    return None
-
-def get_methods_from_class_source(source: str) -> List[str]:
-    """Inspects a class's source code to find HTTP methods (get, post, etc.)."""
+def get_methods_from_class_node(node: ast.AST) -> List[str]:
+    """HTTP methods (get, post, etc.) a view class defines, or ["ANY"] for a function or generic view."""
     methods = []
-    try:
-        tree = ast.parse(source)
-        # The ast.parse will wrap the code in a Module, so we check the first item in the body
-        class_node = tree.body[0]
-        if isinstance(class_node, ast.ClassDef):
-            for node in class_node.body:
-                if isinstance(node, ast.FunctionDef) and node.name.lower() in ["get", "post", "put", "patch", "delete"]:
-                    methods.append(node.name.upper())
-    except Exception:
-        pass
-    # If no specific methods are found, it's likely a generic view that handles all methods,
-    # or an error occurred.
+    if isinstance(node, ast.ClassDef):
+        for item in node.body:
+            if isinstance(item, ast.FunctionDef) and item.name.lower() in ["get", "post", "put", "patch", "delete"]:
+                methods.append(item.name.upper())
+    # If no specific methods are found, it's likely a generic view that handles all methods
     return methods if methods else ["ANY"]
 
-def parse_django_routes(src: Path) -> List[Dict]:
-    """
-    Parses Django URL configuration files to extract API endpoints.
-    This function assumes a standard Django app structure where urls.py and views.py
-    are in the same directory.
-    """
-    endpoints: List[Dict] = []
-    for urls_file in iter_files(src, exts= (".py",)):
-        views_file = urls_file.parent / "views.py"
-        try:
-            text = urls_file.read_text(encoding="utf-8", errors="ignore")
-        except Exception:
-            continue
-
-        for match in PATH_RE.finditer(text):
+def make_endpoints(file: str, path: str, handler: Handler, methods: List[str]) -> List[Endpoint]:
+    """One endpoint per HTTP method of a view, all sharing the view's source span."""
+    handlers = (handler,)
+    path = "/" + path.strip("/")
+    return [Endpoint("django", file, method, path, handlers) for method in methods]
+
+class DjangoMatcher(Matcher):
+    name = "django"
+    markers = (b"path(",)
+
+    def __init__(self) -> None:
+        # views.py file -> {name: first function/class node}, parsed once per scan
+        self._views: Dict[Path, Optional[Tuple[SourceFile, Dict[str, ast.AST]]]] = {}
+
+    def _view_index(self, views_file: Path) -> Optional[Tuple[SourceFile, Dict[str, ast.AST]]]:
+        if views_file not in self._views:
+            index = None
+            try:
+                data = views_file.read_bytes()
+                sf = SourceFile(views_file, views_file.parent, decode_source(data), data)
+                if sf.tree is not None:
+                    names: Dict[str, ast.AST] = {}
+                    for node in ast.walk(sf.tree):
+                        if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+                            names.setdefault(node.name, node)
+                    index = (sf, names)
+            except Exception:
+                # Silently fail on unreadable views for robust scanning
+                index = None
+            self._views[views_file] = index
+        return self._views[views_file]
+
+    def _view(self, views_file: Path, view_name: str) -> Optional[Tuple[SourceFile, ast.AST]]:
+        index = self._view_index(views_file)
+        if index is None:
+            return None
+        sf, names = index
+        node = names.get(view_name)
+        return (sf, node) if node is not None else None
+
+    def match_file(self, sf: SourceFile) -> List[Endpoint]:
+        endpoints: List[Endpoint] = []
+        views_file = sf.path.parent / "views.py"
+
+        for match in PATH_RE.finditer(sf.text):
             path, view_str = match.groups()
             view_name = view_str.split(".")[-1]
+            sf.deps.add(views_file)
 
-            source = get_source_from_views_file(views_file, view_name)
-            if not source:
+            view = self._view(views_file, view_name)
+            if view is None:
                 continue
 
-            methods = get_methods_from_class_source(source)
-            handlers = [source]
-            for method in methods:
-                endpoints.append({
-                    "framework": "django",
-                    "file": str(views_file.relative_to(src)),
-                    "method": method,
-                    "path": "/" + path.strip("/"),
-                    "handlers": handlers,
-                    "source": "\n\n".join(handlers),
-                    "summary": f"{method} /{path.strip('/')}"
-                })
-
-    return endpoints
+            view_sf, node = view
+            handler = view_sf.node_ref(node)
+            if not handler:
+                continue
+            methods = get_methods_from_class_node(node)
+            endpoints.extend(make_endpoints(str(views_file.relative_to(sf.root)), path, handler, methods))
+        return endpoints
+
+class UrlconfMatcher(Matcher):
+    """
+    Resolves the project's URL routing as Django does: from the ROOT_URLCONF
+    of each settings module, following include() with its prefix and each
+    view reference through the URLconf's imports.
+
+    The routes are the settings file's results. Every module the resolver
+    looked up is recorded as a dependency of it, so a cached resolution is
+    reused until one of those modules changes or appears.
+    """
+    name = "django-urlconf"
+    markers = (b"ROOT_URLCONF",)
+
+    def __init__(self, files: List[Path]) -> None:
+        # The project's .py files; listed by the parent process, as matchers run in workers
+        self.files = files
+        # Import base -> its modules, parsed once per scan for all settings modules
+        self._indexes: Dict[Path, ModuleIndex] = {}
+
+    def match_file(self, sf: SourceFile) -> List[Endpoint]:
+        urlconf = root_urlconf(sf.text) if is_settings_module(sf.path) else None
+        if urlconf is None:
+            return []
+        routes, deps = resolve_settings_urlconf(sf.path, urlconf, sf.root, self.files, self._indexes)
+        sf.deps.update(deps)
+
+        endpoints: List[Endpoint] = []
+        for path, view_sf, node in routes:
+            handler = view_sf.node_ref(node)
+            if handler:
+                file = str(view_sf.path.relative_to(sf.root))
+                endpoints.extend(make_endpoints(file, path, handler, get_methods_from_class_node(node)))
+        return endpoints
+
+def django_matcher(src: Path, ctx: Optional[ScanContext] = None) -> Matcher:
+    """The project's Django matcher: ROOT_URLCONF resolution if a settings module sets one, else urls.py by urls.py."""
+    ctx = ctx or ScanContext()
+    files = ctx.files(src, (".py",))
+    if find_root_urlconfs(files):
+        return UrlconfMatcher(files)
+    return DjangoMatcher()
+
+def django_routes(found: Dict[str, List[Endpoint]]) -> List[Endpoint]:
+    """The Django endpoints of a scan run with the matcher `django_matcher` chose."""
+    if UrlconfMatcher.name not in found:
+        return found[DjangoMatcher.name]
+    # Settings modules such as settings/dev.py and settings/prod.py usually share their URLconf
+    unique: Dict[Tuple, Endpoint] = {}
+    for ep in found[UrlconfMatcher.name]:
+        unique.setdefault((ep.path, ep.method, ep.file, ep.spans), ep)
+    return list(unique.values())
+
+def resolve_django_routes(src: Path, ctx: Optional[ScanContext] = None) -> Optional[List[Endpoint]]:
+    """
+    Endpoints of the project's URL routing as Django resolves it, starting at
+    ROOT_URLCONF (see UrlconfMatcher). Every module is parsed once.
+    Returns None if no settings module sets ROOT_URLCONF.
+    """
+    ctx = ctx or ScanContext()
+    matcher = django_matcher(src, ctx)
+    if not isinstance(matcher, UrlconfMatcher):
+        return None
+    return django_routes(scan_tree(src, (".py",), [matcher], ctx))
+
+def parse_django_routes(src: Path, ctx: Optional[ScanContext] = None) -> List[Endpoint]:
+    """
+    Parses Django URL configuration files to extract API endpoints.
+    Projects with a ROOT_URLCONF setting are resolved from it, with include()
+    prefixes. Otherwise every urls.py is read on its own, assuming a standard
+    app structure where urls.py and views.py are in the same directory.
+    """
+    ctx = ctx or ScanContext()
+    return django_routes(scan_tree(src, (".py",), [django_matcher(src, ctx)], ctx))
@@ -1,187 +1,212 @@
 from __future__ import annotations
-import re
 from pathlib import Path
-from typing import List, Dict, Optional, Iterable, Tuple
+from typing import Callable, List, Dict, Iterator, Optional, Set, Tuple
 
+from Apimatic.endpoint import Endpoint, Handler
+from Apimatic.scanner import Matcher, ScanContext, SourceFile, scan_tree
+from Apimatic.utils import decode_source
+from .jsscan import JsSource
+from .static import express_details
 
-def iter_files(src: Path, exts: Iterable[str]) -> Iterable[Path]:
-    """
-    Recursively iterates through files in a source directory with specific extensions.
-    
-    Args:
-        src (Path): The root directory to search.
-        exts (Iterable[str]): A list of file extensions to include (e.g., [".js", ".ts"]).
-        
-    Returns:
-        Iterable[Path]: An iterator yielding pathlib.Path objects for each matching file.
-    """
-    for ext in exts:
-        yield from src.rglob(f"*{ext}")
 
-# Matches the start of a route definition, like app.get('/path', ...handlers...)
-ROUTE_START_RE = re.compile(
-    r"""\b(?:app|router)\.(get|post|put|delete|patch|all)\s* # method (e.g., get, post)
-        \(\s*['"`]([^'"`]+)['"`]\s*,\s* # path (e.g., /users/:id)
-    """,
-    re.VERBOSE,
-)
+ROUTE_OBJECTS = frozenset({"app", "router"})
+ROUTE_METHODS = frozenset({"get", "post", "put", "delete", "patch", "all"})
+
+# Ignore common, reserved names to avoid mistaking plumbing for handlers
+IGNORED_HANDLER_NAMES = frozenset({"req", "res", "next", "console", "router", "app"})
 
 
-def find_full_handler_sources(text: str, start_pos: int) -> List[str]:
+def find_routes(js: JsSource) -> Iterator[Tuple[str, str, int, int]]:
     """
-    Extracts the source code for valid handlers within a route definition.
-    Handles both inline function handlers and named function references.
-    
-    Args:
-        text (str): The full source code of the file.
-        start_pos (int): The starting position to search for handlers, right after the route path.
-        
-    Returns:
-        List[str]: A list of strings, each containing the source code or name of a handler.
+    Finds route definitions like `app.get('/path', ...handlers)` in one pass over the tokens.
+
+    Yields (method, path, index of the first handler token, index of the closing parenthesis).
     """
-    handlers: List[str] = []
-    remaining_text = text[start_pos:]
-    current_pos = 0
+    tokens, text = js.tokens, js.text
+    for i in range(len(tokens) - 5):
+        kind, start, end = tokens[i]
+        if kind != "name" or text[start:end] not in ROUTE_OBJECTS:
+            continue
+        if not (js.is_punct(i + 1, ".") and tokens[i + 2][0] == "name" and js.is_punct(i + 3, "(")):
+            continue
+        method = js.value(i + 2)
+        if method not in ROUTE_METHODS or tokens[i + 4][0] not in ("str", "tmpl") or not js.is_punct(i + 5, ","):
+            continue
+        path = js.value(i + 4)[1:-1]
+        close = js.closing[i + 3]
+        if path and close != -1:
+            yield method, path, i + 6, close
 
-    while current_pos < len(remaining_text):
-        # Remove leading whitespace to find the start of the next handler
-        trimmed_text = remaining_text[current_pos:].lstrip()
-        
-        # Check for the end of the route definition
-        if not trimmed_text or trimmed_text.startswith(")") or trimmed_text.startswith(";"):
-            break
 
-        # Skip a comma if it's separating handlers
-        if trimmed_text.startswith(","):
-            current_pos += 1
-            continue
+# Handler lookups follow at most this many re-exports across files
+MAX_IMPORT_DEPTH = 5
 
-        # Check for inline handlers (arrow functions or function declarations)
-        if trimmed_text.startswith(("(", "async", "function")):
-            handler_source = _extract_function_like(trimmed_text)
-            if handler_source:
-                handlers.append(handler_source.strip())
-                current_pos += len(handler_source)
-                continue
-            else:
-                # If a function-like pattern is detected but parsing fails,
-                # it's likely not a valid handler. Advance by one to avoid an infinite loop.
-                current_pos += 1
-                continue
+JS_EXTS = (".js", ".ts", ".mjs", ".cjs", ".jsx", ".tsx")
 
-        # Check for named handlers (variable names)
-        name_match = re.match(r"^([a-zA-Z_]\w*)", trimmed_text)
-        if name_match:
-            handler_name = name_match.group(1)
-            name_len = len(handler_name)
+# A handler together with its source text, which is already in memory
+Source = Tuple[Handler, str]
 
-            # Ignore common, single-letter, or reserved keywords to avoid false positives.
-            # This is a heuristic to prevent common variable names from being mistaken for handlers.
-            if name_len == 1 or handler_name in {"req", "res", "next", "console", "router", "app"}:
-                current_pos += name_len
-                continue
+# Resolves a handler reference like `getUser` or `ctrl.list` to its source, or None
+Resolver = Callable[[str], Optional[Source]]
 
-            # Attempt to find the full source of the named function
-            function_source = find_named_function_source(text, handler_name)
-            if function_source:
-                handlers.append(function_source.strip())
-            else:
-                # If the full source can't be found, treat it as a named reference.
-                handlers.append(handler_name)
-            
-            current_pos += name_len
-            continue
 
-        # Move to the next character if no handler was matched
-        current_pos += 1
+def find_full_handler_sources(js: JsSource, first: int, close: int, resolve: Optional[Resolver] = None) -> List[Handler]:
+    """
+    Extracts the source code for the handlers of one route definition.
+    Handles both inline function handlers and named function references.
+
+    Args:
+        js (JsSource): The tokenized file.
+        first (int): Index of the token after the route path.
+        close (int): Index of the parenthesis closing the route call.
+        resolve (Resolver, optional): Looks up named handlers; defaults to the file's own declarations.
+
+    Returns:
+        List[Handler]: The source of each handler, as text or as a span of the
+        file when `js` has an origin, or its name if the source cannot be found.
+    """
+    return [handler for handler, _ in find_handler_texts(js, first, close, resolve)]
+
+
+def find_handler_texts(js: JsSource, first: int, close: int, resolve: Optional[Resolver] = None) -> List[Source]:
+    """Like `find_full_handler_sources`, with the text of each handler next to it."""
+    resolve = resolve or (lambda name: find_named_function(js, name))
+    handlers: List[Source] = []
+    idx = first
+    while idx < close:
+        arg_end = min(js.skip_expression(idx), close)
+        if arg_end == idx:
+            idx += 1
+            continue
+        _, start, _ = js.tokens[idx]
+        end = js.tokens[arg_end - 1][2]
+        head = js.value(idx)
+
+        is_reference = all(
+            js.tokens[k][0] == "name" if (k - idx) % 2 == 0 else js.is_punct(k, ".")
+            for k in range(idx, arg_end)
+        ) and (arg_end - idx) % 2 == 1
+
+        if head in ("async", "function") or js.is_punct(idx, "(") or (
+            idx + 1 < arg_end and js.tokens[idx + 1][0] == "arrow"
+        ):
+            # Inline handler: arrow function or function expression
+            handlers.append((js.ref(start, end), js.text[start:end]))
+        elif is_reference:
+            name = js.index.span(start, end)
+            if len(name) > 1 and name not in IGNORED_HANDLER_NAMES:
+                # Fall back to the bare name if its source cannot be found
+                handlers.append(resolve(name) or (name, name))
+        else:
+            # Any other expression, e.g. a middleware factory call like `auth('admin')`
+            handlers.append((js.ref(start, end), js.text[start:end]))
+        idx = arg_end + 1
 
     return handlers
 
 
-def _extract_function_like(substring: str) -> Optional[str]:
-    """Extracts inline function or arrow function source code from a substring."""
-    try:
-        # ---- Match function signature (parentheses) ----
-        paren_level, sig_end = 0, -1
-        for i, char in enumerate(substring):
-            if char == "(":
-                paren_level += 1
-            elif char == ")":
-                paren_level -= 1
-                if paren_level == 0:
-                    sig_end = i + 1
-                    break
-        if sig_end == -1:
+def find_named_function_source(js: JsSource, func_name: str) -> Optional[Handler]:
+    """Finds the full source of a named function declaration or arrow function assignment."""
+    return js.symbols.source(func_name)
+
+
+def find_named_function(js: JsSource, func_name: str) -> Optional[Source]:
+    """`find_named_function_source`, with the function's text."""
+    span = js.symbols.span(func_name)
+    return (js.ref(*span), js.text[span[0]:span[1]]) if span else None
+
+
+class ExpressMatcher(Matcher):
+    name = "express"
+    markers = (b"app", b"router")
+
+    def __init__(self) -> None:
+        # Imported modules, tokenized and indexed once per scan
+        self._modules: Dict[Path, Optional[JsSource]] = {}
+        self._specs: Dict[Tuple[Path, str], Optional[Path]] = {}
+
+    def _module(self, path: Path) -> Optional[JsSource]:
+        if path not in self._modules:
+            try:
+                data = path.read_bytes()
+                origin = SourceFile(path, path.parent, decode_source(data), data)
+                self._modules[path] = JsSource(origin.text, origin)
+            except OSError:
+                self._modules[path] = None
+        return self._modules[path]
+
+    def _resolve_module(self, importer: Path, spec: str) -> Optional[Path]:
+        """The project file a relative `require`/`import` specifier points to."""
+        if not spec.startswith("."):
+            return None  # a package, not a project file
+        key = (importer.parent, spec)
+        if key not in self._specs:
+            base = importer.parent / spec
+            candidates = [base, *(base.with_name(base.name + ext) for ext in JS_EXTS),
+                          *(base / f"index{ext}" for ext in JS_EXTS)]
+            self._specs[key] = next((c for c in candidates if c.is_file()), None)
+        return self._specs[key]
+
+    def _lookup(self, path: Path, js: JsSource, name: str, deps: Set[Path], depth: int = 0) -> Optional[Source]:
+        """Source of the function `name` as seen from file `path`, following imports and re-exports."""
+        symbols = js.symbols
+        source = find_named_function(js, name)
+        if source is not None or depth >= MAX_IMPORT_DEPTH:
+            return source
+        local = symbols.exports.get(name, name)
+        binding = symbols.imports.get(local)
+        if binding is None:
             return None
+        spec, imported = binding
+        return self._lookup_in_module(path, spec, imported or "default", deps, depth + 1)
 
-        # ---- Match function body (curly braces) ----
-        body_start = substring.find("{", sig_end)
-        if body_start == -1:
+    def _lookup_in_module(self, importer: Path, spec: str, name: str, deps: Set[Path], depth: int) -> Optional[Source]:
+        target = self._resolve_module(importer, spec)
+        module = self._module(target) if target else None
+        if module is None:
             return None
+        deps.add(target)
+        return self._lookup(target, module, name, deps, depth)
+
+    def _resolver(self, sf: SourceFile, js: JsSource) -> Resolver:
+        def resolve(ref: str) -> Optional[Source]:
+            obj, _, member = ref.partition(".")
+            if not member:
+                return self._lookup(sf.path, js, obj, sf.deps)
+            # `ctrl.list` where `ctrl` is a whole imported module
+            binding = js.symbols.imports.get(obj)
+            if binding is None or "." in member or binding[1] not in (None, "default"):
+                return None
+            return self._lookup_in_module(sf.path, binding[0], member, sf.deps, 1)
+        return resolve
+
+    def match_file(self, sf: SourceFile) -> List[Endpoint]:
+        endpoints: List[Endpoint] = []
+        js = JsSource(sf.text, sf)
+        resolve = self._resolver(sf, js)
+        for method, path, first, close in find_routes(js):
+            sources = find_handler_texts(js, first, close, resolve)
+            if not sources:
+                continue
 
-        brace_level, body_end = 1, -1
-        for i, char in enumerate(substring[body_start + 1:], start=body_start + 1):
-            if char == "{":
-                brace_level += 1
-            elif char == "}":
-                brace_level -= 1
-                if brace_level == 0:
-                    body_end = i + 1
-                    break
-
-        return substring[:body_end] if body_end != -1 else None
-    except IndexError:
-        return None
+            endpoint = Endpoint("express", sf.rel, method.upper(), path, [handler for handler, _ in sources])
+            # The handlers' text is at hand; `endpoint.source` would read it back from disk
+            endpoint.ai_details = express_details("\n\n".join(text for _, text in sources))
+            endpoint.static_details = True
+            endpoints.append(endpoint)
+        return endpoints
 
 
-def find_named_function_source(text: str, func_name: str) -> Optional[str]:
-    """Finds the full source of a named function declaration or arrow function assignment."""
-    func_def_re = re.compile(
-        rf"""
-        (?:function\s+{func_name}\s*\(                      # function funcName(...)
-        |(?:\s*const|let|var)\s+{func_name}\s*=\s*(?:async\s*)? # const funcName = async (...)
-        )
-        """,
-        re.VERBOSE,
-    )
-    match = func_def_re.search(text)
-    return _extract_function_like(text[match.end():]) if match else None
-
-
-def parse_express_routes(src: Path) -> List[Dict]:
+def parse_express_routes(src: Path, ctx: Optional[ScanContext] = None) -> List[Endpoint]:
     """
     Parses all Express.js routes from .js/.ts files under a source directory.
     Returns a list of endpoint dictionaries, each potentially containing multiple handlers.
     
     Args:
         src (Path): The root directory to search for source files.
+        ctx (ScanContext, optional): Cache, worker count and counters of the run.
         
     Returns:
-        List[Dict]: A list of dictionaries, where each dictionary represents an API endpoint.
+        List[Endpoint]: A list of dictionaries, where each dictionary represents an API endpoint.
     """
-    endpoints: List[Dict] = []
-
-    # The iter_files function is now defined above to correctly handle file iteration.
-    for file in iter_files(src, exts=(".js", ".ts")):
-        try:
-            text = file.read_text(encoding="utf-8", errors="ignore")
-        except Exception:
-            continue
-
-        for match in ROUTE_START_RE.finditer(text):
-            method, path = match.groups()
-            handlers = find_full_handler_sources(text, match.end())
-            if not handlers:
-                continue
-
-            endpoints.append({
-                "framework": "express",
-                "file": str(file.relative_to(src)),
-                "method": method.upper(),
-                "path": path,
-                "handlers": handlers,
-                "source": "\n\n".join(handlers),
-                "summary": f"{method.upper()} {path}",
-            })
-
-    return endpoints
+    return scan_tree(src, (".js", ".ts"), [ExpressMatcher()], ctx)["express"]
@@ -1,51 +1,49 @@
 from __future__ import annotations
 import ast
 from pathlib import Path
-from typing import List, Dict
-
-from Apimatic.utils import iter_files
-
-def parse_fastapi_routes(src: Path) -> List[Dict]:
-    endpoints: List[Dict] = []
-    for file in iter_files(src, exts=(".py",)):
-        try:
-            text = file.read_text(encoding="utf-8", errors="ignore")
-            tree = ast.parse(text)
-            
-            for node in ast.walk(tree):
-                if not isinstance(node, ast.FunctionDef):
-                    continue
-
-                for decorator in node.decorator_list:
-                    # Look for decorators like @app.get, @app.post, @router.get, etc.
-                    if (isinstance(decorator, ast.Call) and
-                        isinstance(decorator.func, ast.Attribute) and
-                        isinstance(decorator.func.value, ast.Name) and
-                        decorator.func.attr.upper() in ("GET", "POST", "PUT", "DELETE", "PATCH") and
-                        decorator.func.value.id in ("app", "router")):
-                        
-                        method = decorator.func.attr.upper()
-                        
-                        # Get the path from the first argument of the decorator
-                        path = ""
-                        if decorator.args and isinstance(decorator.args[0], ast.Constant):
-                            path = decorator.args[0].value
-                        
-                        # Extract the source code for the decorated function
-                        source_code = ast.get_source_segment(text, node)
-                        handlers = [source_code]
-
-                        endpoints.append({
-                            "framework": "fastapi",
-                            "file": str(file.relative_to(src)),
-                            "method": method,
-                            "path": path,
-                            "handlers": handlers,
-                            "source": "\n\n".join(handlers),
-                            "summary": f"{method} {path}"
-                        })
-        except (SyntaxError, UnicodeDecodeError):
-            # Skip files that have syntax errors or are not correctly encoded
-            continue
-            
-    return endpoints
+from typing import List, Optional, Tuple
+
+from Apimatic.endpoint import Endpoint
+from Apimatic.scanner import Matcher, ScanContext, SourceFile, scan_tree
+from .static import ModelIndex, fastapi_details
+
+class FastAPIMatcher(Matcher):
+    name = "fastapi"
+    uses_ast = True
+    markers = (b"app", b"router")
+
+    def __init__(self) -> None:
+        # The classes of the file being matched, indexed once for its body models
+        self._models: Optional[Tuple[SourceFile, ModelIndex]] = None
+
+    def _model_index(self, sf: SourceFile) -> ModelIndex:
+        if self._models is None or self._models[0] is not sf:
+            self._models = (sf, ModelIndex(sf.tree))
+        return self._models[1]
+
+    def match_function(self, sf: SourceFile, node: ast.FunctionDef) -> List[Endpoint]:
+        endpoints: List[Endpoint] = []
+        for decorator in node.decorator_list:
+            # Look for decorators like @app.get, @app.post, @router.get, etc.
+            if (isinstance(decorator, ast.Call) and
+                isinstance(decorator.func, ast.Attribute) and
+                isinstance(decorator.func.value, ast.Name) and
+                decorator.func.attr.upper() in ("GET", "POST", "PUT", "DELETE", "PATCH") and
+                decorator.func.value.id in ("app", "router")):
+
+                method = decorator.func.attr.upper()
+
+                # Get the path from the first argument of the decorator
+                path = ""
+                if decorator.args and isinstance(decorator.args[0], ast.Constant):
+                    path = decorator.args[0].value
+
+                # Reference the decorated function's source; it is read when needed
+                endpoint = Endpoint("fastapi", sf.rel, method, path, [sf.node_ref(node)])
+                endpoint.ai_details = fastapi_details(node, path, self._model_index(sf))
+                endpoint.static_details = True
+                endpoints.append(endpoint)
+        return endpoints
+
+def parse_fastapi_routes(src: Path, ctx: Optional[ScanContext] = None) -> List[Endpoint]:
+    return scan_tree(src, (".py",), [FastAPIMatcher()], ctx)["fastapi"]
@@ -1,51 +1,46 @@
 from __future__ import annotations
 import ast
+import copy
 from pathlib import Path
-from typing import List, Dict
-
-from Apimatic.utils import iter_files
-
-def parse_flask_routes(src: Path) -> List[Dict]:
-    endpoints: List[Dict] = []
-    for file in iter_files(src, exts=(".py",)):
-        try:
-            text = file.read_text(encoding="utf-8", errors="ignore")
-            tree = ast.parse(text)
-
-            for node in ast.walk(tree):
-                if not isinstance(node, ast.FunctionDef):
-                    continue
-
-                for decorator in node.decorator_list:
-                    if not (isinstance(decorator, ast.Call) and 
-                            isinstance(decorator.func, ast.Attribute) and
-                            decorator.func.attr == 'route'):
-                        continue
-
-                    path = ""
-                    if decorator.args and isinstance(decorator.args[0], ast.Constant):
-                        path = decorator.args[0].value
-
-                    methods = ["GET"]
-                    for keyword in decorator.keywords:
-                        if keyword.arg == 'methods' and isinstance(keyword.value, (ast.List, ast.Tuple)):
-                            methods = [el.value for el in keyword.value.elts if isinstance(el, ast.Constant)]
-
-                    source_code = ast.get_source_segment(text, node)
-                    handlers = [source_code]
-
-                    for method in methods:
-                        endpoints.append({
-                            "framework": "flask",
-                            "file": str(file.relative_to(src)),
-                            "method": method.upper(),
-                            "path": path,
-                            "handlers": handlers,
-                            "source": "\n\n".join(handlers),
-                            "summary": f"{method.upper()} {path}"
-                        })
-        except (SyntaxError, UnicodeDecodeError):
-            continue
-            
-    return endpoints
-
+from typing import List, Optional
+
+from Apimatic.endpoint import Endpoint
+from Apimatic.scanner import Matcher, ScanContext, SourceFile, scan_tree
+from .static import flask_details
+
+class FlaskMatcher(Matcher):
+    name = "flask"
+    uses_ast = True
+    markers = (b"route",)
+
+    def match_function(self, sf: SourceFile, node: ast.FunctionDef) -> List[Endpoint]:
+        endpoints: List[Endpoint] = []
+        for decorator in node.decorator_list:
+            if not (isinstance(decorator, ast.Call) and
+                    isinstance(decorator.func, ast.Attribute) and
+                    decorator.func.attr == 'route'):
+                continue
+
+            path = ""
+            if decorator.args and isinstance(decorator.args[0], ast.Constant):
+                path = decorator.args[0].value
+
+            methods = ["GET"]
+            for keyword in decorator.keywords:
+                if keyword.arg == 'methods' and isinstance(keyword.value, (ast.List, ast.Tuple)):
+                    methods = [el.value for el in keyword.value.elts if isinstance(el, ast.Constant)]
+
+            # One span shared by the endpoints of every method
+            handlers = (sf.node_ref(node),)
+            details = flask_details(node, sf.segment(node))
+
+            for n, method in enumerate(methods):
+                endpoint = Endpoint("flask", sf.rel, method.upper(), path, handlers)
+                # Each method owns its details, so editing one endpoint's leaves the others alone
+                endpoint.ai_details = details if n == 0 else copy.deepcopy(details)
+                endpoint.static_details = True
+                endpoints.append(endpoint)
+        return endpoints
+
+def parse_flask_routes(src: Path, ctx: Optional[ScanContext] = None) -> List[Endpoint]:
+    return scan_tree(src, (".py",), [FlaskMatcher()], ctx)["flask"]
@@ -0,0 +1,431 @@
+"""
+A small single-pass JavaScript/TypeScript tokenizer.
+
+It knows just enough of the language to find code structure reliably: strings,
+template literals (including nested `${...}` expressions), regex literals and
+comments are consumed whole, so braces and parentheses inside them never
+affect bracket matching. All positions are offsets into the original text;
+nothing is sliced until a caller asks for a span's source.
+"""
+from __future__ import annotations
+import bisect
+import re
+from typing import Dict, List, Optional, Tuple
+
+from Apimatic.endpoint import Handler
+from Apimatic.scanner import SourceFile, SourceIndex
+
+# (kind, start, end) with kind one of: name, num, str, tmpl, regex, arrow, punct
+Token = Tuple[str, int, int]
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<ws>\s+)
+    |(?P<comment>//[^\n]*|/\*[\s\S]*?(?:\*/|\Z))
+    |(?P<name>[A-Za-z_$\u0080-\uffff][\w$\u0080-\uffff]*)
+    |(?P<num>\d[\w.]*|\.\d\w*)
+    |(?P<str>'(?:[^'\\\n]|\\[\s\S])*'?|"(?:[^"\\\n]|\\[\s\S])*"?)
+    |(?P<arrow>=>)
+    |(?P<punct>[\s\S])
+    """,
+    re.VERBOSE,
+)
+_TEMPLATE_CHUNK_RE = re.compile(r"(?:[^`\\$]|\\[\s\S]|\$(?!\{))*")
+_REGEX_RE = re.compile(r"/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*")
+
+# After these, a `/` starts a regex literal rather than a division
+_REGEX_AFTER_PUNCT = frozenset("(,=:[!&|?{};+-*%<>~^")
+_REGEX_AFTER_NAME = frozenset({
+    "return", "typeof", "case", "do", "else", "in", "of", "new", "delete",
+    "void", "throw", "yield", "await", "instanceof",
+})
+_OPENERS = {"(": ")", "[": "]", "{": "}"}
+
+
+def _template_end(text: str, pos: int, substitutions: Optional[List[Tuple[int, int]]] = None) -> int:
+    """
+    Offset just past the template literal whose opening backtick is at `pos`.
+    The (start, end) offsets of its `${...}` expressions, braces excluded, are
+    appended to `substitutions` if given.
+    """
+    n = len(text)
+    i = pos + 1
+    while i < n:
+        i = _TEMPLATE_CHUNK_RE.match(text, i).end()
+        if i >= n:
+            break
+        if text[i] == "`":
+            return i + 1
+        # `${` -- skip the embedded expression up to its matching `}`
+        i, depth = i + 2, 1
+        start = end = i
+        while i < n and depth:
+            if text[i] == "`":
+                i = end = _template_end(text, i)
+                continue
+            m = _TOKEN_RE.match(text, i)
+            kind, i = m.lastgroup, m.end()
+            if kind == "punct":
+                ch = text[m.start()]
+                depth += ch == "{"
+                depth -= ch == "}"
+            end = m.start() if depth == 0 else i
+        if substitutions is not None:
+            substitutions.append((start, end))
+    return n
+
+
+def template_substitutions(text: str, pos: int) -> List[Tuple[int, int]]:
+    """(start, end) offsets of the `${...}` expressions of the template literal starting at `pos`."""
+    substitutions: List[Tuple[int, int]] = []
+    _template_end(text, pos, substitutions)
+    return substitutions
+
+
+def tokenize(text: str) -> List[Token]:
+    """Splits `text` into tokens, dropping whitespace and comments."""
+    tokens: List[Token] = []
+    n = len(text)
+    i = 0
+    match = _TOKEN_RE.match
+    while i < n:
+        ch = text[i]
+        if ch == "`":
+            end = _template_end(text, i)
+            tokens.append(("tmpl", i, end))
+            i = end
+            continue
+        if ch == "/" and i + 1 < n and text[i + 1] not in "/*":
+            prev = tokens[-1] if tokens else None
+            if (prev is None or prev[0] == "arrow"
+                    or (prev[0] == "punct" and text[prev[1]] in _REGEX_AFTER_PUNCT)
+                    or (prev[0] == "name" and text[prev[1]:prev[2]] in _REGEX_AFTER_NAME)):
+                m = _REGEX_RE.match(text, i)
+                if m:
+                    tokens.append(("regex", i, m.end()))
+                    i = m.end()
+                    continue
+        m = match(text, i)
+        kind = m.lastgroup
+        if kind != "ws" and kind != "comment":
+            tokens.append((kind, i, m.end()))
+        i = m.end()
+    return tokens
+
+
+class JsSource:
+    """
+    A tokenized JS/TS file with precomputed bracket pairs. With the scanned
+    `origin` file, spans are handed out as byte spans of that file.
+    """
+
+    def __init__(self, text: str, origin: Optional[SourceFile] = None) -> None:
+        self.text = text
+        self.origin = origin
+        self.index = origin.index if origin is not None else SourceIndex(text)
+        self._symbols: Optional[FileSymbols] = None
+        self.tokens = tokenize(text)
+        self._starts = [t[1] for t in self.tokens]
+        # token index of an opening bracket -> index of its closing bracket
+        self.closing: List[int] = [-1] * len(self.tokens)
+        stack: List[int] = []
+        for idx, (kind, start, _) in enumerate(self.tokens):
+            if kind != "punct":
+                continue
+            ch = text[start]
+            if ch in _OPENERS:
+                stack.append(idx)
+            elif ch in ")]}":
+                # Tolerate unbalanced input: unwind to the nearest matching opener
+                while stack and _OPENERS[text[self.tokens[stack[-1]][1]]] != ch:
+                    stack.pop()
+                if stack:
+                    self.closing[stack.pop()] = idx
+
+    @property
+    def symbols(self) -> FileSymbols:
+        """The file's symbol index, built on first use."""
+        if self._symbols is None:
+            self._symbols = FileSymbols(self)
+        return self._symbols
+
+    def ref(self, start: int, end: int) -> Handler:
+        """Handler for text `start:end`: a span of the origin file, or the text itself."""
+        return self.origin.ref(start, end) if self.origin is not None else self.text[start:end]
+
+    def value(self, idx: int) -> str:
+        _, start, end = self.tokens[idx]
+        return self.text[start:end]
+
+    def is_punct(self, idx: int, chars: str) -> bool:
+        if idx >= len(self.tokens):
+            return False
+        kind, start, _ = self.tokens[idx]
+        return kind == "punct" and self.text[start] in chars
+
+    def index_at(self, offset: int) -> int:
+        """Index of the first token starting at or after `offset`."""
+        return bisect.bisect_left(self._starts, offset)
+
+    def skip_expression(self, idx: int, stop: str = ",;)]}") -> int:
+        """Index of the first depth-0 token in `stop` (or a stray closer) at or after `idx`."""
+        n = len(self.tokens)
+        while idx < n:
+            if self.is_punct(idx, stop) or self.is_punct(idx, ")]}"):
+                return idx
+            if self.is_punct(idx, "([{") and self.closing[idx] != -1:
+                idx = self.closing[idx] + 1
+            else:
+                idx += 1
+        return n
+
+    def function_end(self, idx: int) -> Optional[int]:
+        """
+        End offset of the function starting at token `idx`.
+
+        Handles `function name(...) {...}`, `async (...) => {...}`, `x => expr`
+        and declarations such as `const name = (...) => {...}`. Returns None if
+        no function starts here.
+        """
+        n = len(self.tokens)
+        while idx < n:
+            kind = self.tokens[idx][0]
+            if kind == "arrow":
+                return self._arrow_body_end(idx + 1)
+            if self.is_punct(idx, ";)]}{["):
+                return None
+            if self.is_punct(idx, "("):
+                close = self.closing[idx]
+                if close == -1:
+                    return None
+                nxt = close + 1
+                if self.is_punct(nxt, ":"):
+                    # TypeScript return type annotation
+                    nxt += 1
+                    while nxt < n and self.tokens[nxt][0] != "arrow" and not self.is_punct(nxt, "{;,)]}"):
+                        jump = self.is_punct(nxt, "([") and self.closing[nxt] != -1
+                        nxt = self.closing[nxt] + 1 if jump else nxt + 1
+                if nxt < n and self.tokens[nxt][0] == "arrow":
+                    return self._arrow_body_end(nxt + 1)
+                if self.is_punct(nxt, "{") and self.closing[nxt] != -1:
+                    return self.tokens[self.closing[nxt]][2]
+                return None
+            idx += 1
+        return None
+
+    def _arrow_body_end(self, idx: int) -> Optional[int]:
+        if idx >= len(self.tokens):
+            return None
+        if self.is_punct(idx, "{") and self.closing[idx] != -1:
+            return self.tokens[self.closing[idx]][2]
+        end = self.skip_expression(idx)
+        return self.tokens[end - 1][2] if end > idx else None
+
+
+class FileSymbols:
+    """
+    Function declarations, import bindings and exports of one file, collected
+    in a single pass over its tokens.
+
+    - `functions`: name -> (start, end) offsets of `function name(...) {...}`,
+      `const name = (...) => ...`, `exports.name = function ...` and object
+      methods of `module.exports = {...}`; a function assigned to
+      `module.exports` itself is recorded as "default". The first definition wins.
+    - `imports`: local name -> (module specifier, imported name), where the
+      imported name is None for a whole-module binding (`const m = require(...)`,
+      `import * as m from ...`) and "default" for a default import.
+    - `exports`: exported name -> local name, from `module.exports = { a, b: c }`,
+      `module.exports = name` / `export default name` ("default") and
+      `export { a as b }`.
+    """
+
+    def __init__(self, js: JsSource) -> None:
+        self.functions: Dict[str, Tuple[int, int]] = {}
+        self.imports: Dict[str, Tuple[str, Optional[str]]] = {}
+        self.exports: Dict[str, str] = {}
+        self._js = js
+        tokens = js.tokens
+        i, n = 0, len(tokens)
+        while i < n:
+            kind, start, end = tokens[i]
+            if kind == "name":
+                word = js.text[start:end]
+                if word == "function":
+                    self._function_declaration(i)
+                elif word in ("const", "let", "var"):
+                    self._variable_declaration(i)
+                elif word == "import" and not js.is_punct(i + 1, "(."):
+                    self._import_statement(i)
+                elif word in ("exports", "module") and (i == 0 or not js.is_punct(i - 1, ".")):
+                    self._exports_assignment(i)
+                elif word == "export" and js.is_punct(i + 1, "{"):
+                    self._export_list(i + 1)
+                elif word == "export" and self._name(i + 1) == "default" and self._plain_name(i + 2):
+                    self.exports.setdefault("default", self._plain_name(i + 2))
+            i += 1
+
+    # ---- helpers ----
+    def _name(self, idx: int) -> Optional[str]:
+        if idx < len(self._js.tokens) and self._js.tokens[idx][0] == "name":
+            return self._js.value(idx)
+        return None
+
+    def _string(self, idx: int) -> Optional[str]:
+        if idx < len(self._js.tokens) and self._js.tokens[idx][0] == "str":
+            return self._js.value(idx)[1:-1]
+        return None
+
+    def _plain_name(self, idx: int) -> Optional[str]:
+        """A bare identifier at `idx`, i.e. not the start of `a.b`, `a(...)` or `a[...]`."""
+        name = self._name(idx)
+        return None if name is None or self._js.is_punct(idx + 1, ".([") else name
+
+    def _is_assign(self, idx: int) -> bool:
+        # `=` but not `==`/`===`
+        return self._js.is_punct(idx, "=") and not self._js.is_punct(idx + 1, "=")
+
+    def _is_function_value(self, idx: int) -> bool:
+        js = self._js
+        head = self._name(idx)
+        return (
+            head in ("async", "function")
+            or js.is_punct(idx, "(")
+            or (head is not None and idx + 1 < len(js.tokens) and js.tokens[idx + 1][0] == "arrow")
+        )
+
+    def _add_function(self, name: str, start_idx: int, value_idx: int) -> None:
+        end = self._js.function_end(value_idx)
+        if end is not None:
+            self.functions.setdefault(name, (self._js.tokens[start_idx][1], end))
+
+    def _require_spec(self, idx: int) -> Optional[str]:
+        """Specifier of a `require('spec')` call starting at token `idx`."""
+        if self._name(idx) == "require" and self._js.is_punct(idx + 1, "(") and self._js.is_punct(idx + 3, ")"):
+            return self._string(idx + 2)
+        return None
+
+    # ---- statements ----
+    def _function_declaration(self, i: int) -> None:
+        name = self._name(i + 1)
+        if name and self._js.is_punct(i + 2, "("):
+            start = i - 1 if self._name(i - 1) == "async" else i
+            self._add_function(name, start, i)
+            if self._name(start - 1) == "default" and self._name(start - 2) == "export":
+                self._add_function("default", start, i)
+
+    def _variable_declaration(self, i: int) -> None:
+        js = self._js
+        name = self._name(i + 1)
+        if name and self._is_assign(i + 2):
+            value = i + 3
+            spec = self._require_spec(value)
+            if spec is not None:
+                member = self._name(value + 5) if js.is_punct(value + 4, ".") else None
+                self.imports.setdefault(name, (spec, member))
+            elif self._is_function_value(value):
+                self._add_function(name, i, value)
+        elif js.is_punct(i + 1, "{") and js.closing[i + 1] != -1:
+            close = js.closing[i + 1]
+            if self._is_assign(close + 1):
+                spec = self._require_spec(close + 2)
+                if spec is not None:
+                    for imported, local in self._binding_list(i + 2, close, ":"):
+                        self.imports.setdefault(local, (spec, imported))
+
+    def _binding_list(self, idx: int, close: int, alias: str) -> List[Tuple[str, str]]:
+        """(imported, local) pairs of `{ a, b: c }` (alias ":") or `{ a, b as c }` (alias "as")."""
+        pairs: List[Tuple[str, str]] = []
+        while idx < close:
+            imported = self._name(idx)
+            if imported is None:
+                idx += 1
+                continue
+            local = imported
+            if alias == ":" and self._js.is_punct(idx + 1, ":") and self._name(idx + 2):
+                local, idx = self._name(idx + 2), idx + 2
+            elif alias == "as" and self._name(idx + 1) == "as" and self._name(idx + 2):
+                local, idx = self._name(idx + 2), idx + 2
+            pairs.append((imported, local))
+            idx = self._js.skip_expression(idx + 1, stop=",") + 1
+        return pairs
+
+    def _import_statement(self, i: int) -> None:
+        js = self._js
+        idx, n = i + 1, len(js.tokens)
+        bindings: List[Tuple[Optional[str], str]] = []
+        while idx < n and self._name(idx) != "from":
+            if js.is_punct(idx, ";") or js.tokens[idx][0] == "str":
+                return  # side-effect import
+            if js.is_punct(idx, "*") and self._name(idx + 1) == "as" and self._name(idx + 2):
+                bindings.append((None, self._name(idx + 2)))
+                idx += 3
+            elif js.is_punct(idx, "{") and js.closing[idx] != -1:
+                bindings.extend(self._binding_list(idx + 1, js.closing[idx], "as"))
+                idx = js.closing[idx] + 1
+            elif self._name(idx) and self._name(idx) != "type":
+                bindings.append(("default", self._name(idx)))
+                idx += 1
+            else:
+                idx += 1
+        spec = self._string(idx + 1)
+        if spec is not None:
+            for imported, local in bindings:
+                self.imports.setdefault(local, (spec, imported))
+
+    def _exports_assignment(self, i: int) -> None:
+        js = self._js
+        idx = i + 1
+        if self._name(i) == "module":
+            if not (js.is_punct(idx, ".") and self._name(idx + 1) == "exports"):
+                return
+            idx += 2
+        if js.is_punct(idx, ".") and self._name(idx + 1) and self._is_assign(idx + 2):
+            # exports.name = ... / module.exports.name = ...
+            name = self._name(idx + 1)
+            if self._is_function_value(idx + 3):
+                self._add_function(name, i, idx + 3)
+            elif self._plain_name(idx + 3):
+                self.exports.setdefault(name, self._plain_name(idx + 3))
+        elif self._is_assign(idx):
+            value = idx + 1
+            if js.is_punct(value, "{") and js.closing[value] != -1:
+                self._export_object(value + 1, js.closing[value])
+            elif self._is_function_value(value):
+                self._add_function("default", i, value)
+            elif self._plain_name(value):
+                self.exports.setdefault("default", self._plain_name(value))
+
+    def _export_object(self, idx: int, close: int) -> None:
+        js = self._js
+        while idx < close:
+            key = self._name(idx)
+            if key is None:
+                idx = js.skip_expression(idx, stop=",") + 1
+                continue
+            if js.is_punct(idx + 1, "("):
+                # method shorthand: key(req, res) { ... }
+                self._add_function(key, idx, idx)
+            elif js.is_punct(idx + 1, ":"):
+                if self._is_function_value(idx + 2):
+                    self._add_function(key, idx + 2, idx + 2)
+                elif self._plain_name(idx + 2):
+                    self.exports.setdefault(key, self._plain_name(idx + 2))
+            else:
+                self.exports.setdefault(key, key)
+            idx = js.skip_expression(idx + 1, stop=",") + 1
+
+    def _export_list(self, idx: int) -> None:
+        close = self._js.closing[idx]
+        if close != -1:
+            for local, exported in self._binding_list(idx + 1, close, "as"):
+                self.exports.setdefault(exported, local)
+
+    # ---- lookup ----
+    def span(self, name: str) -> Optional[Tuple[int, int]]:
+        """Text offsets of the function declared or exported as `name` in this file."""
+        return self.functions.get(name) or self.functions.get(self.exports.get(name, ""))
+
+    def source(self, name: str) -> Optional[Handler]:
+        """Source (or its span) of the function declared or exported as `name` in this file."""
+        span = self.span(name)
+        return self._js.ref(*span) if span else None
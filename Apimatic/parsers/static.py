@@ -0,0 +1,476 @@
+"""
+Static analysis of handlers: documents query parameters and request bodies
+straight from the source, the parts of ai_details that do not need a model.
+
+Each analyzer returns ai_details with an empty `logic_explanation`; AI
+providers are then only asked to explain the logic of these endpoints.
+"""
+from __future__ import annotations
+import ast
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+from Apimatic.utils import ast_nodes
+
+from .jsscan import Token, template_substitutions, tokenize
+
+NO_BODY = {"description": "None.", "schema": {}}
+
+# Python annotations and values -> JSON schema types
+JSON_TYPES = {
+    "str": "string", "bytes": "string", "int": "integer", "float": "number", "Decimal": "number",
+    "bool": "boolean", "list": "array", "List": "array", "Sequence": "array", "set": "array", "Set": "array",
+    "tuple": "array", "Tuple": "array", "dict": "object", "Dict": "object", "Mapping": "object",
+    "datetime": "string", "date": "string", "time": "string", "UUID": "string", "EmailStr": "string", "HttpUrl": "string",
+}
+# Wrappers whose first argument is the actual type
+TRANSPARENT = frozenset({"Optional", "Annotated", "Required", "NotRequired"})
+
+# Nested models are expanded this deep; deeper ones are referenced by name
+MAX_MODEL_DEPTH = 3
+
+# FastAPI parameters that are injected rather than sent by the client
+FASTAPI_INJECTED = frozenset({
+    "Request", "Response", "WebSocket", "HTTPConnection", "BackgroundTasks", "SecurityScopes",
+})
+# FastAPI parameter functions, and those whose values do not come from the query or body
+FASTAPI_PARAMS = frozenset({"Query", "Body", "Form", "File", "Depends", "Security", "Path", "Header", "Cookie"})
+FASTAPI_SKIPPED = frozenset({"Depends", "Security", "Path", "Header", "Cookie"})
+FASTAPI_FORM = frozenset({"Form", "File", "UploadFile"})
+
+_PATH_PARAM_RE = re.compile(r"{(\w+)(?::[^}]*)?}")
+
+
+def make_details(query_params: List[Dict], request_body: Dict) -> Dict:
+    return {"logic_explanation": "", "query_params": query_params, "request_body": request_body}
+
+
+def object_schema(properties: Dict[str, Dict], required: List[str]) -> Dict:
+    schema: Dict = {"type": "object", "properties": properties}
+    if required:
+        schema["required"] = required
+    return schema
+
+
+def _name(node: Optional[ast.AST]) -> Optional[str]:
+    """`x` of `x` or `a.b.x`."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return None
+
+
+def _call_name(node: Optional[ast.AST]) -> Optional[str]:
+    return _name(node.func) if isinstance(node, ast.Call) else None
+
+
+def _keyword(call: ast.Call, name: str) -> Optional[ast.AST]:
+    return next((k.value for k in call.keywords if k.arg == name), None)
+
+
+def _string(node: Optional[ast.AST]) -> Optional[str]:
+    return node.value if isinstance(node, ast.Constant) and isinstance(node.value, str) else None
+
+
+def value_type(node: Optional[ast.AST]) -> Optional[str]:
+    """JSON type of a literal default value."""
+    if isinstance(node, ast.Constant) and node.value is not None and node.value is not Ellipsis:
+        return JSON_TYPES.get(type(node.value).__name__)
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        return "array"
+    if isinstance(node, ast.Dict):
+        return "object"
+    return None
+
+
+def unwrap(annotation: Optional[ast.AST]) -> Optional[ast.AST]:
+    """The type inside Optional[...], Annotated[...], `X | None` and string annotations."""
+    while annotation is not None:
+        if isinstance(annotation, ast.Constant) and isinstance(annotation.value, str):
+            try:
+                annotation = ast.parse(annotation.value, mode="eval").body
+            except SyntaxError:
+                return None
+        elif isinstance(annotation, ast.Subscript) and _name(annotation.value) in TRANSPARENT | {"Union"}:
+            inner = annotation.slice
+            args = inner.elts if isinstance(inner, ast.Tuple) else [inner]
+            if _name(annotation.value) == "Union":
+                args = [a for a in args if not (isinstance(a, ast.Constant) and a.value is None) and _name(a) != "None"]
+            annotation = args[0] if args else None
+        elif isinstance(annotation, ast.BinOp) and isinstance(annotation.op, ast.BitOr):
+            left_none = isinstance(annotation.left, ast.Constant) and annotation.left.value is None
+            annotation = annotation.right if left_none else annotation.left
+        else:
+            return annotation
+    return None
+
+
+def _generic_name(annotation: Optional[ast.AST]) -> Optional[str]:
+    """`List` of `List[int]`, `int` of `int`."""
+    return _name(annotation.value if isinstance(annotation, ast.Subscript) else annotation)
+
+
+def annotation_type(annotation: Optional[ast.AST]) -> Optional[str]:
+    return JSON_TYPES.get(_generic_name(unwrap(annotation)) or "")
+
+
+def _annotated_metadata(annotation: Optional[ast.AST]) -> List[ast.AST]:
+    """The metadata of `Annotated[T, Query(...), ...]`."""
+    if isinstance(annotation, ast.Subscript) and _name(annotation.value) == "Annotated" and isinstance(annotation.slice, ast.Tuple):
+        return list(annotation.slice.elts[1:])
+    return []
+
+
+def _required_description(required: bool, default: Optional[ast.AST], description: Optional[str] = None) -> str:
+    parts = [description.strip().rstrip(".") + "."] if description and description.strip() else []
+    if required:
+        parts.append("Required.")
+    elif default is not None and not (isinstance(default, ast.Constant) and default.value is None):
+        parts.append(f"Defaults to `{ast.unparse(default)}`.")
+    else:
+        parts.append("Optional.")
+    return " ".join(parts)
+
+
+class ModelIndex:
+    """The classes defined at the top level of a module, for expanding models into JSON schemas."""
+
+    def __init__(self, tree: Optional[ast.AST]) -> None:
+        self.classes: Dict[str, ast.ClassDef] = {}
+        if isinstance(tree, ast.Module):
+            for node in tree.body:
+                if isinstance(node, ast.ClassDef):
+                    self.classes.setdefault(node.name, node)
+
+    def enum_values(self, name: str) -> Optional[List]:
+        """Member values of an Enum class of the module, or None if `name` is not one."""
+        node = self.classes.get(name)
+        if node is None or not any((_name(b) or "").endswith("Enum") for b in node.bases):
+            return None
+        return [stmt.value.value for stmt in node.body
+                if isinstance(stmt, ast.Assign) and isinstance(stmt.value, ast.Constant)]
+
+    def _fields(self, node: ast.ClassDef, seen: Set[str]) -> List[ast.AnnAssign]:
+        fields: List[ast.AnnAssign] = []
+        for base in node.bases:
+            base_node = self.classes.get(_name(base) or "")
+            if base_node is not None and base_node.name not in seen:
+                seen.add(base_node.name)
+                fields.extend(self._fields(base_node, seen))
+        for stmt in node.body:
+            if (isinstance(stmt, ast.AnnAssign) and isinstance(stmt.target, ast.Name)
+                    and not stmt.target.id.startswith("_") and _generic_name(stmt.annotation) != "ClassVar"):
+                fields.append(stmt)
+        return fields
+
+    def model_schema(self, name: str, depth: int = 0) -> Dict:
+        node = self.classes.get(name)
+        if node is None or depth >= MAX_MODEL_DEPTH:
+            # Defined in another module, or nested too deep: refer to it by name
+            return {"title": name, "type": "object"}
+        properties: Dict[str, Dict] = {}
+        required: List[str] = []
+        for stmt in self._fields(node, {name}):
+            field = stmt.target.id
+            schema = self.schema(stmt.annotation, depth + 1)
+            default = stmt.value
+            if _call_name(default) == "Field":
+                description = _string(_keyword(default, "description"))
+                if description:
+                    schema = {**schema, "description": description}
+                factory = _keyword(default, "default_factory")
+                default = default.args[0] if default.args else _keyword(default, "default") or factory
+            properties[field] = schema
+            if default is None or (isinstance(default, ast.Constant) and default.value is Ellipsis):
+                required.append(field)
+        return {"title": name, **object_schema(properties, required)}
+
+    def schema(self, annotation: Optional[ast.AST], depth: int = 0) -> Dict:
+        """JSON schema of a field annotation."""
+        annotation = unwrap(annotation)
+        if isinstance(annotation, ast.Subscript):
+            outer = JSON_TYPES.get(_name(annotation.value) or "")
+            args = annotation.slice.elts if isinstance(annotation.slice, ast.Tuple) else [annotation.slice]
+            if outer == "array":
+                return {"type": "array", "items": self.schema(args[0], depth)}
+            if outer == "object":
+                return {"type": "object"}
+            if _name(annotation.value) == "Literal":
+                return {"enum": [a.value for a in args if isinstance(a, ast.Constant)]}
+            return {}
+        name = _name(annotation)
+        if name is None:
+            return {}
+        if name in JSON_TYPES:
+            return {"type": JSON_TYPES[name]}
+        values = self.enum_values(name)
+        if values is not None:
+            return {"enum": values}
+        if name in self.classes:
+            return self.model_schema(name, depth)
+        return {"title": name, "type": "object"} if name[:1].isupper() and name not in ("Any", "None") else {}
+
+
+def fastapi_details(node: ast.FunctionDef, path: str, models: ModelIndex) -> Dict:
+    """Query parameters and request body of a FastAPI path operation, from its signature."""
+    path_params = set(_PATH_PARAM_RE.findall(path or ""))
+    args = node.args
+    positional = args.posonlyargs + args.args
+    defaults: List[Optional[ast.AST]] = [None] * (len(positional) - len(args.defaults)) + list(args.defaults)
+    params = list(zip(positional, defaults)) + list(zip(args.kwonlyargs, args.kw_defaults))
+
+    query: List[Dict] = []
+    body_fields: Dict[str, Dict] = {}
+    body_required: List[str] = []
+    model_params: List[Tuple[str, str, bool]] = []
+    form = False
+    for arg, default in params:
+        if arg.arg in ("self", "cls"):
+            continue
+        # Annotated[T, Query(...)] = default, or T = Query(default)
+        marker = next((m for m in _annotated_metadata(arg.annotation) if _call_name(m) in FASTAPI_PARAMS), None)
+        if marker is None and _call_name(default) in FASTAPI_PARAMS:
+            marker, default = default, (default.args[0] if default.args else _keyword(default, "default"))
+        kind = _call_name(marker)
+        type_name = _name(unwrap(arg.annotation))
+        if kind in FASTAPI_SKIPPED or type_name in FASTAPI_INJECTED or arg.arg in path_params:
+            continue
+        required = default is None or (isinstance(default, ast.Constant) and default.value is Ellipsis)
+        description = _string(_keyword(marker, "description")) if marker is not None else None
+        name = (_string(_keyword(marker, "alias")) if marker is not None else None) or arg.arg
+
+        if kind == "Body" or kind in FASTAPI_FORM or type_name in FASTAPI_FORM:
+            form = form or kind in FASTAPI_FORM or type_name in FASTAPI_FORM
+            schema = models.schema(arg.annotation)
+            if type_name == "UploadFile" or kind == "File":
+                schema = {"type": "string", "format": "binary"}
+            if description:
+                schema = {**schema, "description": description}
+            body_fields[name] = schema
+            if required:
+                body_required.append(name)
+            continue
+
+        json_type = annotation_type(arg.annotation)
+        enum = models.enum_values(type_name) if type_name else None
+        if kind != "Query" and json_type is None and enum is None and type_name and type_name[:1].isupper():
+            # A class that is neither a scalar nor an enum: a Pydantic model read from the JSON body
+            model_params.append((name, type_name, required))
+            continue
+        if json_type is None:
+            json_type = "string" if enum is not None else value_type(default) or "string"
+        query.append({"name": name, "description": _required_description(required, default, description), "type": json_type})
+
+    if not model_params and not body_fields:
+        return make_details(query, dict(NO_BODY))
+    if len(model_params) == 1 and not body_fields:
+        # A single model is the whole body
+        _, model, _ = model_params[0]
+        body = {"description": f"JSON object matching the `{model}` model.", "schema": models.model_schema(model)}
+        return make_details(query, body)
+    for name, model, required in model_params:
+        # Several body parameters are embedded under their names
+        body_fields[name] = models.model_schema(model)
+        if required:
+            body_required.append(name)
+    description = "Form data." if form else "JSON object with one property per body parameter."
+    return make_details(query, {"description": description, "schema": object_schema(body_fields, body_required)})
+
+
+# Flask request attributes holding the body, and how they are described
+FLASK_BODIES = {"json": "JSON body.", "form": "Form data.", "files": "Uploaded files.", "values": "Form data or query string."}
+FLASK_BODY_CALLS = {"get_json": "json"}
+
+
+def _flask_body_kind(node: ast.AST, variables: Dict[str, str]) -> Optional[str]:
+    """Which body `node` reads: `request.json`, `request.get_json()`, or a variable assigned from one."""
+    if isinstance(node, ast.Name):
+        return variables.get(node.id)
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and _name(node.func.value) == "request":
+        return FLASK_BODY_CALLS.get(node.func.attr)
+    if isinstance(node, ast.Attribute) and _name(node.value) == "request" and node.attr in FLASK_BODIES:
+        return node.attr
+    if isinstance(node, ast.BoolOp):
+        # `request.get_json() or {}`
+        return next((k for k in (_flask_body_kind(v, variables) for v in node.values) if k), None)
+    return None
+
+
+def _is_request_args(node: ast.AST) -> bool:
+    return isinstance(node, ast.Attribute) and node.attr == "args" and _name(node.value) == "request"
+
+
+def flask_details(node: ast.FunctionDef, source: Optional[str] = None) -> Dict:
+    """Query parameters and body fields a Flask view reads from `request`."""
+    if source is not None and "request" not in source:
+        # Most views never touch the request; skip walking their bodies
+        return make_details([], dict(NO_BODY))
+    # One walk collects the body variables and the nodes that may read the
+    # request; the reads are resolved afterwards, once every variable is known
+    variables: Dict[str, str] = {}
+    reads: List[ast.AST] = []
+    for sub in ast_nodes(node):
+        if isinstance(sub, ast.Assign):
+            kind = _flask_body_kind(sub.value, {})
+            if kind:
+                for target in sub.targets:
+                    if isinstance(target, ast.Name):
+                        variables[target.id] = kind
+        elif isinstance(sub, ast.Subscript) or (isinstance(sub, ast.Call) and isinstance(sub.func, ast.Attribute)):
+            reads.append(sub)
+        elif isinstance(sub, ast.Attribute) and _name(sub.value) == "request":
+            reads.append(sub)
+
+    query: Dict[str, Dict] = {}
+    fields: Dict[str, Dict] = {}
+    required: List[str] = []
+    kinds: List[str] = []
+    for sub in reads:
+        # request.args["x"] / data["x"]
+        if isinstance(sub, ast.Subscript) and isinstance(sub.ctx, ast.Load):
+            key = _string(sub.slice)
+            if key is None:
+                continue
+            if _is_request_args(sub.value):
+                query.setdefault(key, {"name": key, "description": "Required.", "type": "string"})
+            else:
+                kind = _flask_body_kind(sub.value, variables)
+                if kind:
+                    kinds.append(kind)
+                    fields.setdefault(key, {})
+                    if key not in required:
+                        required.append(key)
+        elif isinstance(sub, ast.Call) and isinstance(sub.func, ast.Attribute) and sub.args:
+            key = _string(sub.args[0])
+            owner, method = sub.func.value, sub.func.attr
+            if key is None or method not in ("get", "getlist"):
+                kind = _flask_body_kind(sub, {})
+                if kind:
+                    kinds.append(kind)
+                continue
+            default = sub.args[1] if len(sub.args) > 1 else _keyword(sub, "default")
+            if _is_request_args(owner):
+                if method == "getlist":
+                    json_type = "array"
+                else:
+                    json_type = JSON_TYPES.get(_name(_keyword(sub, "type")) or "") or value_type(default) or "string"
+                query[key] = {"name": key, "description": _required_description(False, default), "type": json_type}
+            else:
+                kind = _flask_body_kind(owner, variables)
+                if kind:
+                    kinds.append(kind)
+                    json_type = value_type(default)
+                    fields.setdefault(key, {"type": json_type} if json_type else {})
+        elif isinstance(sub, (ast.Attribute, ast.Call)):
+            kind = _flask_body_kind(sub, {})
+            if kind:
+                kinds.append(kind)
+
+    if not kinds:
+        return make_details(list(query.values()), dict(NO_BODY))
+    description = FLASK_BODIES[max(set(kinds), key=kinds.count)]
+    if not fields:
+        body = {"description": description + " Its fields are not read individually by the handler.", "schema": {"type": "object"}}
+    else:
+        body = {"description": description, "schema": object_schema(fields, required)}
+    return make_details(list(query.values()), body)
+
+
+def _js_request_names(tokens: List[Tuple[str, int, int]], text: str) -> Set[str]:
+    """`req` plus the first parameter name of each function in the handler source."""
+    names = {"req", "request"}
+    for i, (kind, start, end) in enumerate(tokens):
+        if kind == "arrow" and i and tokens[i - 1][0] == "name":
+            names.add(text[tokens[i - 1][1]:tokens[i - 1][2]])  # req => ...
+        elif kind == "punct" and text[start] == "(" and i + 1 < len(tokens) and tokens[i + 1][0] == "name":
+            prev = text[tokens[i - 1][1]:tokens[i - 1][2]] if i else ""
+            if prev in ("function", "async") or (i >= 2 and text[tokens[i - 2][1]:tokens[i - 2][2]] == "function"):
+                names.add(text[tokens[i + 1][1]:tokens[i + 1][2]])
+    return names
+
+
+def _js_destructured(tokens: List[Tuple[str, int, int]], text: str, close: int) -> List[str]:
+    """Property names of the object pattern `{ a, b: c, d = 1 }` whose closing brace is token `close`."""
+    depth = 0
+    open_idx = close
+    for open_idx in range(close, -1, -1):
+        kind, start, _ = tokens[open_idx]
+        if kind == "punct" and text[start] in ")]}":
+            depth += 1
+        elif kind == "punct" and text[start] in "([{":
+            depth -= 1
+            if depth == 0:
+                break
+    names: List[str] = []
+    depth = 0
+    expect = True
+    for kind, start, end in tokens[open_idx + 1:close]:
+        value = text[start:end]
+        if kind == "punct" and value in "([{":
+            depth += 1
+        elif kind == "punct" and value in ")]}":
+            depth -= 1
+        elif depth == 0 and value == ",":
+            expect = True
+            continue
+        elif depth == 0 and expect and kind in ("name", "str"):
+            names.append(value.strip("'\""))
+        expect = False
+    return names
+
+
+def _js_code_tokens(text: str, start: int = 0, end: Optional[int] = None) -> List[Token]:
+    """
+    Tokens of `text[start:end]`, each template literal preceded by the tokens
+    of its `${...}` expressions, so code inside templates is seen too.
+    """
+    tokens: List[Token] = []
+    for kind, s, e in tokenize(text[start:end] if start or end is not None else text):
+        if kind == "tmpl":
+            for sub_start, sub_end in template_substitutions(text, start + s):
+                tokens.extend(_js_code_tokens(text, sub_start, sub_end))
+        tokens.append((kind, start + s, start + e))
+    return tokens
+
+
+def express_details(source: str) -> Dict:
+    """Query parameters and body fields Express handlers read from `req.query` and `req.body`."""
+    tokens = _js_code_tokens(source)
+    text = source
+    requests = _js_request_names(tokens, text)
+
+    def value(i: int) -> str:
+        return text[tokens[i][1]:tokens[i][2]] if 0 <= i < len(tokens) else ""
+
+    def kind_of(i: int) -> str:
+        return tokens[i][0] if 0 <= i < len(tokens) else ""
+
+    found: Dict[str, List[str]] = {"query": [], "body": []}
+    whole = {"query": False, "body": False}
+    for i, (kind, _, _) in enumerate(tokens):
+        if kind != "name" or value(i) not in requests or value(i + 1) != "." or value(i + 2) not in found:
+            continue
+        part = value(i + 2)
+        # req.body.name, req.body?.name, req.body["name"]
+        member = i + 5 if value(i + 3) == "?" and value(i + 4) == "." else i + 4
+        if value(member - 1) == "." and kind_of(member) == "name":
+            found[part].append(value(member))
+        elif value(i + 3) == "[" and kind_of(i + 4) == "str" and value(i + 5) == "]":
+            found[part].append(value(i + 4)[1:-1])
+        elif value(i - 1) == "=" and value(i - 2) == "}":
+            # const { a, b } = req.query
+            found[part].extend(_js_destructured(tokens, text, i - 2))
+        else:
+            whole[part] = True
+
+    query = [{"name": name, "description": "", "type": "string"} for name in dict.fromkeys(found["query"])]
+    fields = list(dict.fromkeys(found["body"]))
+    if fields:
+        body = {"description": "JSON body.", "schema": object_schema({name: {} for name in fields}, [])}
+    elif whole["body"]:
+        body = {"description": "JSON body, used as a whole; its fields are not read individually by the handler.",
+                "schema": {"type": "object"}}
+    else:
+        body = dict(NO_BODY)
+    return make_details(query, body)
@@ -0,0 +1,353 @@
+from __future__ import annotations
+import ast
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from Apimatic.scanner import SourceFile
+from Apimatic.utils import decode_source, iter_files
+
+ROOT_URLCONF_RE = re.compile(r"""^ROOT_URLCONF\s*=\s*['"]([\w.]+)['"]""", re.MULTILINE)
+
+# URL pattern constructors; `url` is the pre-2.0 alias of `re_path`
+PATTERN_FUNCS = {"path", "re_path", "url"}
+
+MAX_INCLUDE_DEPTH = 10
+
+# Stands for a URLconf module's `urlpatterns` list
+URLPATTERNS = ast.Name(id="urlpatterns", ctx=ast.Load())
+
+
+class Module:
+    """One parsed Python module: its top-level definitions, imports and assignments."""
+
+    __slots__ = ("name", "sf", "is_package", "defs", "imports", "assigns")
+
+    def __init__(self, name: str, sf: SourceFile, is_package: bool) -> None:
+        self.name = name
+        self.sf = sf
+        self.is_package = is_package
+        # name -> first top-level function or class node
+        self.defs: Dict[str, ast.AST] = {}
+        # local name -> (dotted module, imported attribute or None for the module itself)
+        self.imports: Dict[str, Tuple[str, Optional[str]]] = {}
+        # name -> values assigned at module level, in order; `+=` appends, `=` restarts
+        self.assigns: Dict[str, List[ast.expr]] = {}
+        if sf.tree is not None:
+            self._index(sf.tree)
+
+    def _package(self, level: int) -> str:
+        parts = self.name.split(".")
+        if not self.is_package:
+            parts = parts[:-1]
+        return ".".join(parts[:len(parts) - (level - 1)] if level > 1 else parts)
+
+    def _index(self, tree: ast.Module) -> None:
+        for node in tree.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                self.defs.setdefault(node.name, node)
+            elif isinstance(node, ast.Import):
+                for alias in node.names:
+                    if alias.asname:
+                        self.imports[alias.asname] = (alias.name, None)
+                    else:
+                        top = alias.name.split(".")[0]
+                        self.imports[top] = (top, None)
+            elif isinstance(node, ast.ImportFrom):
+                base = node.module or ""
+                if node.level:
+                    package = self._package(node.level)
+                    base = f"{package}.{base}".strip(".") if base else package
+                for alias in node.names:
+                    if alias.name != "*":
+                        self.imports[alias.asname or alias.name] = (base, alias.name)
+            elif isinstance(node, ast.Assign):
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        self.assigns[target.id] = [node.value]
+            elif isinstance(node, ast.AugAssign) and isinstance(node.target, ast.Name):
+                self.assigns.setdefault(node.target.id, []).append(node.value)
+
+
+# What a dotted reference resolves to: a module, or a definition inside one
+Target = Union[Module, Tuple[Module, ast.AST]]
+
+
+class ModuleIndex:
+    """
+    Maps dotted module names under a source root to files, parsing each module
+    at most once and resolving names through its imports.
+    """
+
+    def __init__(self, base: Path, files: List[Path]) -> None:
+        self.base = base
+        self.paths: Dict[str, Path] = {}
+        self._modules: Dict[str, Optional[Module]] = {}
+        # Every module name looked up, found or not, since the last `requested.clear()`
+        self.requested: Set[str] = set()
+        for path in files:
+            try:
+                parts = list(path.relative_to(base).with_suffix("").parts)
+            except ValueError:
+                continue
+            if parts[-1] == "__init__":
+                parts.pop()
+            if parts:
+                self.paths.setdefault(".".join(parts), path)
+        # Directories without __init__.py are still importable as namespace packages
+        self._namespaces = {name.rsplit(".", 1)[0] for name in self.paths if "." in name}
+
+    def module(self, name: str) -> Optional[Module]:
+        self.requested.add(name)
+        if name not in self._modules:
+            mod = None
+            path = self.paths.get(name)
+            if path is not None:
+                try:
+                    data = path.read_bytes()
+                    mod = Module(name, SourceFile(path, self.base, decode_source(data), data), path.stem == "__init__")
+                except OSError:
+                    mod = None
+            elif name in self._namespaces:
+                mod = Module(name, SourceFile(self.base.joinpath(*name.split(".")), self.base, ""), True)
+            self._modules[name] = mod
+        return self._modules[name]
+
+    def files_of(self, names: Iterable[str]) -> Set[Path]:
+        """
+        The files modules `names` were read from; for names that are not a
+        module file, the files that would define them if they were created.
+        """
+        files: Set[Path] = set()
+        for name in names:
+            path = self.paths.get(name)
+            if path is not None:
+                files.add(path)
+            else:
+                rel = self.base.joinpath(*name.split("."))
+                files.update((rel.with_suffix(".py"), rel / "__init__.py"))
+        return files
+
+    def lookup(self, mod: Module, name: str, depth: int = 0) -> Optional[Target]:
+        """Resolves a top-level name of `mod`, following `import`/`from ... import` bindings."""
+        if name in mod.defs:
+            return mod, mod.defs[name]
+        if name not in mod.imports or depth > MAX_INCLUDE_DEPTH:
+            # `import pkg.views` makes `pkg.views` reachable as an attribute of `pkg`
+            return self.module(f"{mod.name}.{name}") if mod.is_package else None
+        target, attr = mod.imports[name]
+        if attr is None:
+            return self.module(target)
+        # `from pkg import views` binds a submodule; `from .views import index` a definition
+        sub = self.module(f"{target}.{attr}")
+        if sub is not None:
+            return sub
+        source = self.module(target)
+        return self.lookup(source, attr, depth + 1) if source is not None else None
+
+    def resolve(self, mod: Module, dotted: str) -> Optional[Target]:
+        """Resolves `name.attr.attr` as seen from `mod`."""
+        head, *rest = dotted.split(".")
+        target = self.lookup(mod, head)
+        for attr in rest:
+            if isinstance(target, Module):
+                target = self.lookup(target, attr)
+            elif target is not None and isinstance(target[1], ast.ClassDef):
+                owner, cls = target
+                node = next((n for n in cls.body if getattr(n, "name", None) == attr), None)
+                target = (owner, node) if node is not None else None
+            else:
+                return None
+        return target
+
+
+def dotted_name(node: ast.expr) -> Optional[str]:
+    """`views.Index.as_view()` -> "views.Index"; `a.b.c` -> "a.b.c"; anything else -> None."""
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "as_view":
+        node = node.func.value
+    parts: List[str] = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+def _call_name(node: ast.expr) -> Optional[str]:
+    if not isinstance(node, ast.Call):
+        return None
+    func = node.func
+    if isinstance(func, ast.Name):
+        return func.id
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    return None
+
+
+def _route_string(call: ast.Call, func: str) -> Optional[str]:
+    if not call.args or not isinstance(call.args[0], ast.Constant) or not isinstance(call.args[0].value, str):
+        return None
+    route = call.args[0].value
+    if func != "path":
+        route = route.lstrip("^").rstrip("$")
+    return route
+
+
+def is_settings_module(path: Path) -> bool:
+    return path.name == "settings.py" or path.parent.name == "settings"
+
+
+def root_urlconf(text: str) -> Optional[str]:
+    """The ROOT_URLCONF a settings module's source sets, if any."""
+    match = ROOT_URLCONF_RE.search(text)
+    return match.group(1) if match else None
+
+
+def find_root_urlconfs(files: List[Path]) -> List[Tuple[Path, str]]:
+    """(settings file, ROOT_URLCONF) for every settings module that sets one."""
+    found: List[Tuple[Path, str]] = []
+    for path in files:
+        if not is_settings_module(path):
+            continue
+        try:
+            data = path.read_bytes()
+        except OSError:
+            continue
+        if b"ROOT_URLCONF" not in data:
+            continue
+        urlconf = root_urlconf(decode_source(data))
+        if urlconf:
+            found.append((path, urlconf))
+    return found
+
+
+def _import_base(settings: Path, urlconf: str, root: Path) -> Path:
+    """The directory the project's dotted module names are relative to (where manage.py usually lives)."""
+    rel = Path(*urlconf.split("."))
+    for base in settings.parents:
+        if (base / rel).with_suffix(".py").is_file() or (base / rel / "__init__.py").is_file():
+            return base
+        if base == root:
+            break
+    return root
+
+
+class URLResolver:
+    """Walks `urlpatterns` from a root URLconf, composing `include()` prefixes."""
+
+    def __init__(self, index: ModuleIndex) -> None:
+        self.index = index
+
+    def patterns(self, mod: Module, node: ast.expr, seen: Set[str]) -> Iterator[Tuple[Module, ast.expr]]:
+        """The pattern expressions of a list, `a + b`, or a module-level name bound to them."""
+        if isinstance(node, (ast.List, ast.Tuple)):
+            for elt in node.elts:
+                yield mod, elt
+        elif isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+            yield from self.patterns(mod, node.left, seen)
+            yield from self.patterns(mod, node.right, seen)
+        elif isinstance(node, ast.Name) and f"{mod.name}:{node.id}" not in seen:
+            seen = seen | {f"{mod.name}:{node.id}"}
+            for value in mod.assigns.get(node.id, []):
+                yield from self.patterns(mod, value, seen)
+
+    def _included(self, mod: Module, arg: ast.expr) -> Optional[Tuple[Module, ast.expr]]:
+        """The (module, pattern list) an `include()` argument refers to."""
+        if isinstance(arg, ast.Tuple) and arg.elts:
+            arg = arg.elts[0]
+        if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+            target = self.index.module(arg.value)
+        elif isinstance(arg, (ast.List, ast.BinOp)):
+            return mod, arg
+        elif isinstance(arg, ast.Name) and arg.id in mod.assigns:
+            return mod, arg
+        else:
+            dotted = dotted_name(arg)
+            target = self.index.resolve(mod, dotted) if dotted else None
+        if isinstance(target, Module):
+            return target, URLPATTERNS
+        return None
+
+    def walk(self, urlconf: str) -> Iterator[Tuple[str, Module, ast.AST]]:
+        """Yields (full route, module, view node) for every view reachable from `urlconf`."""
+        mod = self.index.module(urlconf)
+        if mod is not None:
+            yield from self._walk(mod, URLPATTERNS, "", {mod.name}, 0)
+
+    def _walk(self, mod: Module, node: ast.expr, prefix: str, stack: Set[str], depth: int) -> Iterator[Tuple[str, Module, ast.AST]]:
+        for owner, entry in self.patterns(mod, node, set()):
+            func = _call_name(entry)
+            if func not in PATTERN_FUNCS or len(entry.args) < 2:
+                continue
+            route = _route_string(entry, func)
+            if route is None:
+                continue
+            view = entry.args[1]
+            if _call_name(view) == "include" and view.args:
+                included = self._included(owner, view.args[0])
+                if included is None or depth >= MAX_INCLUDE_DEPTH:
+                    continue
+                target, patterns = included
+                # An included URLconf already being walked would recurse forever
+                if patterns is URLPATTERNS and target.name in stack:
+                    continue
+                yield from self._walk(target, patterns, prefix + route, stack | {target.name}, depth + 1)
+                continue
+            dotted = dotted_name(view)
+            resolved = self.index.resolve(owner, dotted) if dotted else None
+            if isinstance(resolved, tuple):
+                view_mod, view_node = resolved
+                yield prefix + route, view_mod, view_node
+
+
+# (full route, file of the view, view node) of one resolved route
+Route = Tuple[str, SourceFile, ast.AST]
+
+
+def resolve_settings_urlconf(
+    settings: Path, urlconf: str, root: Path, files: List[Path], indexes: Dict[Path, ModuleIndex],
+) -> Tuple[List[Route], Set[Path]]:
+    """
+    The routes reachable from the ROOT_URLCONF `urlconf` of `settings`, and
+    the files they were resolved from, including those of modules looked up
+    but missing, whose creation would change the result. `indexes` holds the
+    ModuleIndex of each import base and may be shared between calls.
+    """
+    base = _import_base(settings, urlconf, root)
+    if base not in indexes:
+        indexes[base] = ModuleIndex(base, files)
+    index = indexes[base]
+    index.requested.clear()
+    routes: List[Route] = []
+    seen: Set[Tuple[str, str, int]] = set()
+    for route, mod, node in URLResolver(index).walk(urlconf):
+        key = (route, str(mod.sf.path), id(node))
+        if key not in seen:
+            seen.add(key)
+            routes.append((route, mod.sf, node))
+    return routes, index.files_of(index.requested)
+
+
+def resolve_urlconf_views(root: Path, exclude: Tuple[str, ...] = ()) -> Optional[List[Route]]:
+    """
+    Resolves the project's URL routing from its settings' ROOT_URLCONF.
+    Returns (full route, file of the view, view node) per route, or None if no
+    settings module under `root` sets ROOT_URLCONF.
+    """
+    files = iter_files(root, (".py",), exclude)
+    confs = find_root_urlconfs(files)
+    if not confs:
+        return None
+
+    indexes: Dict[Path, ModuleIndex] = {}
+    routes: List[Route] = []
+    seen: Set[Tuple[str, str, int]] = set()
+    for settings, urlconf in confs:
+        for route, sf, node in resolve_settings_urlconf(settings, urlconf, root, files, indexes)[0]:
+            key = (route, str(sf.path), id(node))
+            if key not in seen:
+                seen.add(key)
+                routes.append((route, sf, node))
+    return routes
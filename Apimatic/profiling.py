@@ -0,0 +1,132 @@
+from __future__ import annotations
+import contextlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+# Files listed under "slowest files" by default
+DEFAULT_TOP_FILES = 10
+# Count columns of the phase table that come first, in this order
+COLUMNS = ("files", "cached", "endpoints")
+
+
+class FileTiming(NamedTuple):
+    """How long one file took to extract: `start` is a `time.perf_counter()` reading."""
+    path: str
+    start: float
+    seconds: float
+    pid: int
+
+
+class Phase:
+    """One timed phase of a run, possibly nested in another."""
+
+    __slots__ = ("name", "depth", "start", "wall", "cpu", "counts")
+
+    def __init__(self, name: str, depth: int, start: float) -> None:
+        self.name = name
+        self.depth = depth
+        self.start = start
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.counts: Dict[str, int] = {}
+
+
+def cpu_time() -> float:
+    """CPU seconds of this process and of its finished child processes, e.g. parsing workers."""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+class Profiler:
+    """
+    Records the wall and CPU time of the phases of a `generate` run and the
+    extraction time of every parsed file.
+
+    A disabled profiler (the default) records nothing, so code can time its
+    phases unconditionally. Perf-counter readings are comparable across the
+    parsing workers, so per-file timings land on the same clock as the phases
+    and both can be written as one Chrome trace.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.phases: List[Phase] = []
+        self.files: List[FileTiming] = []
+        # Framework -> (files with routes, endpoints)
+        self.frameworks: Dict[str, Tuple[int, int]] = {}
+        self.origin = time.perf_counter()
+        self._depth = 0
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[Optional[Phase]]:
+        """Times the enclosed block as phase `name`; counts can be added to the yielded phase."""
+        if not self.enabled:
+            yield None
+            return
+        phase = Phase(name, self._depth, time.perf_counter())
+        self.phases.append(phase)
+        self._depth += 1
+        cpu0 = cpu_time()
+        try:
+            yield phase
+        finally:
+            self._depth -= 1
+            phase.wall = time.perf_counter() - phase.start
+            phase.cpu = cpu_time() - cpu0
+
+    def record_files(self, timings: List[FileTiming]) -> None:
+        if self.enabled:
+            with self._lock:
+                self.files.extend(timings)
+
+    def count_framework(self, name: str, endpoints: Sequence[Mapping]) -> None:
+        if self.enabled:
+            self.frameworks[name] = (len({ep.get("file") for ep in endpoints}), len(endpoints))
+
+    def slowest_files(self, n: int = DEFAULT_TOP_FILES) -> List[FileTiming]:
+        return sorted(self.files, key=lambda t: t.seconds, reverse=True)[:n]
+
+    def report(self, top: int = DEFAULT_TOP_FILES) -> str:
+        """The phase table, followed by the counts per framework and the `top` slowest files."""
+        keys = {key for phase in self.phases for key in phase.counts}
+        columns = [c for c in COLUMNS if c in keys] + sorted(keys - set(COLUMNS))
+        width = max([len("phase")] + [2 * p.depth + len(p.name) for p in self.phases])
+        lines = [f"{'phase':<{width}} {'wall':>9} {'cpu':>9}" + "".join(f" {c:>9}" for c in columns)]
+        for p in self.phases:
+            label = "  " * p.depth + p.name
+            counts = "".join(f" {p.counts[c]:>9}" if c in p.counts else f" {'':>9}" for c in columns)
+            lines.append(f"{label:<{width}} {p.wall * 1000:>7.1f}ms {p.cpu * 1000:>7.1f}ms{counts}")
+        if self.frameworks:
+            lines.append("")
+            for name, (files, endpoints) in self.frameworks.items():
+                lines.append(f"{name}: {endpoints} endpoints in {files} files")
+        slowest = self.slowest_files(top)
+        if slowest:
+            lines.append("")
+            lines.append(f"Slowest {len(slowest)} of {len(self.files)} parsed files:")
+            for t in slowest:
+                lines.append(f"  {t.seconds * 1000:>7.1f}ms  {t.path}")
+        return "\n".join(lines)
+
+    def trace_events(self) -> List[Dict]:
+        """Phases and file extractions as Chrome trace events (complete events, in microseconds)."""
+        main = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": main, "args": {"name": "apimatic"}}]
+        for p in self.phases:
+            events.append({"name": p.name, "cat": "phase", "ph": "X", "pid": main, "tid": 0,
+                           "ts": round((p.start - self.origin) * 1e6, 1), "dur": round(p.wall * 1e6, 1),
+                           "args": dict(p.counts, cpu_ms=round(p.cpu * 1000, 2))})
+        for t in self.files:
+            events.append({"name": t.path, "cat": "file", "ph": "X", "pid": main, "tid": t.pid,
+                           "ts": round((t.start - self.origin) * 1e6, 1), "dur": round(t.seconds * 1e6, 1)})
+        return events
+
+    def write_trace(self, path: Path) -> None:
+        """Writes the trace-event JSON that chrome://tracing and Perfetto open."""
+        Path(path).write_text(json.dumps({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}),
+                              encoding="utf-8")
@@ -0,0 +1,52 @@
+from __future__ import annotations
+import importlib
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator
+
+
+class LazyRegistry(Mapping):
+    """
+    Maps names to objects given as "package.module:attribute" strings, importing
+    each module only the first time one of its names is looked up.
+
+    Keeps parsers and AI providers, and the SDKs they pull in, out of the
+    CLI's start-up: `Apimatic --help` or a plain `generate` imports none of
+    them. Import errors surface at lookup, i.e. when the feature is used.
+    """
+
+    def __init__(self, entries: Dict[str, str]) -> None:
+        self._entries = dict(entries)
+        self._loaded: Dict[str, Any] = {}
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._loaded:
+            module, _, attr = self._entries[name].partition(":")
+            self._loaded[name] = getattr(importlib.import_module(module), attr)
+        return self._loaded[name]
+
+    def __contains__(self, name: object) -> bool:
+        # Without this, Mapping would import the module to answer `in`
+        return name in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# LLM enhancers, called as enhancer(endpoints, <model keyword>=..., concurrency=, cache=, batch_size=, batch_tokens=, limits=, static_only=, telemetry=)
+ENHANCERS = LazyRegistry({
+    "ollama": "Apimatic.usedAllAI.ollama:enhance_with_ollama",
+    "openai": "Apimatic.usedAllAI.openAI:enhance_with_openai",
+    "gemini": "Apimatic.usedAllAI.googleGemini:enhance_with_gemini",
+    "groq": "Apimatic.usedAllAI.groq:enhance_with_groq",
+    "openai-compatible": "Apimatic.usedAllAI.providers:enhance_with_openai_compatible",
+})
+
+# Functions that store a provider's API key
+KEY_UPDATERS = LazyRegistry({
+    "openai": "Apimatic.usedAllAI.openAI:update_api_key",
+    "gemini": "Apimatic.usedAllAI.googleGemini:update_api_key",
+    "groq": "Apimatic.usedAllAI.groq:update_api_key",
+})
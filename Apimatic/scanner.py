@@ -0,0 +1,383 @@
+from __future__ import annotations
+import ast
+import bisect
+import os
+import re
+import sys
+import time
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from Apimatic.cache import ExtractionCache, content_hash
+from Apimatic.discovery import discover_files
+from Apimatic.endpoint import Endpoint, Handler
+from Apimatic.profiling import FileTiming, Profiler
+from Apimatic.utils import ast_nodes, decode_source
+
+# Bump whenever a matcher's output changes, so cached extractions are discarded.
+PARSER_VERSION = 5
+
+# Below this many files to extract, a process pool costs more than it saves
+MIN_CHUNK_SIZE = 32
+
+# (results by matcher name, content hash, dependency paths, prefiltered out,
+#  (perf-counter start, seconds, process id) of the extraction) of one extracted file
+Extraction = Tuple[Dict[str, List[Endpoint]], str, List[Path], bool, Tuple[float, float, int]]
+
+
+class ScanStats:
+    """Counters of a scan: files looked at, served from cache, prefiltered out and parsed."""
+
+    def __init__(self) -> None:
+        self.files = 0
+        self.cached = 0
+        self.skipped = 0
+        self.parsed = 0
+
+    def summary(self) -> str:
+        return (
+            f"Scanned {self.files} files: {self.cached} from cache, "
+            f"{self.skipped} skipped by prefilter, {self.parsed} parsed"
+        )
+
+
+class ScanContext:
+    """Settings and counters shared by every parser during one `generate` run."""
+
+    def __init__(
+        self, cache: Optional[ExtractionCache] = None, jobs: int = 1, exclude: Iterable[str] = (),
+        profiler: Optional[Profiler] = None,
+    ) -> None:
+        self.cache = cache
+        self.jobs = jobs
+        self.exclude = tuple(exclude)
+        self.stats = ScanStats()
+        self.profiler = profiler or Profiler()
+        # Project root -> its file listing, taken once per run
+        self._listings: Dict[Path, Tuple[Path, ...]] = {}
+
+    def files(self, root: Path, exts: Tuple[str, ...]) -> List[Path]:
+        """Files under `root` with one of the suffixes `exts`, from the run's shared file listing."""
+        root = Path(root)
+        if root not in self._listings:
+            self._listings[root] = discover_files(root, self.exclude)
+        return [p for p in self._listings[root] if p.suffix in exts]
+
+
+_NEWLINE_RE = re.compile(r"\r\n|\r|\n")
+_NEWLINE_BYTES_RE = re.compile(rb"\r\n|\r|\n")
+
+
+class SourceIndex:
+    """
+    Slices source spans out of a file's text in O(1).
+
+    `ast.get_source_segment` re-splits the whole text into lines on every call,
+    so extracting every function of a file that way is O(functions x file size).
+    This builds the table of line-start offsets once, on first use, and maps a
+    node's `lineno`/`col_offset` (a UTF-8 byte column) to a text offset
+    directly. Lines end at "\r\n", "\r" or "\n", as for the ast module.
+
+    Given the raw bytes the text was decoded from, it also maps text offsets
+    back to byte offsets, so spans can be stored instead of the text itself.
+    """
+
+    __slots__ = ("text", "data", "_starts", "_byte_starts", "_ascii")
+
+    def __init__(self, text: str, data: Optional[bytes] = None) -> None:
+        self.text = text
+        self.data = data
+        self._starts: Optional[List[int]] = None
+        self._byte_starts: Optional[List[int]] = None
+        self._ascii = text.isascii()
+
+    @property
+    def line_starts(self) -> List[int]:
+        """Text offset of the start of each line, plus a final `len(text)` sentinel."""
+        if self._starts is None:
+            self._starts = [0] + [m.end() for m in _NEWLINE_RE.finditer(self.text)]
+            if self._starts[-1] != len(self.text):
+                self._starts.append(len(self.text))
+        return self._starts
+
+    def offset(self, lineno: int, col: int) -> int:
+        """Text offset of 1-based line `lineno`, UTF-8 byte column `col`."""
+        starts = self.line_starts
+        start = starts[min(lineno - 1, len(starts) - 1)]
+        if self._ascii or col == 0:
+            return start + col
+        line = self.text[start:starts[min(lineno, len(starts) - 1)]]
+        if line.isascii():
+            return start + col
+        return start + len(line.encode("utf-8")[:col].decode("utf-8", errors="ignore"))
+
+    def span(self, start: int, end: int) -> str:
+        return self.text[start:end]
+
+    @property
+    def byte_mapped(self) -> bool:
+        """Whether `byte_offset` is available: the raw bytes are known and were valid UTF-8."""
+        if self._byte_starts is None:
+            self._byte_starts = []
+            if self.data is not None:
+                try:
+                    self.data.decode("utf-8")
+                except UnicodeDecodeError:
+                    # Dropped bytes would shift every offset after them
+                    return False
+                self._byte_starts = [0] + [m.end() for m in _NEWLINE_BYTES_RE.finditer(self.data)]
+        return bool(self._byte_starts)
+
+    def byte_offset(self, offset: int) -> int:
+        """Offset in the raw bytes of text offset `offset`; requires `byte_mapped`."""
+        starts = self.line_starts
+        line = bisect.bisect_right(starts, offset) - 1
+        if line >= len(self._byte_starts):
+            line = len(self._byte_starts) - 1
+        start = starts[line]
+        if self._ascii:
+            return self._byte_starts[line] + offset - start
+        return self._byte_starts[line] + len(self.text[start:offset].encode("utf-8"))
+
+    def segment(self, node: ast.AST) -> Optional[str]:
+        """Same result as `ast.get_source_segment(text, node)`, without re-splitting the text."""
+        try:
+            if node.end_lineno is None or node.end_col_offset is None:
+                return None
+            start = self.offset(node.lineno, node.col_offset)
+            end = self.offset(node.end_lineno, node.end_col_offset)
+        except AttributeError:
+            return None
+        return self.text[start:end]
+
+
+class SourceFile:
+    """A scanned file: its text is read once and its AST is parsed at most once."""
+
+    __slots__ = ("path", "root", "text", "data", "deps", "_tree", "_parsed", "_index")
+
+    def __init__(self, path: Path, root: Path, text: str, data: Optional[bytes] = None) -> None:
+        self.path = path
+        self.root = root
+        self.text = text
+        # The raw bytes `text` was decoded from, if known; lets handlers be stored as byte spans
+        self.data = data
+        # Other files the matchers' results for this file were derived from
+        self.deps: Set[Path] = set()
+        self._tree: Optional[ast.AST] = None
+        self._parsed = False
+        self._index: Optional[SourceIndex] = None
+
+    @property
+    def rel(self) -> str:
+        return str(self.path.relative_to(self.root))
+
+    @property
+    def index(self) -> SourceIndex:
+        if self._index is None:
+            self._index = SourceIndex(self.text, self.data)
+        return self._index
+
+    def segment(self, node: ast.AST) -> Optional[str]:
+        """Source text of an AST node of this file."""
+        return self.index.segment(node)
+
+    def ref(self, start: int, end: int) -> Handler:
+        """
+        A handler for text `start:end` of this file: a byte span read back on
+        demand, or the text itself when the file's bytes do not map cleanly.
+        """
+        index = self.index
+        if not index.byte_mapped or start >= end:
+            return self.text[start:end]
+        return (sys.intern(str(self.path)), index.byte_offset(start), index.byte_offset(end))
+
+    def node_ref(self, node: ast.AST) -> Optional[Handler]:
+        """`ref` of an AST node's source, or None if the node has no position."""
+        if getattr(node, "end_lineno", None) is None or getattr(node, "end_col_offset", None) is None:
+            return None
+        index = self.index
+        return self.ref(index.offset(node.lineno, node.col_offset), index.offset(node.end_lineno, node.end_col_offset))
+
+    @property
+    def tree(self) -> Optional[ast.AST]:
+        """The parsed module, or None if the file is not valid Python."""
+        if not self._parsed:
+            self._parsed = True
+            try:
+                self._tree = ast.parse(self.text)
+            except (SyntaxError, ValueError):
+                self._tree = None
+        return self._tree
+
+
+class Matcher:
+    """
+    Base class for a framework's route matcher.
+
+    The scan engine hands every file to `match_file` and, when `uses_ast` is set,
+    every function definition of the file's AST to `match_function`. Matchers are
+    instantiated once per scan, so they may keep per-scan memo state.
+    """
+
+    name: str = ""
+    uses_ast: bool = False
+    # Byte strings of which at least one occurs in every file this matcher can
+    # find routes in. Files containing none are never decoded or parsed for it,
+    # so markers must be conservative. Empty means every file is matched.
+    markers: Tuple[bytes, ...] = ()
+
+    def accepts(self, data: bytes) -> bool:
+        return not self.markers or any(marker in data for marker in self.markers)
+
+    def match_file(self, sf: SourceFile) -> List[Endpoint]:
+        return []
+
+    def match_function(self, sf: SourceFile, node: ast.FunctionDef) -> List[Endpoint]:
+        return []
+
+
+def match_source(sf: SourceFile, matchers: Sequence[Matcher]) -> Dict[str, List[Endpoint]]:
+    """Runs all matchers over one file, walking its AST at most once."""
+    found: Dict[str, List[Endpoint]] = {m.name: [] for m in matchers}
+    for m in matchers:
+        found[m.name].extend(m.match_file(sf))
+
+    ast_matchers = [m for m in matchers if m.uses_ast]
+    if ast_matchers and sf.tree is not None:
+        for node in ast_nodes(sf.tree):
+            if isinstance(node, ast.FunctionDef):
+                for m in ast_matchers:
+                    found[m.name].extend(m.match_function(sf, node))
+    return found
+
+
+def _extract(root: Path, path: Path, matchers: Sequence[Matcher], digest: bool) -> Optional[Extraction]:
+    start = time.perf_counter()
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return None
+    digest_hex = content_hash(data) if digest else ""
+    active = [m for m in matchers if m.accepts(data)]
+    found: Dict[str, List[Endpoint]] = {m.name: [] for m in matchers}
+    if not active:
+        return found, digest_hex, [], True, (start, time.perf_counter() - start, os.getpid())
+
+    sf = SourceFile(path, root, decode_source(data), data)
+    found.update(match_source(sf, active))
+    return found, digest_hex, sorted(sf.deps), False, (start, time.perf_counter() - start, os.getpid())
+
+
+def _extract_chunk(root: Path, paths: List[Path], matchers: Sequence[Matcher], digest: bool) -> List[Optional[Extraction]]:
+    """Process-pool task: extracts a contiguous chunk of files."""
+    return [_extract(root, path, matchers, digest) for path in paths]
+
+
+def default_jobs() -> int:
+    return os.cpu_count() or 1
+
+
+def _extract_all(
+    root: Path, paths: List[Path], matchers: Sequence[Matcher], digest: bool, jobs: int
+) -> List[Optional[Extraction]]:
+    """Extracts `paths` serially or on a process pool; results keep the order of `paths`."""
+    if jobs <= 1 or len(paths) <= MIN_CHUNK_SIZE:
+        return [_extract(root, path, matchers, digest) for path in paths]
+
+    # Imported here: multiprocessing is a large share of the CLI's start-up otherwise
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Several chunks per worker keep the pool balanced when file sizes vary
+    size = max(MIN_CHUNK_SIZE, -(-len(paths) // (jobs * 4)))
+    chunks = [paths[i:i + size] for i in range(0, len(paths), size)]
+    workers = min(jobs, len(chunks))
+    extracted: List[Optional[Extraction]] = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(_extract_chunk, repeat(root), chunks, repeat(matchers), repeat(digest)):
+            extracted.extend(part)
+    return extracted
+
+
+def _display_path(path: Path, root: Path) -> str:
+    try:
+        return str(path.relative_to(root))
+    except ValueError:
+        return str(path)
+
+
+def scan_files(
+    root: Path,
+    files: Iterable[Path],
+    matchers: Sequence[Matcher],
+    ctx: Optional[ScanContext] = None,
+) -> Dict[str, List[Endpoint]]:
+    """
+    Runs all matchers over `files` in a single pass.
+
+    Each file is read and parsed once, and its AST is walked once with every
+    function definition dispatched to all AST matchers. Files whose cache entry
+    is still valid, or whose bytes contain no matcher's markers, are not parsed
+    at all; the rest are spread over `ctx.jobs` worker processes.
+    Results are merged in file order, so the output does not depend on the
+    number of jobs.
+    Returns the endpoints found, keyed by matcher name.
+    """
+    ctx = ctx or ScanContext()
+    cache, stats, profiler = ctx.cache, ctx.stats, ctx.profiler
+    names = [m.name for m in matchers]
+    paths = list(files)
+    per_file: List[Optional[Dict[str, List[Endpoint]]]] = [None] * len(paths)
+
+    misses: List[int] = []
+    with profiler.phase("cache lookup") as phase:
+        for i, path in enumerate(paths):
+            per_file[i] = cache.lookup(path, names) if cache is not None else None
+            if per_file[i] is None:
+                misses.append(i)
+        if phase is not None:
+            phase.counts.update(files=len(paths), cached=len(paths) - len(misses))
+
+    with profiler.phase("extract") as phase:
+        extracted = _extract_all(root, [paths[i] for i in misses], matchers, cache is not None, ctx.jobs)
+        if phase is not None:
+            phase.counts.update(files=len(misses))
+    timings: List[FileTiming] = []
+    for i, extraction in zip(misses, extracted):
+        if extraction is None:
+            continue
+        found, digest, deps, skipped, timing = extraction
+        per_file[i] = found
+        if cache is not None:
+            cache.store(paths[i], digest, found, deps)
+        if skipped:
+            stats.skipped += 1
+        else:
+            stats.parsed += 1
+            if profiler.enabled:
+                timings.append(FileTiming(_display_path(paths[i], root), *timing))
+    profiler.record_files(timings)
+
+    stats.files += len(paths)
+    stats.cached += len(paths) - len(misses)
+
+    results: Dict[str, List[Endpoint]] = {name: [] for name in names}
+    for found in per_file:
+        if found is None:
+            continue
+        for name in names:
+            results[name].extend(found[name])
+    return results
+
+
+def scan_tree(
+    root: Path, exts: Tuple[str, ...], matchers: Sequence[Matcher], ctx: Optional[ScanContext] = None
+) -> Dict[str, List[Endpoint]]:
+    """`scan_files` over every file under `root` with one of the suffixes `exts`."""
+    ctx = ctx or ScanContext()
+    with ctx.profiler.phase("discover files") as phase:
+        files = ctx.files(root, exts)
+        if phase is not None:
+            phase.counts.update(files=len(files))
+    return scan_files(root, files, matchers, ctx)
@@ -0,0 +1,151 @@
+from __future__ import annotations
+from pathlib import Path
+
+SYSTEM_PROMPT = """
+You are an expert software engineer and senior technical writer. Your task is to analyze the provided source code for a single API endpoint and generate a JSON object that accurately documents its functionality, parameters, and request body.
+
+Your response MUST be a valid JSON object that strictly adheres to the following schema. DO NOT include any additional text or markdown outside of the JSON block.
+
+Schema:
+```json
+{
+ "type": "object",
+ "properties": {
+   "logic_explanation": {
+     "type": "string",
+     "description": "Provide a clear, concise, and detailed explanation of the endpoint’s business logic, including the request flow, middleware involvement, and final response handling."
+   },
+   "query_params": {
+     "type": "array",
+     "description": "An array of objects documenting each query parameter.",
+     "items": {
+       "type": "object",
+       "properties": {
+         "name": {"type": "string"},
+         "description": {"type": "string", "description": "Brief description of the parameter's purpose."},
+         "type": {"type": "string", "enum": ["string", "integer", "number", "boolean", "array", "object"]}
+       },
+       "required": ["name", "description", "type"]
+     }
+   }
+,
+   "request_body": {
+     "type": "object",
+     "description": "An object describing the request body, if any.",
+     "properties": {
+       "description": {"type": "string", "description": "A high-level description of the request body's purpose."},
+       "schema": {
+         "type": "object",
+         "description": "A JSON schema representation of the request body payload."
+       }
+     },
+     "required": ["description", "schema"]
+   }
+ },
+ "required": ["logic_explanation", "query_params", "request_body"]
+}
+```
+
+Example Output:
+```json
+{
+ "logic_explanation": "The endpoint retrieves a user's profile by their unique ID. It first validates the 'id' path parameter, then queries the database for the user record. If the user is not found, it returns a 404 error. Otherwise, it returns the user's data.",
+ "query_params": [
+   {
+     "name": "include_email",
+     "description": "Specifies whether to include the user's email address in the response.",
+     "type": "boolean"
+   }
+ ],
+ "request_body": {
+   "description": "None.",
+   "schema": {}
+ }
+}
+```
+"""
+
+# For endpoints whose query parameters and request body were extracted statically
+LOGIC_SYSTEM_PROMPT = """
+You are an expert software engineer and senior technical writer. Your task is to explain the business logic of the provided source code for a single API endpoint.
+
+Your response MUST be a valid JSON object with a single property, "logic_explanation": a clear, concise, and detailed explanation of the endpoint’s business logic, including the request flow, middleware involvement, and final response handling. DO NOT include any additional text or markdown outside of the JSON object.
+
+Example Output:
+```json
+{
+ "logic_explanation": "The endpoint retrieves a user's profile by their unique ID. It first validates the 'id' path parameter, then queries the database for the user record. If the user is not found, it returns a 404 error. Otherwise, it returns the user's data."
+}
+```
+"""
+
+USER_PROMPT = """
+Analyze the following API endpoint code to generate documentation based on the schema provided in your system prompt.
+
+Endpoint Source Code:
+{source}
+"""
+
+REQUIRED_KEYS = {"logic_explanation", "query_params", "request_body"}
+
+def validate_response(api_details: dict) -> dict:
+    """Ensure AI response matches expected schema with safe defaults."""
+    if not isinstance(api_details, dict):
+        return {
+            "logic_explanation": "_Invalid AI response type._",
+            "query_params": [],
+            "request_body": {"description": "None.", "schema": {}},
+        }
+
+    validated = {}
+    validated["logic_explanation"] = api_details.get("logic_explanation", "")
+
+    query_params = api_details.get("query_params", [])
+    if isinstance(query_params, list):
+        validated_params = []
+        for param in query_params:
+            if isinstance(param, dict) and "name" in param and "description" in param and "type" in param:
+                validated_params.append(param)
+        validated["query_params"] = validated_params
+    else:
+        validated["query_params"] = []
+
+    request_body = api_details.get("request_body", {})
+    if isinstance(request_body, dict):
+        validated["request_body"] = {
+            "description": request_body.get("description", "None."),
+            "schema": request_body.get("schema", {}),
+        }
+    else:
+        validated["request_body"] = {"description": "None.", "schema": {}}
+
+    return validated
+
+
+def validate_logic(api_details: dict) -> dict:
+    """Keep only the logic explanation of an AI response to LOGIC_SYSTEM_PROMPT."""
+    explanation = api_details.get("logic_explanation", "") if isinstance(api_details, dict) else ""
+    if not isinstance(explanation, str):
+        explanation = "_Invalid AI response type._"
+    return {"logic_explanation": explanation}
+
+
+class KeyStore:
+    """A provider's API key, kept in a file in the user's home directory."""
+
+    def __init__(self, path: Path, label: str) -> None:
+        self.path = path
+        self.label = label
+
+    def get(self) -> str:
+        """Retrieve the stored API key, ask if missing."""
+        if self.path.exists():
+            return self.path.read_text().strip()
+        api_key = input(f"Enter your {self.label} API Key: ").strip()
+        self.path.write_text(api_key)
+        return api_key
+
+    def update(self, new_key: str) -> None:
+        """Update the stored API key."""
+        self.path.write_text(new_key.strip())
+        print("✅ API key updated successfully.")
@@ -0,0 +1,293 @@
+from __future__ import annotations
+import copy
+import hashlib
+import json
+import textwrap
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import partial
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional
+
+from Apimatic.usedAllAI.scheduler import Scheduler
+
+if TYPE_CHECKING:
+    from Apimatic.usedAllAI.response_cache import CacheScope
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_BATCH_TOKENS = 6000
+# Rough tokens per character of source code, used for batch and rate budgets
+CHARS_PER_TOKEN = 4
+# Rough size of one endpoint's answer, counted against tokens-per-minute budgets
+COMPLETION_TOKENS = 250
+
+# Turns one endpoint's source into validated ai_details; raises on failure
+Analyze = Callable[[str], Dict]
+# Same for several sources keyed by id in one request; ids missing from the result are retried alone
+AnalyzeBatch = Callable[[Dict[str, str]], Dict[str, Dict]]
+
+BATCH_PROMPT = """
+Analyze each of the following API endpoints to generate documentation based on the schema provided in your system prompt.
+
+Respond with a single JSON object that has one property per endpoint: the property name is the endpoint id given below and its value is that endpoint's documentation object, following the schema.
+
+{endpoints}"""
+
+
+class AbortEnhancement(Exception):
+    """Raised by an analyzer when no further request can succeed (e.g. the server is down)."""
+
+    def __init__(self, error: Exception, hint: str) -> None:
+        super().__init__(str(error))
+        self.hint = hint
+
+
+def failed_details(message: str) -> Dict:
+    return {
+        "logic_explanation": message,
+        "query_params": [],
+        "request_body": {"description": "None.", "schema": {}},
+    }
+
+
+def describe(endpoint: Dict) -> str:
+    return f"[{endpoint.get('method','?')}] {endpoint.get('path','?')}"
+
+
+def normalize_source(source: str) -> str:
+    """Source with indentation, trailing whitespace and blank lines normalized, for grouping."""
+    return "\n".join(line.rstrip() for line in textwrap.dedent(source).splitlines() if line.strip())
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def request_tokens(sources: Iterable[str]) -> int:
+    """Tokens a request for `sources` is charged against a tokens-per-minute budget, before the scheduler's overhead."""
+    return sum(estimate_tokens(source) + COMPLETION_TOKENS for source in sources)
+
+
+def batch_prompt(sources: Dict[str, str]) -> str:
+    return BATCH_PROMPT.format(endpoints="".join(
+        f"\nEndpoint id: {key}\nEndpoint Source Code:\n{source}\n" for key, source in sources.items()
+    ))
+
+
+def parse_batch(raw: str, validate: Callable[[Dict], Dict]) -> Dict[str, Dict]:
+    """Validates each item of a keyed batch response; raises ValueError if it is not a JSON object."""
+    data = json.loads(raw)
+    if not isinstance(data, dict):
+        raise ValueError(f"expected a JSON object of results, got {type(data).__name__}")
+    return {key: validate(item) for key, item in data.items() if isinstance(item, dict)}
+
+
+def pack_batches(sources: Dict[str, str], order: List[str], size: int, tokens: int) -> List[List[str]]:
+    """Groups keys, in `order`, into batches of at most `size` sources and about `tokens` tokens of source."""
+    batches: List[List[str]] = []
+    current: List[str] = []
+    current_tokens = 0
+    for key in order:
+        cost = estimate_tokens(sources[key])
+        if current and (len(current) >= size or current_tokens + cost > tokens):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(key)
+        current_tokens += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def longest_first(sources: Dict[str, str]) -> List[str]:
+    return sorted(sources, key=lambda k: len(sources[k]), reverse=True)
+
+
+class RequestPlan:
+    """
+    The requests an enhancement run has to send.
+
+    Endpoints without source or with a cached response are settled up front in
+    `results`; the rest are grouped by the hash of their normalized source, so
+    the methods of one Flask view or Django class share a single request.
+    """
+
+    def __init__(self, endpoints: List[Dict], cache: Optional[CacheScope] = None) -> None:
+        self.total = len(endpoints)
+        self.results: Dict[int, Dict] = {}
+        self.groups: Dict[str, List[int]] = {}
+        self.sources: Dict[str, str] = {}
+        for i, endpoint in enumerate(endpoints):
+            source = endpoint.get("source")
+            if not source:
+                self.results[i] = failed_details("_No source code found._")
+                continue
+            key = hashlib.sha256(normalize_source(source).encode("utf-8", "surrogatepass")).hexdigest()
+            if key not in self.groups:
+                self.groups[key] = []
+                self.sources[key] = source
+            self.groups[key].append(i)
+
+        self.without_source = len(self.results)
+        # Requests saved by sharing one response between endpoints with the same source
+        self.deduplicated = self.total - self.without_source - len(self.groups)
+        self.cache_hits = 0
+        if cache is not None:
+            for key in list(self.groups):
+                cached = cache.get(self.sources[key])
+                if cached is not None:
+                    self.cache_hits += 1
+                    self.settle(key, cached)
+                    del self.sources[key]
+
+    def settle(self, key: str, details: Dict) -> None:
+        """Stores `details` for every endpoint of group `key`, each with its own copy."""
+        first, *rest = self.groups.pop(key)
+        self.results[first] = details
+        for i in rest:
+            self.results[i] = copy.deepcopy(details)
+
+    @property
+    def requests(self) -> int:
+        """Requests still to be sent."""
+        return len(self.sources)
+
+    def summary(self) -> str:
+        return (
+            f"{self.requests} requests for {self.total} endpoints "
+            f"({self.deduplicated} saved by deduplication, {self.cache_hits} answered from cache, "
+            f"{self.without_source} without source)"
+        )
+
+
+def enhance_endpoints(
+    endpoints: List[Dict],
+    analyze: Analyze,
+    provider: str,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    cache: Optional[CacheScope] = None,
+    analyze_batch: Optional[AnalyzeBatch] = None,
+    batch_size: int = 1,
+    batch_tokens: int = DEFAULT_BATCH_TOKENS,
+    scheduler: Optional[Scheduler] = None,
+) -> List[Dict]:
+    """
+    Runs `analyze` over the distinct handler sources of `endpoints` on a pool
+    of `concurrency` threads and stores the results as ai_details.
+
+    Endpoints whose normalized source is identical share one request and get
+    copies of its result. Requests are submitted longest source first, so the
+    slowest prompts start early instead of trailing at the end of the run.
+    Results are written back in the original endpoint order once the run is
+    over. A failing request gets a "_<provider> analysis failed_" note and the
+    others carry on, unless the analyzer raises AbortEnhancement, which
+    cancels what has not started; those endpoints get the abort's failure note.
+
+    With a `cache`, sources analyzed before by the same provider and model are
+    filled in without a request, and new successful results are stored;
+    failures are never cached.
+
+    With `analyze_batch` and a `batch_size` above 1, up to `batch_size`
+    sources totalling about `batch_tokens` tokens go into one request, which
+    sends the system prompt once for all of them. Sources a batch response
+    leaves out, or all of them if it fails or is malformed, are retried one
+    request per source.
+
+    Every request goes through `scheduler` (by default one with no rate
+    budgets), which keeps within the provider's request and token limits and
+    retries throttled or transient failures before they count as failed.
+    """
+    plan = RequestPlan(endpoints, cache)
+    print(f"[INFO] {provider}: {plan.summary()}")
+    if scheduler is None:
+        scheduler = Scheduler(concurrency)
+
+    order = longest_first(plan.sources)
+    if analyze_batch is not None and batch_size > 1:
+        batches = pack_batches(plan.sources, order, batch_size, batch_tokens)
+    else:
+        batches = [[key] for key in order]
+
+    def run_batch(keys: List[str]) -> Dict[str, Dict]:
+        ids = {f"e{n}": key for n, key in enumerate(keys, 1)}
+        results = analyze_batch({i: plan.sources[key] for i, key in ids.items()})
+        return {ids[i]: details for i, details in results.items() if i in ids}
+
+    aborted: Optional[AbortEnhancement] = None
+    done_count = plan.total - sum(len(plan.groups[key]) for key in order)
+
+    def finish(key: str, details: Optional[Dict], error: Optional[Exception] = None) -> None:
+        nonlocal done_count
+        group = plan.groups[key]
+        done_count += len(group)
+        meta = describe(endpoints[group[0]])
+        if len(group) > 1:
+            meta += f" and {len(group) - 1} more"
+        if error is None:
+            if cache is not None:
+                cache.put(plan.sources[key], details)
+            print(f"🔍 Analyzed {meta} ({done_count}/{plan.total})")
+        else:
+            print(f"❌ Error analyzing {meta}: {error}")
+            details = failed_details(f"_{provider} analysis failed: {error}_")
+        plan.settle(key, details)
+
+    def abandon(key: str) -> None:
+        """Settles a group that is never sent because the run was aborted."""
+        plan.settle(key, failed_details(f"_{provider} analysis failed: {aborted}_"))
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        pending: Dict[Future, List[str]] = {}
+
+        def submit(keys: List[str]) -> None:
+            tokens = request_tokens(plan.sources[key] for key in keys)
+            if len(keys) == 1:
+                request = partial(analyze, plan.sources[keys[0]])
+            else:
+                request = partial(run_batch, keys)
+            pending[pool.submit(scheduler.call, request, tokens)] = keys
+
+        for keys in batches:
+            submit(keys)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                keys = pending.pop(future)
+                if future.cancelled():
+                    for key in keys:
+                        abandon(key)
+                    continue
+                try:
+                    result = future.result()
+                except AbortEnhancement as e:
+                    for key in keys:
+                        finish(key, None, e)
+                    if aborted is None:
+                        aborted = e
+                        for other in pending:
+                            other.cancel()
+                    continue
+                except Exception as e:
+                    if len(keys) == 1:
+                        finish(keys[0], None, e)
+                        continue
+                    print(f"⚠️ Batch of {len(keys)} endpoints failed ({e}); retrying them one by one")
+                    result = {}
+                if len(keys) == 1:
+                    finish(keys[0], result)
+                    continue
+                for key in keys:
+                    if key in result:
+                        finish(key, result[key])
+                    elif aborted is None:
+                        submit([key])
+                    else:
+                        abandon(key)
+
+    for i in sorted(plan.results):
+        endpoints[i]["ai_details"] = plan.results[i]
+
+    if aborted is not None:
+        print(f"   {aborted.hint} Aborting analysis.")
+    else:
+        print("\n✅ AI analysis complete.")
+    print(f"[INFO] {provider}: {scheduler.summary()}")
+    return endpoints
@@ -0,0 +1,223 @@
+from __future__ import annotations
+import heapq
+import math
+import re
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from Apimatic.endpoint import has_static_details
+from Apimatic.usedAllAI.common import LOGIC_SYSTEM_PROMPT, SYSTEM_PROMPT, USER_PROMPT
+from Apimatic.usedAllAI.engine import (
+    COMPLETION_TOKENS, DEFAULT_BATCH_TOKENS, RequestPlan, batch_prompt, estimate_tokens, longest_first, pack_batches,
+    request_tokens,
+)
+from Apimatic.usedAllAI.response_cache import CacheScope, ResponseCache
+from Apimatic.usedAllAI.scheduler import Limits
+from Apimatic.usedAllAI.telemetry import price_of
+
+# Rough size of an answer that only explains the logic
+LOGIC_COMPLETION_TOKENS = 100
+# Chat formatting around the system and user messages of one request
+MESSAGE_OVERHEAD_TOKENS = 7
+
+# Pieces roughly as BPE tokenizers pre-split text: words with their leading
+# space, digit groups, punctuation runs, whitespace runs and other characters
+_PIECE_RE = re.compile(r" ?[A-Za-z]+| ?\d{1,3}| ?[^\sA-Za-z\d\x80-\U0010ffff]+|\s+|[\x80-\U0010ffff]")
+
+
+class Speed(NamedTuple):
+    """Assumed service speed: seconds before the first token, prompt and output tokens per second."""
+    latency: float
+    prompt_rate: float
+    output_rate: float
+
+
+# Typical speeds for a forecast; real ones vary with load, model and hardware
+# (measure yours with --ai-metrics-json)
+SPEEDS: Dict[str, Speed] = {
+    "openai": Speed(0.5, 20000.0, 80.0),
+    "groq": Speed(0.2, 50000.0, 500.0),
+    "gemini": Speed(0.5, 20000.0, 150.0),
+    "ollama": Speed(0.2, 1000.0, 30.0),
+    "openai-compatible": Speed(0.2, 2000.0, 50.0),
+}
+
+
+def count_tokens(text: str) -> int:
+    """
+    Approximates the tokens of `text` for GPT-style BPE tokenizers without
+    their vocabularies: a word of up to eight letters is one token and longer
+    ones one per six letters, punctuation one per two characters, each
+    whitespace run and each non-ASCII character one.
+    """
+    tokens = 0
+    for piece in _PIECE_RE.findall(text):
+        body = piece.lstrip(" ") or piece
+        if body[0].isascii() and body[0].isalpha():
+            tokens += 1 if len(body) <= 8 else math.ceil(len(body) / 6)
+        elif body[0].isdigit() or body.isspace() or not body[0].isascii():
+            tokens += 1
+        else:
+            tokens += math.ceil(len(body) / 2)
+    return tokens
+
+
+class ProviderSpec(NamedTuple):
+    """What a forecast needs to know about one selected provider."""
+    name: str
+    label: str
+    model: str
+    temperature: Optional[float]
+    concurrency: int
+
+
+class Forecast:
+    """Requests, tokens, cost and wall time one provider would spend on a run."""
+
+    def __init__(self, spec: ProviderSpec) -> None:
+        self.spec = spec
+        self.endpoints = 0
+        self.requests = 0
+        self.deduplicated = 0
+        self.cache_hits = 0
+        self.without_source = 0
+        self.not_sent = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.seconds = 0.0
+        self.cost: Optional[float] = None
+
+    def summary(self) -> str:
+        s = self.spec
+        text = (f"{s.label} ({s.model}): {self.requests} requests for {self.endpoints} endpoints "
+                f"({self.deduplicated} saved by deduplication, {self.cache_hits} answered from cache, "
+                f"{self.without_source} without source")
+        text += f", {self.not_sent} not sent under --static-only)" if self.not_sent else ")"
+        text += (f"\n    ~{self.prompt_tokens:,} input + ~{self.completion_tokens:,} output tokens, "
+                 + (f"~${self.cost:.2f}" if self.cost is not None else "cost unknown (see --ai-price)")
+                 + f", ~{format_duration(self.seconds)} at concurrency {s.concurrency}")
+        return text
+
+
+class _Peek:
+    """A cache scope for RequestPlan that looks entries up without marking them as used."""
+
+    def __init__(self, scope: CacheScope) -> None:
+        self.scope = scope
+
+    def get(self, source: str) -> Optional[Dict]:
+        return {} if self.scope.cache.contains(self.scope.key(source)) else None
+
+
+class _Bucket:
+    """TokenBucket replayed on a simulated clock."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * 10)
+        self.tokens = self.capacity
+        self.updated = 0.0
+
+    def take(self, now: float, amount: float) -> float:
+        """When a request arriving at `now` gets its `amount`."""
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+        self.tokens -= min(amount, self.capacity)
+        return now + (-self.tokens / self.rate if self.tokens < 0 else 0.0)
+
+
+def simulate(durations: Sequence[float], tokens: Sequence[float], concurrency: int,
+             limits: Optional[Limits] = None) -> float:
+    """
+    Wall time of sending requests of the given durations, in order, with at
+    most `concurrency` in flight and within the request and token budgets of
+    `limits`, as the engine's scheduler does (retries not included).
+    """
+    limits = limits or Limits()
+    requests = _Bucket(limits.rpm) if limits.rpm else None
+    budget = _Bucket(limits.tpm) if limits.tpm else None
+    free = [0.0] * max(1, concurrency)
+    end = 0.0
+    for duration, cost in zip(durations, tokens):
+        start = heapq.heappop(free)
+        if requests is not None:
+            start = requests.take(start, 1)
+        if budget is not None:
+            start = budget.take(start, cost)
+        heapq.heappush(free, start + duration)
+        end = max(end, start + duration)
+    return end
+
+
+def forecast(
+    endpoints: List[Dict],
+    spec: ProviderSpec,
+    cache: Optional[ResponseCache] = None,
+    batch_size: int = 1,
+    batch_tokens: int = DEFAULT_BATCH_TOKENS,
+    limits: Optional[Limits] = None,
+    static_only: bool = False,
+    price: Optional[Tuple[float, float]] = None,
+) -> Forecast:
+    """
+    Builds the prompts `providers.enhance` would send for `endpoints` to the
+    provider of `spec`, after deduplication, cache hits and batching, and
+    estimates their tokens, cost and wall time. Sends nothing and leaves the
+    cache untouched.
+    """
+    result = Forecast(spec)
+    result.endpoints = len(endpoints)
+    documented = [ep for ep in endpoints if has_static_details(ep)]
+    undocumented = [ep for ep in endpoints if not has_static_details(ep)]
+    runs = [(undocumented, SYSTEM_PROMPT, COMPLETION_TOKENS)]
+    if static_only:
+        result.not_sent = len(documented)
+    else:
+        runs.append((documented, LOGIC_SYSTEM_PROMPT, LOGIC_COMPLETION_TOKENS))
+
+    speed = SPEEDS.get(spec.name, SPEEDS["openai-compatible"])
+    # What the scheduler adds to every request's charge, as providers.enhance sets it up
+    overhead_tokens = estimate_tokens(SYSTEM_PROMPT)
+    for selected, system_prompt, answer_tokens in runs:
+        if not selected:
+            continue
+        scope = cache.scope(spec.name, spec.model, system_prompt, spec.temperature) if cache is not None else None
+        plan = RequestPlan(selected, _Peek(scope) if scope is not None else None)
+        result.deduplicated += plan.deduplicated
+        result.cache_hits += plan.cache_hits
+        result.without_source += plan.without_source
+
+        order = longest_first(plan.sources)
+        batches = pack_batches(plan.sources, order, batch_size, batch_tokens) if batch_size > 1 else [[k] for k in order]
+        system_tokens = count_tokens(system_prompt) + MESSAGE_OVERHEAD_TOKENS
+        durations, costs = [], []
+        for keys in batches:
+            if len(keys) == 1:
+                user = USER_PROMPT.format(source=plan.sources[keys[0]])
+            else:
+                user = batch_prompt({f"e{n}": plan.sources[key] for n, key in enumerate(keys, 1)})
+            prompt = system_tokens + count_tokens(user)
+            completion = answer_tokens * len(keys)
+            result.prompt_tokens += prompt
+            result.completion_tokens += completion
+            durations.append(speed.latency + prompt / speed.prompt_rate + completion / speed.output_rate)
+            # The token budget is charged what the engine charges it, not the counts above
+            costs.append(request_tokens(plan.sources[key] for key in keys) + overhead_tokens)
+        result.requests += len(batches)
+        # The runs of one provider go one after the other
+        result.seconds += simulate(durations, costs, spec.concurrency, limits)
+
+    rates = price_of(spec.name, spec.model, price)
+    if rates is not None:
+        result.cost = (result.prompt_tokens * rates[0] + result.completion_tokens * rates[1]) / 1e6
+    return result
+
+
+def format_duration(seconds: float) -> str:
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    minutes, seconds = divmod(round(seconds), 60)
+    if minutes < 60:
+        return f"{minutes}m {seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m"
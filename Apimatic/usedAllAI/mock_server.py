@@ -0,0 +1,282 @@
+"""
+A local stand-in for AI providers, for measuring and testing the enhancement
+pipeline offline.
+
+It answers the OpenAI chat-completions protocol (POST .../chat/completions,
+as spoken by OpenAI, Groq and OpenAI-compatible servers) and Ollama's
+(POST /api/generate, streamed or not, and GET /api/version) with well-formed
+documentation JSON, after a configurable delay, and can be told to fail,
+throttle or drop connections.
+
+    python -m Apimatic.usedAllAI.mock_server --port 11434 --latency 0.2 --token-rate 50 --throttle-rate 0.05
+
+and then e.g. `apimatic generate --use-ollama --ollama-host http://localhost:11434`
+or `--use-openai-compatible --openai-compatible-url http://localhost:11434/v1`.
+"""
+from __future__ import annotations
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from Apimatic.usedAllAI.engine import estimate_tokens
+
+DETAILS = {
+    "logic_explanation": "Mock explanation of the endpoint.",
+    "query_params": [],
+    "request_body": {"description": "None.", "schema": {}},
+}
+# Streamed Ollama replies are sent in about this many chunks
+STREAM_CHUNKS = 8
+
+_BATCH_ID_RE = re.compile(r"^Endpoint id: (\S+)$", re.M)
+
+
+class MockConfig(NamedTuple):
+    """How the mock behaves; times are in seconds, rates are fractions of requests."""
+    latency: float = 0.05            # before the first token of every reply
+    jitter: float = 0.0              # extra delay drawn uniformly from [0, jitter]
+    token_rate: float = 0.0          # completion tokens generated per second; 0 is instant
+    prompt_rate: float = 0.0         # prompt tokens processed per second; 0 is instant
+    slots: int = 0                   # requests processed at once, others queue; 0 is unlimited
+    error_rate: float = 0.0          # answered with HTTP 500
+    throttle_rate: float = 0.0       # answered with HTTP 429 and Retry-After
+    retry_after: Optional[float] = 1.0  # Retry-After of 429s; None sends none
+    burst_every: float = 0.0         # every this many seconds, a 429 burst starts
+    burst_length: float = 0.0        # ... lasting this long, with Retry-After until its end
+    malformed_rate: float = 0.0      # batched replies cut off mid-JSON
+    crash_after: Optional[int] = None  # after this many requests, drop every connection
+
+
+class MockStats:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.ok = 0
+        self.errors = 0
+        self.throttled = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.lock = threading.Lock()
+
+    def as_dict(self) -> Dict[str, int]:
+        return {k: v for k, v in vars(self).items() if k != "lock"}
+
+    def summary(self) -> str:
+        return (
+            f"{self.requests} requests: {self.ok} ok, {self.errors} errors, {self.throttled} throttled; "
+            f"{self.prompt_tokens} prompt and {self.completion_tokens} completion tokens"
+        )
+
+
+def reply_for(prompt: str) -> str:
+    """A valid answer to a single-endpoint or batched prompt."""
+    ids = _BATCH_ID_RE.findall(prompt)
+    return json.dumps({i: DETAILS for i in ids} if ids else DETAILS)
+
+
+class MockServer:
+    """
+    The mock, serving from a background thread on 127.0.0.1 until `stop()`.
+    Usable as a context manager; `url` is its base URL for Ollama, `url + "/v1"`
+    for OpenAI-compatible clients.
+    """
+
+    def __init__(self, config: MockConfig = MockConfig(), port: int = 0, host: str = "127.0.0.1") -> None:
+        self.config = config
+        self.stats = MockStats()
+        self.started = time.monotonic()
+        self._slots = threading.BoundedSemaphore(config.slots) if config.slots else None
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def start(self) -> "MockServer":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def serve_forever(self) -> None:
+        self.server.serve_forever()
+
+    # ---- behaviour ----
+    def _failure(self) -> Optional[Tuple[int, Optional[float]]]:
+        """(status, Retry-After) if this request should fail, else None."""
+        c = self.config
+        if c.burst_every and c.burst_length:
+            into = (time.monotonic() - self.started) % c.burst_every
+            if into < c.burst_length:
+                return 429, c.burst_length - into
+        roll = random.random()
+        if roll < c.throttle_rate:
+            return 429, c.retry_after
+        if roll < c.throttle_rate + c.error_rate:
+            return 500, None
+        return None
+
+    def _delay(self, prompt_tokens: int) -> float:
+        c = self.config
+        delay = c.latency + random.uniform(0, c.jitter)
+        if c.prompt_rate:
+            delay += prompt_tokens / c.prompt_rate
+        return delay
+
+    def _generation_time(self, completion_tokens: int) -> float:
+        return completion_tokens / self.config.token_rate if self.config.token_rate else 0.0
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                if self.path.rstrip("/") == "/api/version":
+                    self._json(200, {"version": "0.0.0-mock"})
+                else:
+                    self._json(404, {"error": "not found"})
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self._json(400, {"error": "invalid JSON"})
+                    return
+                with mock.stats.lock:
+                    mock.stats.requests += 1
+                    count = mock.stats.requests
+                if mock.config.crash_after is not None and count > mock.config.crash_after:
+                    # Like a crashed host: the connection goes away without an answer
+                    self.close_connection = True
+                    mock.server.shutdown_request(self.request)
+                    return
+                if self.path.rstrip("/").endswith("/chat/completions"):
+                    messages = body.get("messages") or []
+                    system = "".join(m.get("content", "") for m in messages if m.get("role") == "system")
+                    prompt = "".join(m.get("content", "") for m in messages if m.get("role") != "system")
+                    self._serve(system, prompt, self._openai)
+                elif self.path.rstrip("/") == "/api/generate":
+                    self._serve(body.get("system", ""), body.get("prompt", ""),
+                                self._ollama_stream if body.get("stream") else self._ollama)
+                else:
+                    self._json(404, {"error": f"unknown path {self.path}"})
+
+            def _serve(self, system: str, prompt: str, respond) -> None:
+                failure = mock._failure()
+                if failure is not None:
+                    status, retry_after = failure
+                    with mock.stats.lock:
+                        if status == 429:
+                            mock.stats.throttled += 1
+                        else:
+                            mock.stats.errors += 1
+                    headers = {"Retry-After": f"{retry_after:.3f}"} if retry_after is not None else {}
+                    message = "Rate limit exceeded" if status == 429 else "Internal server error"
+                    self._json(status, {"error": {"message": message, "type": "mock_error"}}, headers)
+                    return
+                prompt_tokens = estimate_tokens(system) + estimate_tokens(prompt)
+                reply = reply_for(prompt)
+                if _BATCH_ID_RE.search(prompt) and random.random() < mock.config.malformed_rate:
+                    reply = reply[:len(reply) // 2]
+                completion_tokens = estimate_tokens(reply)
+                with mock.stats.lock:
+                    mock.stats.ok += 1
+                    mock.stats.prompt_tokens += prompt_tokens
+                    mock.stats.completion_tokens += completion_tokens
+                if mock._slots is not None:
+                    mock._slots.acquire()
+                try:
+                    time.sleep(mock._delay(prompt_tokens))
+                    respond(reply, prompt_tokens, completion_tokens)
+                finally:
+                    if mock._slots is not None:
+                        mock._slots.release()
+
+            def _openai(self, reply: str, prompt_tokens: int, completion_tokens: int) -> None:
+                time.sleep(mock._generation_time(completion_tokens))
+                self._json(200, {
+                    "id": "chatcmpl-mock", "object": "chat.completion", "model": "mock",
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                              "total_tokens": prompt_tokens + completion_tokens},
+                })
+
+            def _ollama(self, reply: str, prompt_tokens: int, completion_tokens: int) -> None:
+                time.sleep(mock._generation_time(completion_tokens))
+                self._json(200, {"model": "mock", "response": reply, "done": True,
+                                 "prompt_eval_count": prompt_tokens, "eval_count": completion_tokens})
+
+            def _ollama_stream(self, reply: str, prompt_tokens: int, completion_tokens: int) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                size = max(1, -(-len(reply) // STREAM_CHUNKS))
+                pause = mock._generation_time(completion_tokens) / STREAM_CHUNKS
+                for start in range(0, len(reply), size):
+                    self._chunk({"response": reply[start:start + size], "done": False})
+                    time.sleep(pause)
+                self._chunk({"response": "", "done": True,
+                             "prompt_eval_count": prompt_tokens, "eval_count": completion_tokens})
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _chunk(self, record: Dict) -> None:
+                line = json.dumps(record).encode("utf-8") + b"\n"
+                self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+                self.wfile.flush()
+
+            def _json(self, status: int, payload: Dict, headers: Optional[Dict[str, str]] = None) -> None:
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Serve a mock OpenAI-compatible and Ollama API for offline runs.")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=11434)
+    for field, default in MockConfig._field_defaults.items():
+        kind = int if field in ("slots", "crash_after") else float
+        p.add_argument(f"--{field.replace('_', '-')}", type=kind, default=default)
+    args = p.parse_args()
+
+    config = MockConfig(**{field: getattr(args, field) for field in MockConfig._fields})
+    mock = MockServer(config, args.port, args.host)
+    print(f"Mock AI server on {mock.url} (Ollama) and {mock.url}/v1 (OpenAI-compatible); Ctrl+C to stop")
+    try:
+        mock.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mock.server.server_close()
+        print(mock.stats.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+from __future__ import annotations
+import json
+from typing import Callable, Dict, List, Optional
+
+from Apimatic.endpoint import has_static_details
+from Apimatic.usedAllAI.common import LOGIC_SYSTEM_PROMPT, SYSTEM_PROMPT, USER_PROMPT, validate_logic, validate_response
+from Apimatic.usedAllAI.engine import (
+    DEFAULT_BATCH_TOKENS, DEFAULT_CONCURRENCY, batch_prompt, enhance_endpoints, estimate_tokens, parse_batch,
+)
+from Apimatic.usedAllAI.response_cache import ResponseCache
+from Apimatic.usedAllAI.scheduler import Limits, scheduler_for
+from Apimatic.usedAllAI.telemetry import Telemetry
+from Apimatic.usedAllAI.transport import OpenAICompatibleTransport, Transport
+
+
+def enhance(
+    endpoints: List[Dict],
+    transport: Transport,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    cache: Optional[ResponseCache] = None,
+    batch_size: int = 1,
+    batch_tokens: int = DEFAULT_BATCH_TOKENS,
+    limits: Optional[Limits] = None,
+    static_only: bool = False,
+    telemetry: Optional[Telemetry] = None,
+) -> List[Dict]:
+    """
+    Enhances each endpoint with an AI-generated explanation from `transport`,
+    using the shared prompts and validation, and the engine's deduplication,
+    caching, batching, concurrency and rate limiting.
+
+    Endpoints whose query parameters and request body the parsers already
+    extracted (those marked with static_details) are only asked for their
+    logic explanation, or, with `static_only`, not sent at all.
+
+    Every request is recorded in `telemetry` (a fresh one by default), whose
+    summary for this provider is printed at the end.
+    """
+    scheduler = scheduler_for(transport.name, transport.model, concurrency, limits, estimate_tokens(SYSTEM_PROMPT))
+    telemetry = telemetry if telemetry is not None else Telemetry()
+    stats = telemetry.run(transport.name, transport.model)
+    retries = scheduler.retries
+
+    def run(selected: List[Dict], system_prompt: str, validate: Callable[[Dict], Dict]) -> None:
+        def analyze(source: str) -> Dict:
+            return telemetry.call(transport, system_prompt, USER_PROMPT.format(source=source),
+                                  lambda raw: validate(json.loads(raw)))
+
+        def analyze_batch(sources: Dict[str, str]) -> Dict[str, Dict]:
+            return telemetry.call(transport, system_prompt, batch_prompt(sources),
+                                  lambda raw: parse_batch(raw, validate), len(sources))
+
+        scope = cache.scope(transport.name, transport.model, system_prompt, transport.temperature) if cache is not None else None
+        enhance_endpoints(
+            selected, analyze, transport.label, concurrency, scope, analyze_batch, batch_size, batch_tokens, scheduler
+        )
+        if scope is not None:
+            stats.cache_hits += scope.hits
+            stats.cache_misses += scope.misses
+
+    documented = [ep for ep in endpoints if has_static_details(ep)]
+    undocumented = [ep for ep in endpoints if not has_static_details(ep)]
+    try:
+        if undocumented:
+            run(undocumented, SYSTEM_PROMPT, validate_response)
+        if documented and static_only:
+            print(f"[INFO] {transport.label}: {len(documented)} statically documented endpoints not sent (--static-only)")
+        elif documented:
+            print(f"[INFO] {transport.label}: asking only for the logic of {len(documented)} statically documented endpoints")
+            static = [ep["ai_details"] for ep in documented]
+            run(documented, LOGIC_SYSTEM_PROMPT, validate_logic)
+            for ep, details in zip(documented, static):
+                ep["ai_details"] = {**details, "logic_explanation": ep["ai_details"]["logic_explanation"]}
+    finally:
+        transport.close()
+        stats.retries += scheduler.retries - retries
+        transport_stats = transport.summary()
+        if transport_stats:
+            print(f"[INFO] {transport.label}: {transport_stats}")
+        print(f"[INFO] {transport.label}: {telemetry.summary(transport.name, transport.model)}")
+    return endpoints
+
+
+def enhance_with_openai_compatible(endpoints: List[Dict], base_url: str, model: str,
+                                   api_key: Optional[str] = None, **options) -> List[Dict]:
+    """Enhances each endpoint using any OpenAI-compatible server, e.g. vLLM or llama.cpp's."""
+    return enhance(endpoints, OpenAICompatibleTransport(model, base_url, api_key), **options)
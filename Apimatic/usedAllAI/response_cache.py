@@ -0,0 +1,189 @@
+from __future__ import annotations
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+AI_CACHE_FILE = "ai.sqlite3"
+DEFAULT_AI_CACHE_MB = 256
+# Eviction scans the whole table, so it runs every this many writes and on close
+EVICT_EVERY = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    details TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    request_bytes INTEGER NOT NULL,
+    accessed REAL NOT NULL
+)
+"""
+SCHEMA_INDEX = "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)"
+
+# Deletes the least recently used rows beyond the first `?` bytes
+EVICT = """
+DELETE FROM responses WHERE key IN (
+    SELECT key FROM (
+        SELECT key, SUM(size) OVER (ORDER BY accessed DESC, key) AS running FROM responses
+    ) WHERE running > ?
+)
+"""
+
+
+def response_key(source: str, provider: str, model: str, system_prompt: str, temperature: Optional[float]) -> str:
+    h = hashlib.sha256()
+    for part in (provider, model, repr(temperature), system_prompt, source):
+        h.update(part.encode("utf-8", "surrogatepass"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def format_bytes(n: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GiB"
+
+
+class ResponseCache:
+    """
+    Persistent cache of validated ai_details, keyed by a hash of the handler
+    source, provider, model, system prompt and temperature.
+
+    Stored in SQLite in WAL mode so parallel jobs sharing a cache directory can
+    read while one of them writes; writers wait up to `timeout` seconds for the
+    lock. The total size of the stored responses is capped at `max_bytes` by
+    evicting the least recently used entries. Any database error disables the
+    cache for the rest of the run instead of failing the enhancement.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = DEFAULT_AI_CACHE_MB * 2**20, timeout: float = 30.0) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disabled = False
+        self._writes = 0
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self._conn is None and not self._disabled:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(self.path), timeout=self.timeout, isolation_level=None, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(SCHEMA)
+                conn.execute(SCHEMA_INDEX)
+                self._conn = conn
+            except (OSError, sqlite3.Error) as e:
+                self._fail(e)
+        return self._conn
+
+    def _fail(self, error: Exception) -> None:
+        print(f"[WARNING] AI response cache disabled: {error}")
+        self._disabled = True
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def get(self, key: str) -> Optional[Dict]:
+        conn = self._connection()
+        row = None
+        if conn is not None:
+            try:
+                row = conn.execute("SELECT details, size, request_bytes FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+            except sqlite3.Error as e:
+                self._fail(e)
+                row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.bytes_saved += row[1] + row[2]
+        return json.loads(row[0])
+
+    def contains(self, key: str) -> bool:
+        """Whether `key` is cached; unlike get(), neither counted nor marked as used."""
+        conn = self._connection()
+        if conn is None:
+            return False
+        try:
+            return conn.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone() is not None
+        except sqlite3.Error as e:
+            self._fail(e)
+            return False
+
+    def put(self, key: str, details: Dict, request_bytes: int) -> None:
+        conn = self._connection()
+        if conn is None:
+            return
+        data = json.dumps(details)
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data.encode("utf-8")), request_bytes, time.time()),
+            )
+            self._writes += 1
+            if self._writes % EVICT_EVERY == 0:
+                self.evict()
+        except sqlite3.Error as e:
+            self._fail(e)
+
+    def evict(self) -> None:
+        """Deletes the least recently used responses beyond `max_bytes`."""
+        conn = self._connection()
+        if conn is None:
+            return
+        try:
+            conn.execute(EVICT, (self.max_bytes,))
+        except sqlite3.Error as e:
+            self._fail(e)
+
+    def scope(self, provider: str, model: str, system_prompt: str, temperature: Optional[float]) -> "CacheScope":
+        return CacheScope(self, provider, model, system_prompt, temperature)
+
+    def close(self) -> None:
+        if self._conn is not None and self._writes:
+            self.evict()
+        if self._conn is not None:  # evict() closes it on error
+            self._conn.close()
+            self._conn = None
+
+    def summary(self) -> str:
+        return f"AI cache: {self.hits} hits, {self.misses} misses, {format_bytes(self.bytes_saved)} of requests and responses saved"
+
+
+class CacheScope:
+    """The cache as seen by one provider and model: looks entries up by handler source."""
+
+    def __init__(self, cache: ResponseCache, provider: str, model: str, system_prompt: str, temperature: Optional[float]) -> None:
+        self.cache = cache
+        self.provider = provider
+        self.model = model
+        self.system_prompt = system_prompt
+        self.temperature = temperature
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, source: str) -> str:
+        return response_key(source, self.provider, self.model, self.system_prompt, self.temperature)
+
+    def get(self, source: str) -> Optional[Dict]:
+        details = self.cache.get(self.key(source))
+        if details is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return details
+
+    def put(self, source: str, details: Dict) -> None:
+        request_bytes = len(self.system_prompt.encode("utf-8")) + len(source.encode("utf-8", "surrogatepass"))
+        self.cache.put(self.key(source), details, request_bytes)
@@ -0,0 +1,215 @@
+from __future__ import annotations
+import random
+import socket
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, NamedTuple, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+# Statuses worth retrying: timeouts, conflicts, throttling and transient server errors
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+THROTTLE_STATUSES = {429}
+# SDK exceptions that carry no status but are transient
+RETRY_ERRORS = {"APIConnectionError", "APITimeoutError", "ServiceUnavailable", "DeadlineExceeded", "ResourceExhausted"}
+
+
+class Limits(NamedTuple):
+    """Request and token budgets per minute for one provider and model; None means unlimited."""
+    rpm: Optional[float] = None
+    tpm: Optional[float] = None
+    max_retries: int = DEFAULT_MAX_RETRIES
+
+
+def status_of(error: Exception) -> Optional[int]:
+    """The HTTP status of an SDK or urllib error, if it has one."""
+    for value in (getattr(error, "status_code", None), getattr(error, "code", None),
+                  getattr(getattr(error, "response", None), "status_code", None)):
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds to wait according to the error's Retry-After (or retry-after-ms) header."""
+    headers = getattr(error, "headers", None) or getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: Exception) -> bool:
+    status = status_of(error)
+    if status is not None:
+        return status in RETRY_STATUSES
+    return isinstance(error, (TimeoutError, socket.timeout, ConnectionResetError)) or type(error).__name__ in RETRY_ERRORS
+
+
+def backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given retry (0-based)."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+class TokenBucket:
+    """
+    Refills at `per_minute` units per minute and holds at most ten seconds'
+    worth, so a fresh run does not burst a whole minute's budget at once.
+    Callers reserve units and sleep off any deficit outside the lock, which
+    serves them in arrival order.
+    """
+
+    def __init__(self, per_minute: float) -> None:
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * 10)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= min(amount, self.capacity)
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+
+class AdaptiveConcurrency:
+    """
+    Limits requests in flight, adjusting the limit AIMD-style: +1 for every
+    `limit` successful requests, halved on throttling (at most once per
+    `cooldown` seconds, so one burst of 429s counts once), never below 1 or
+    above `maximum`.
+    """
+
+    def __init__(self, maximum: int, cooldown: float = 1.0) -> None:
+        self.maximum = max(1, maximum)
+        self.limit = float(self.maximum)
+        self.lowest = self.maximum
+        self.cooldown = cooldown
+        self.active = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self.active >= int(self.limit):
+                self._cond.wait()
+            self.active += 1
+
+    def release(self, throttled: bool = False) -> None:
+        with self._cond:
+            self.active -= 1
+            now = time.monotonic()
+            if throttled:
+                if now - self._last_decrease >= self.cooldown:
+                    self.limit = max(1.0, self.limit / 2)
+                    self.lowest = min(self.lowest, int(self.limit))
+                    self._last_decrease = now
+            else:
+                self.limit = min(float(self.maximum), self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+
+class Scheduler:
+    """
+    Sends one provider's requests: waits for the request and token budgets,
+    keeps the number in flight under an adaptive limit, and retries throttled
+    and transient failures, honouring Retry-After or else backing off
+    exponentially with jitter. A Retry-After pauses every request to the
+    provider, not just the one that was throttled.
+    """
+
+    def __init__(self, concurrency: int, limits: Optional[Limits] = None, overhead_tokens: float = 0.0) -> None:
+        limits = limits or Limits()
+        # Tokens every request spends besides its sources, i.e. the system prompt
+        self.overhead_tokens = overhead_tokens
+        self.max_retries = limits.max_retries
+        self.requests = TokenBucket(limits.rpm) if limits.rpm else None
+        self.tokens = TokenBucket(limits.tpm) if limits.tpm else None
+        self.concurrency = AdaptiveConcurrency(concurrency)
+        self.retries = 0
+        self.throttled = 0
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _wait_for_pause(self) -> None:
+        while True:
+            with self._lock:
+                wait = self._paused_until - time.monotonic()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def call(self, fn: Callable[[], T], tokens: float = 0.0) -> T:
+        attempt = 0
+        while True:
+            self._wait_for_pause()
+            if self.requests is not None:
+                self.requests.acquire()
+            if self.tokens is not None:
+                self.tokens.acquire(tokens + self.overhead_tokens)
+            self.concurrency.acquire()
+            throttled = False
+            try:
+                return fn()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                throttled = status_of(e) in THROTTLE_STATUSES or type(e).__name__ == "ResourceExhausted"
+                delay = retry_after(e)
+                if delay is not None:
+                    delay = min(delay, BACKOFF_CAP)
+                    self._pause(delay)
+                else:
+                    delay = backoff(attempt)
+                with self._lock:
+                    self.retries += 1
+                    self.throttled += throttled
+            finally:
+                self.concurrency.release(throttled)
+            time.sleep(delay)
+            attempt += 1
+
+    def summary(self) -> str:
+        return (
+            f"{self.retries} retries, {self.throttled} throttled, "
+            f"concurrency {self.concurrency.maximum} (lowest {self.concurrency.lowest}, now {int(self.concurrency.limit)})"
+        )
+
+
+_SCHEDULERS: Dict[Tuple[str, str, int, Limits, float], Scheduler] = {}
+_SCHEDULERS_LOCK = threading.Lock()
+
+
+def scheduler_for(provider: str, model: str, concurrency: int, limits: Optional[Limits] = None, overhead_tokens: float = 0.0) -> Scheduler:
+    """
+    The scheduler shared by every run against `provider` and `model` with the
+    same concurrency, limits and overhead in this process.
+    """
+    with _SCHEDULERS_LOCK:
+        key = (provider, model, concurrency, limits or Limits(), overhead_tokens)
+        if key not in _SCHEDULERS:
+            _SCHEDULERS[key] = Scheduler(concurrency, limits, overhead_tokens)
+        return _SCHEDULERS[key]
@@ -0,0 +1,260 @@
+from __future__ import annotations
+import json
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, TypeVar
+
+from Apimatic.usedAllAI.engine import AbortEnhancement, estimate_tokens
+from Apimatic.usedAllAI.scheduler import status_of
+from Apimatic.usedAllAI.transport import Transport, percentile
+
+T = TypeVar("T")
+
+# USD per million prompt and completion tokens, from the providers' price lists;
+# pass --ai-price for models missing here or when the prices change
+PRICES: Dict[Tuple[str, str], Tuple[float, float]] = {
+    ("openai", "gpt-4o-mini"): (0.15, 0.60),
+    ("openai", "gpt-4o"): (2.50, 10.00),
+    ("openai", "gpt-4.1-mini"): (0.40, 1.60),
+    ("openai", "gpt-4.1"): (2.00, 8.00),
+    ("groq", "llama3-8b-8192"): (0.05, 0.08),
+    ("groq", "llama3-70b-8192"): (0.59, 0.79),
+    ("gemini", "gemini-1.5-flash"): (0.075, 0.30),
+    ("gemini", "gemini-1.5-pro"): (1.25, 5.00),
+}
+# Providers running on the user's own hardware
+FREE_PROVIDERS = {"ollama"}
+
+OUTCOMES = ("ok", "throttled", "http_error", "timeout", "connection_error", "invalid_response", "error")
+
+
+def price_of(provider: str, model: str, override: Optional[Tuple[float, float]] = None) -> Optional[Tuple[float, float]]:
+    """(prompt, completion) USD per million tokens, or None if unknown."""
+    if override is not None:
+        return override
+    if provider in FREE_PROVIDERS:
+        return (0.0, 0.0)
+    return PRICES.get((provider, model))
+
+
+def outcome_of(error: Exception) -> str:
+    status = status_of(error)
+    if status == 429 or type(error).__name__ == "ResourceExhausted":
+        return "throttled"
+    if status is not None:
+        return "http_error"
+    if isinstance(error, (TimeoutError, socket.timeout)) or type(error).__name__ in ("APITimeoutError", "DeadlineExceeded"):
+        return "timeout"
+    if isinstance(error, (ConnectionError, AbortEnhancement, OSError)) or type(error).__name__ == "APIConnectionError":
+        return "connection_error"
+    return "error"
+
+
+class Call(NamedTuple):
+    """One request sent to a provider, retries being separate calls."""
+    provider: str
+    model: str
+    endpoints: int               # sources in the request
+    started: float               # Unix time
+    latency: float               # seconds until the whole answer was read
+    ttfb: Optional[float]        # seconds until the answer began, if the transport knows
+    prompt_tokens: int
+    completion_tokens: int
+    estimated: bool              # token counts estimated locally, the server reported none
+    outcome: str
+
+
+class ProviderRun:
+    """Per-run counters of one provider and model that are not per call."""
+
+    def __init__(self) -> None:
+        self.retries = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+class Telemetry:
+    """
+    Records every AI request of a run (latency, time to first byte, tokens
+    from the response's usage fields, outcome) and each provider's retries
+    and cache lookups, and reports them as a summary, JSON or Prometheus
+    textfile metrics. Safe to use from the engine's worker threads.
+    """
+
+    def __init__(self, price: Optional[Tuple[float, float]] = None) -> None:
+        self.price = price
+        self.calls: List[Call] = []
+        self.runs: Dict[Tuple[str, str], ProviderRun] = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def call(self, transport: Transport, system: str, user: str, parse: Callable[[str], T], endpoints: int = 1) -> T:
+        """Sends one request through `transport`, returns `parse` of the answer and records the call."""
+        started, t0 = time.time(), time.perf_counter()
+        raw: Optional[str] = None
+        try:
+            raw = transport.complete(system, user)
+            result = parse(raw)
+        except Exception as e:
+            self._record(transport, endpoints, started, time.perf_counter() - t0, system, user, raw,
+                         "invalid_response" if raw is not None else outcome_of(e))
+            raise
+        self._record(transport, endpoints, started, time.perf_counter() - t0, system, user, raw, "ok")
+        return result
+
+    def _record(self, transport: Transport, endpoints: int, started: float, latency: float,
+                system: str, user: str, raw: Optional[str], outcome: str) -> None:
+        if raw is None:
+            # Nothing came back, so nothing to count or bill
+            usage_ttfb, prompt, completion, estimated = None, 0, 0, False
+        else:
+            usage = transport.last_usage()
+            usage_ttfb = usage.ttfb
+            estimated = usage.prompt_tokens is None or usage.completion_tokens is None
+            prompt = usage.prompt_tokens if usage.prompt_tokens is not None else estimate_tokens(system) + estimate_tokens(user)
+            completion = usage.completion_tokens if usage.completion_tokens is not None else estimate_tokens(raw)
+        call = Call(transport.name, transport.model, endpoints, started, latency, usage_ttfb,
+                    prompt, completion, estimated, outcome)
+        with self._lock:
+            self.calls.append(call)
+
+    def run(self, provider: str, model: str) -> ProviderRun:
+        with self._lock:
+            return self.runs.setdefault((provider, model), ProviderRun())
+
+    # ---- reporting ----
+    def providers(self) -> List[Tuple[str, str]]:
+        keys = list(self.runs)
+        for call in self.calls:
+            if (call.provider, call.model) not in keys:
+                keys.append((call.provider, call.model))
+        return keys
+
+    def stats(self, provider: str, model: str) -> Dict:
+        """Aggregates of one provider and model, as written to the JSON file."""
+        with self._lock:
+            calls = [c for c in self.calls if c.provider == provider and c.model == model]
+        run = self.runs.get((provider, model)) or ProviderRun()
+        latencies = [c.latency for c in calls if c.outcome == "ok"]
+        ttfbs = [c.ttfb for c in calls if c.outcome == "ok" and c.ttfb is not None]
+        prompt = sum(c.prompt_tokens for c in calls)
+        completion = sum(c.completion_tokens for c in calls)
+        price = price_of(provider, model, self.price)
+        outcomes = {o: 0 for o in OUTCOMES}
+        for c in calls:
+            outcomes[c.outcome] += 1
+
+        def quantiles(values: List[float]) -> Optional[Dict[str, float]]:
+            if not values:
+                return None
+            return {"p50": round(percentile(values, 0.5), 4), "p95": round(percentile(values, 0.95), 4),
+                    "max": round(max(values), 4), "sum": round(sum(values), 4), "count": len(values)}
+
+        return {
+            "provider": provider, "model": model,
+            "requests": len(calls) - run.retries, "attempts": len(calls), "retries": run.retries,
+            "endpoints_sent": sum(c.endpoints for c in calls if c.outcome == "ok"),
+            "outcomes": outcomes,
+            "latency_s": quantiles(latencies), "ttfb_s": quantiles(ttfbs),
+            "prompt_tokens": prompt, "completion_tokens": completion,
+            "estimated_token_calls": sum(1 for c in calls if c.estimated),
+            "cost_usd": round((prompt * price[0] + completion * price[1]) / 1e6, 6) if price is not None else None,
+            "cache_hits": run.cache_hits, "cache_misses": run.cache_misses,
+        }
+
+    def summary(self, provider: str, model: str) -> str:
+        s = self.stats(provider, model)
+        failed = s["attempts"] - s["outcomes"]["ok"] - s["retries"]
+        text = f"{s['requests']} requests ({s['retries']} retries, {max(0, failed)} failed)"
+        if s["latency_s"]:
+            text += f", latency p50 {s['latency_s']['p50'] * 1000:.0f}ms p95 {s['latency_s']['p95'] * 1000:.0f}ms"
+        if s["ttfb_s"]:
+            text += f", first byte p50 {s['ttfb_s']['p50'] * 1000:.0f}ms"
+        text += f", {s['prompt_tokens']} prompt + {s['completion_tokens']} completion tokens"
+        if s["estimated_token_calls"]:
+            text += f" ({s['estimated_token_calls']} calls estimated)"
+        text += f", cost ${s['cost_usd']:.4f}" if s["cost_usd"] is not None else ", cost unknown (see --ai-price)"
+        return text
+
+    def total(self) -> str:
+        stats = [self.stats(*key) for key in self.providers()]
+        costs = [s["cost_usd"] for s in stats]
+        text = (f"{sum(s['requests'] for s in stats)} requests, {sum(s['prompt_tokens'] for s in stats)} prompt + "
+                f"{sum(s['completion_tokens'] for s in stats)} completion tokens")
+        if costs and all(c is not None for c in costs):
+            text += f", cost ${sum(costs):.4f}"
+        return text
+
+    def as_dict(self) -> Dict:
+        return {
+            "started": self.started,
+            "finished": time.time(),
+            "providers": [self.stats(*key) for key in self.providers()],
+            "calls": [c._asdict() for c in self.calls],
+        }
+
+    def write_json(self, path: Path) -> None:
+        _write_atomic(Path(path), json.dumps(self.as_dict(), indent=2))
+
+    def prometheus(self) -> str:
+        """The metrics in Prometheus text exposition format, e.g. for node_exporter's textfile collector."""
+        series: Dict[str, Tuple[str, str, List[str]]] = {}
+
+        def add(name: str, kind: str, help_text: str, labels: Dict[str, str], value: float) -> None:
+            label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            sample = f"{name}{{{label_text}}}" if label_text else name
+            series.setdefault(name, (kind, help_text, []))[2].append(f"{sample} {value!r}")
+
+        for key in self.providers():
+            s = self.stats(*key)
+            base = {"provider": s["provider"], "model": s["model"]}
+            for outcome, count in s["outcomes"].items():
+                add("apimatic_ai_requests_total", "counter", "Requests sent to the AI provider, retries included, by outcome.",
+                    dict(base, outcome=outcome), count)
+            add("apimatic_ai_retries_total", "counter", "Requests retried after throttling or a transient failure.",
+                base, s["retries"])
+            add("apimatic_ai_tokens_total", "counter", "Tokens used, as reported by the provider or estimated.",
+                dict(base, kind="prompt"), s["prompt_tokens"])
+            add("apimatic_ai_tokens_total", "counter", "Tokens used, as reported by the provider or estimated.",
+                dict(base, kind="completion"), s["completion_tokens"])
+            for name, metric, help_text in (("latency_s", "apimatic_ai_request_duration_seconds", "Latency of successful requests."),
+                                            ("ttfb_s", "apimatic_ai_time_to_first_byte_seconds", "Time until successful answers began.")):
+                q = s[name]
+                if q is None:
+                    continue
+                for quantile, label in (("p50", "0.5"), ("p95", "0.95")):
+                    add(metric, "summary", help_text, dict(base, quantile=label), q[quantile])
+                add(metric + "_sum", "", "", base, q["sum"])
+                add(metric + "_count", "", "", base, q["count"])
+            if s["cost_usd"] is not None:
+                add("apimatic_ai_cost_usd", "gauge", "Estimated cost of the run in USD.", base, s["cost_usd"])
+            add("apimatic_ai_cache_hits_total", "counter", "Endpoint sources answered from the AI response cache.",
+                base, s["cache_hits"])
+            add("apimatic_ai_cache_misses_total", "counter", "Endpoint sources not found in the AI response cache.",
+                base, s["cache_misses"])
+        add("apimatic_ai_last_run_timestamp_seconds", "gauge", "Unix time the run finished.", {}, round(time.time()))
+
+        lines: List[str] = []
+        for name, (kind, help_text, samples) in series.items():
+            if kind:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Path) -> None:
+        _write_atomic(Path(path), self.prometheus())
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    # Scrapers may read the file at any time; they must never see it half-written
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
@@ -0,0 +1,531 @@
+from __future__ import annotations
+import abc
+import base64
+import http.client
+import json
+import re
+import socket
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import SplitResult, unquote, urlsplit
+
+from Apimatic.usedAllAI.engine import AbortEnhancement
+
+DEFAULT_TIMEOUT = 300.0
+OPENAI_BASE_URL = "https://api.openai.com/v1"
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+OLLAMA_PORT = 11434
+DEFAULT_OLLAMA_HOST = f"http://localhost:{OLLAMA_PORT}"
+DEFAULT_OLLAMA_KEEP_ALIVE = "30m"
+HEALTH_TIMEOUT = 2.0
+HOST_RECHECK = 30.0
+
+
+class Usage(NamedTuple):
+    """
+    What the server reported about one completed request: token counts from
+    its usage fields (None if it sent none) and the seconds until the answer
+    began, i.e. the first streamed token or else the response headers.
+    """
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    ttfb: Optional[float] = None
+
+
+class HTTPStatusError(Exception):
+    """A non-2xx answer; `status_code` and `headers` let the scheduler decide on retries."""
+
+    def __init__(self, status_code: int, headers: Dict[str, str], body: bytes) -> None:
+        super().__init__(f"HTTP {status_code}: {body[:300].decode('utf-8', 'replace')}")
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+
+
+def proxy_for(scheme: str, host: str) -> Optional[SplitResult]:
+    """The proxy urllib would use for `scheme://host` (HTTP_PROXY, HTTPS_PROXY, NO_PROXY), if any."""
+    proxy = urllib.request.getproxies().get(scheme)
+    if not proxy or urllib.request.proxy_bypass(host):
+        return None
+    return urlsplit(proxy if "://" in proxy else "http://" + proxy)
+
+
+def proxy_headers(proxy: SplitResult) -> Dict[str, str]:
+    """Basic Proxy-Authorization for credentials in the proxy URL, as urllib sends them."""
+    if proxy.username is None:
+        return {}
+    credentials = f"{unquote(proxy.username)}:{unquote(proxy.password or '')}"
+    return {"Proxy-Authorization": "Basic " + base64.b64encode(credentials.encode("utf-8")).decode("ascii")}
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP(S) connections to one server, shared by the worker threads.
+
+    A connection is checked out for one request and returned afterwards unless
+    the server asked to close it. A request that fails on a reused connection
+    (which the server may have dropped while it sat idle) is retried once on a
+    fresh one.
+
+    Proxies are taken from the environment like urllib does: HTTPS requests
+    are tunnelled through the proxy with CONNECT, plain HTTP ones are sent to
+    it with the absolute URL. The connection to the proxy itself is plain HTTP.
+    """
+
+    def __init__(self, base_url: str, timeout: float = DEFAULT_TIMEOUT) -> None:
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported URL: {base_url!r}")
+        self.https = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.proxy = proxy_for(parts.scheme, self.host)
+        self._proxy_headers = proxy_headers(self.proxy) if self.proxy else {}
+        if self.proxy and not self.https:
+            # A plain HTTP proxy is sent the whole URL
+            self.prefix = f"http://{parts.netloc.rpartition('@')[2]}{self.prefix}"
+        self._idle: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _new(self) -> http.client.HTTPConnection:
+        if self.proxy is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            return cls(self.host, self.port, timeout=self.timeout)
+        proxy_port = self.proxy.port or 80
+        if not self.https:
+            return http.client.HTTPConnection(self.proxy.hostname, proxy_port, timeout=self.timeout)
+        conn = http.client.HTTPSConnection(self.proxy.hostname, proxy_port, timeout=self.timeout)
+        conn.set_tunnel(self.host, self.port, headers=self._proxy_headers)
+        return conn
+
+    def _send(self, method: str, path: str, body: Optional[bytes],
+              headers: Optional[Dict[str, str]]) -> Tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        reused = conn is not None
+        start = time.perf_counter()
+        while True:
+            if conn is None:
+                conn = self._new()
+            try:
+                if self.proxy is not None and not self.https:
+                    headers = {**self._proxy_headers, **(headers or {})}
+                conn.request(method, self.prefix + path, body=body, headers=headers or {})
+                response = conn.getresponse()
+                self._local.ttfb = time.perf_counter() - start
+                return conn, response
+            except (TimeoutError, socket.timeout):
+                conn.close()
+                raise
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                if reused:
+                    conn, reused = None, False
+                    continue
+                raise
+
+    def _release(self, conn: http.client.HTTPConnection, response: http.client.HTTPResponse) -> None:
+        # Only a fully read response leaves the connection reusable
+        if response.will_close or not response.isclosed():
+            conn.close()
+        else:
+            with self._lock:
+                self._idle.append(conn)
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """Sends a request to `prefix + path`; returns (status, lower-cased headers, body)."""
+        conn, response = self._send(method, path, body, headers)
+        try:
+            data = response.read()
+        finally:
+            self._release(conn, response)
+        return response.status, {k.lower(): v for k, v in response.getheaders()}, data
+
+    @contextmanager
+    def stream(self, method: str, path: str, body: Optional[bytes] = None,
+               headers: Optional[Dict[str, str]] = None) -> Iterator[http.client.HTTPResponse]:
+        """Like request(), but yields the response unread, e.g. to consume it line by line."""
+        conn, response = self._send(method, path, body, headers)
+        try:
+            yield response
+        finally:
+            self._release(conn, response)
+
+    def last_ttfb(self) -> Optional[float]:
+        """Seconds until the response headers of the calling thread's last request arrived."""
+        return getattr(self._local, "ttfb", None)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class Transport(abc.ABC):
+    """
+    How one backend turns a system and a user prompt into the model's raw
+    JSON text. Everything else (prompts, validation, caching, batching,
+    scheduling) is shared by the engine.
+    """
+
+    name = ""  # cache and scheduler key
+    label = ""  # shown in messages
+    temperature: Optional[float] = 0
+
+    def __init__(self, model: str) -> None:
+        self.model = model
+        self._local = threading.local()
+
+    @abc.abstractmethod
+    def complete(self, system: str, user: str) -> str:
+        """The model's raw JSON text for one request."""
+
+    def last_usage(self) -> Usage:
+        """Usage of the last request `complete` finished on the calling thread."""
+        return getattr(self._local, "usage", Usage())
+
+    def _set_usage(self, usage: Usage) -> None:
+        self._local.usage = usage
+
+    def summary(self) -> str:
+        """Transport-specific statistics for the run summary, if any."""
+        return ""
+
+    def close(self) -> None:
+        pass
+
+
+class OpenAICompatibleTransport(Transport):
+    """
+    The chat-completions API of OpenAI, Groq, or any compatible server such as
+    vLLM or llama.cpp's, over pooled stdlib HTTP connections.
+    """
+
+    def __init__(self, model: str, base_url: str, api_key: Optional[str] = None,
+                 name: str = "openai-compatible", label: str = "OpenAI-compatible server",
+                 timeout: float = DEFAULT_TIMEOUT) -> None:
+        super().__init__(model)
+        self.name = name
+        self.label = label
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.pool = ConnectionPool(self.base_url, timeout)
+
+    def complete(self, system: str, user: str) -> str:
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system},
+                {"role": "user", "content": user},
+            ],
+            "response_format": {"type": "json_object"},
+            "temperature": self.temperature,
+        }
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        try:
+            status, response_headers, data = self.pool.request(
+                "POST", "/chat/completions", json.dumps(payload).encode("utf-8"), headers
+            )
+        except ConnectionRefusedError as e:
+            raise AbortEnhancement(e, f"Could not connect to {self.label} at {self.base_url}.") from e
+        if not 200 <= status < 300:
+            raise HTTPStatusError(status, response_headers, data)
+        response = json.loads(data)
+        usage = response.get("usage") or {}
+        self._set_usage(Usage(usage.get("prompt_tokens"), usage.get("completion_tokens"), self.pool.last_ttfb()))
+        return response["choices"][0]["message"]["content"].strip()
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+def ollama_base_url(host: str) -> str:
+    """Accepts OLLAMA_HOST-style values such as "0.0.0.0:11434", "gpu-box" or "http://gpu-box:11434"."""
+    if "://" not in host:
+        host = "http://" + host
+    parts = urlsplit(host)
+    hostname = parts.hostname or "localhost"
+    if hostname in ("0.0.0.0", "::"):
+        hostname = "localhost"
+    if ":" in hostname:
+        hostname = f"[{hostname}]"
+    return f"{parts.scheme}://{hostname}:{parts.port or OLLAMA_PORT}{parts.path.rstrip('/')}"
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class OllamaTransport(Transport):
+    """
+    Ollama's /api/generate endpoint over pooled keep-alive connections.
+
+    `keep_alive` keeps the model loaded between requests (Ollama unloads it
+    after five idle minutes by default) and `num_ctx` sets its context window;
+    both are sent with every request, since a changed num_ctx makes Ollama
+    reload the model. With `stream`, tokens are read as they are generated
+    and the time to the first one is recorded.
+    """
+
+    name = "ollama"
+    label = "Ollama"
+    temperature = None  # the model's default
+
+    def __init__(self, model: str, host: str = DEFAULT_OLLAMA_HOST,
+                 keep_alive: Optional[str] = DEFAULT_OLLAMA_KEEP_ALIVE, num_ctx: Optional[int] = None,
+                 stream: bool = False, timeout: float = DEFAULT_TIMEOUT) -> None:
+        super().__init__(model)
+        self.base_url = ollama_base_url(host)
+        # Ollama takes a duration ("30m") or a number of seconds (-1 keeps it loaded)
+        self.keep_alive = int(keep_alive) if keep_alive and keep_alive.lstrip("-").isdigit() else keep_alive
+        self.num_ctx = num_ctx
+        self.streaming = stream
+        self.pool = ConnectionPool(self.base_url, timeout)
+        self.first_token: List[float] = []
+        self._lock = threading.Lock()
+
+    def complete(self, system: str, user: str) -> str:
+        payload = {
+            "model": self.model,
+            "system": system,
+            "prompt": user,
+            "stream": self.streaming,
+            "format": "json",
+        }
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        if self.num_ctx:
+            payload["options"] = {"num_ctx": self.num_ctx}
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        try:
+            if self.streaming:
+                return self._complete_streaming(body, headers)
+            status, response_headers, data = self.pool.request("POST", "/api/generate", body, headers)
+        except (ConnectionRefusedError, socket.gaierror) as e:
+            raise AbortEnhancement(e, f"Could not connect to Ollama at {self.base_url}.") from e
+        if status != 200:
+            raise HTTPStatusError(status, response_headers, data)
+        response = json.loads(data)
+        self._set_usage(Usage(response.get("prompt_eval_count"), response.get("eval_count"), self.pool.last_ttfb()))
+        return response.get("response", "{}")
+
+    def _complete_streaming(self, body: bytes, headers: Dict[str, str]) -> str:
+        start = time.perf_counter()
+        parts: List[str] = []
+        ttfb: Optional[float] = None
+        final: Dict = {}
+        with self.pool.stream("POST", "/api/generate", body, headers) as response:
+            if response.status != 200:
+                raise HTTPStatusError(response.status, {k.lower(): v for k, v in response.getheaders()}, response.read())
+            # One JSON object per line; read to the end so the connection can be reused
+            for line in response:
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise RuntimeError(chunk["error"])
+                if chunk.get("response"):
+                    if not parts:
+                        ttfb = time.perf_counter() - start
+                        with self._lock:
+                            self.first_token.append(ttfb)
+                    parts.append(chunk["response"])
+                if chunk.get("done"):
+                    final = chunk
+        self._set_usage(Usage(final.get("prompt_eval_count"), final.get("eval_count"), ttfb))
+        return "".join(parts) or "{}"
+
+    def healthy(self, timeout: float = HEALTH_TIMEOUT) -> bool:
+        """Whether the server answers /api/version within `timeout` seconds."""
+        probe = ConnectionPool(self.base_url, timeout)
+        try:
+            status, _, _ = probe.request("GET", "/api/version")
+            return status == 200
+        except (http.client.HTTPException, OSError):
+            return False
+        finally:
+            probe.close()
+
+    def summary(self) -> str:
+        with self._lock:
+            ttft = list(self.first_token)
+        if not ttft:
+            return ""
+        return (f"time to first token p50 {percentile(ttft, 0.5) * 1000:.0f}ms, "
+                f"p95 {percentile(ttft, 0.95) * 1000:.0f}ms over {len(ttft)} requests")
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+class OllamaHost:
+    def __init__(self, transport: OllamaTransport) -> None:
+        self.transport = transport
+        self.outstanding = 0
+        self.served = 0
+        self.up = True
+        self.next_check = 0.0
+
+
+class OllamaCluster(Transport):
+    """
+    Spreads requests over several Ollama servers running the same model.
+
+    Each request goes to the healthy host with the fewest requests in flight.
+    A host that refuses connections, drops them or times out is taken out of
+    rotation and the request is sent again to another host, so work in flight
+    on a failed host moves to the others; down hosts are probed again every
+    `recheck` seconds and rejoin once they answer. HTTP errors are the
+    scheduler's business and are raised as usual.
+    """
+
+    name = "ollama"
+    label = "Ollama"
+    temperature = None
+
+    def __init__(self, transports: List[OllamaTransport], recheck: float = HOST_RECHECK) -> None:
+        super().__init__(transports[0].model)
+        self.hosts = [OllamaHost(t) for t in transports]
+        self.recheck = recheck
+        self._lock = threading.Lock()
+        self._check_lock = threading.Lock()
+        self._checked = False
+
+    def _health_check(self) -> None:
+        results: Dict[int, bool] = {}
+        threads = [threading.Thread(target=lambda i=i, h=h: results.__setitem__(i, h.transport.healthy()))
+                   for i, h in enumerate(self.hosts)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for i, host in enumerate(self.hosts):
+            if not results.get(i):
+                self._mark_down(host, "failed health check")
+
+    def _mark_down(self, host: OllamaHost, reason: object) -> None:
+        with self._lock:
+            was_up, host.up = host.up, False
+            host.next_check = time.monotonic() + self.recheck
+        if was_up:
+            print(f"⚠️ Ollama host {host.transport.base_url} taken out of rotation: {reason}")
+
+    def _revive(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            due = [h for h in self.hosts if not h.up and h.next_check <= now]
+            for host in due:
+                host.next_check = now + self.recheck  # one probe per interval, whoever gets here first
+        for host in due:
+            if host.transport.healthy():
+                with self._lock:
+                    host.up = True
+                print(f"✅ Ollama host {host.transport.base_url} back in rotation")
+
+    def _pick(self) -> Optional[OllamaHost]:
+        with self._check_lock:  # the first requests wait for the initial health check
+            if not self._checked:
+                self._health_check()
+                self._checked = True
+        self._revive()
+        with self._lock:
+            up = [h for h in self.hosts if h.up]
+            if not up:
+                return None
+            host = min(up, key=lambda h: h.outstanding)
+            host.outstanding += 1
+            return host
+
+    def complete(self, system: str, user: str) -> str:
+        while True:
+            host = self._pick()
+            if host is None:
+                urls = ", ".join(h.transport.base_url for h in self.hosts)
+                raise AbortEnhancement(ConnectionError(f"no Ollama host reachable ({urls})"), "Could not connect to any Ollama host.")
+            try:
+                result = host.transport.complete(system, user)
+            except (AbortEnhancement, TimeoutError, socket.timeout, ConnectionError, http.client.HTTPException) as e:
+                self._mark_down(host, e)
+                continue
+            finally:
+                with self._lock:
+                    host.outstanding -= 1
+            with self._lock:
+                host.served += 1
+            self._set_usage(host.transport.last_usage())
+            return result
+
+    def summary(self) -> str:
+        served = ", ".join(f"{h.transport.base_url} {h.served}{'' if h.up else ' (down)'}" for h in self.hosts)
+        ttft = [t for h in self.hosts for t in h.transport.first_token]
+        stats = f"requests per host: {served}"
+        if ttft:
+            stats += (f"; time to first token p50 {percentile(ttft, 0.5) * 1000:.0f}ms, "
+                      f"p95 {percentile(ttft, 0.95) * 1000:.0f}ms")
+        return stats
+
+    def close(self) -> None:
+        for host in self.hosts:
+            host.transport.close()
+
+
+class GeminiTransport(Transport):
+    """Google Gemini through its SDK, which is imported only when this transport is created."""
+
+    name = "gemini"
+    label = "Gemini"
+
+    def __init__(self, model: str, api_key: str) -> None:
+        super().__init__(model)
+        import google.generativeai as genai  # imported here so the CLI starts without the SDK
+
+        genai.configure(api_key=api_key)
+        self._genai = genai
+        self._models: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _model(self, system: str):
+        # The system prompt is fixed per GenerativeModel, so keep one per prompt
+        with self._lock:
+            if system not in self._models:
+                self._models[system] = self._genai.GenerativeModel(self.model, system_instruction=system)
+            return self._models[system]
+
+    def complete(self, system: str, user: str) -> str:
+        response = self._model(system).generate_content(
+            user,
+            generation_config=self._genai.GenerationConfig(
+                response_mime_type="application/json",
+                temperature=self.temperature,
+            )
+        )
+
+        metadata = getattr(response, "usage_metadata", None)
+        self._set_usage(Usage(getattr(metadata, "prompt_token_count", None),
+                              getattr(metadata, "candidates_token_count", None)))
+
+        raw = response.text.strip()
+
+        # Remove potential markdown code block wrappers
+        if raw.startswith("```json"):
+            raw = raw.strip("`").strip("json").strip()
+
+        # Use regex to find and extract the JSON object
+        match = re.search(r'\{.*\}', raw, re.DOTALL)
+        if match:
+            raw = match.group(0)
+
+        # Clean up potential trailing commas before parsing
+        return re.sub(r',(\s*[\}\]])', r'\1', raw)
@@ -1,22 +1,30 @@
 from __future__ import annotations
+import ast
 from pathlib import Path
-from typing import Iterable, Tuple
-import subprocess
+from typing import Iterable, List, Tuple
 
-def iter_files(root: Path, exts: Tuple[str, ...]) -> Iterable[Path]:
-    root = Path(root)
-    
-    cmd = ["git", "ls-files", "--cached", "--others", "--exclude-standard"]
-    result = subprocess.run(cmd, cwd=root, capture_output=True, text=True)
-    
-    if result.returncode != 0:
-        # Fallback to rglob if git is not available or not a git repository
-        for p in root.rglob("*"):
-            if p.is_file() and p.suffix in exts:
-                yield p
-        return
+from Apimatic.discovery import discover_files
 
-    for line in result.stdout.splitlines():
-        p = root / line
-        if p.is_file() and p.suffix in exts:
-            yield p
+def iter_files(root: Path, exts: Tuple[str, ...], exclude: Iterable[str] = ()) -> List[Path]:
+    """Files under `root` with one of the suffixes `exts`, from a fresh file listing."""
+    return [p for p in discover_files(Path(root), tuple(exclude)) if p.suffix in exts]
+
+def decode_source(data: bytes) -> str:
+    """Decodes file bytes exactly like `Path.read_text(encoding="utf-8", errors="ignore")`."""
+    text = data.decode("utf-8", errors="ignore")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def ast_nodes(node: ast.AST) -> List[ast.AST]:
+    """The nodes `ast.walk(node)` yields, in the same order, without its per-node generator overhead."""
+    nodes = [node]
+    for current in nodes:
+        for field in current._fields:
+            value = getattr(current, field, None)
+            if value.__class__ is list:
+                nodes.extend(v for v in value if isinstance(v, ast.AST))
+            elif isinstance(value, ast.AST):
+                nodes.append(value)
+    return nodes
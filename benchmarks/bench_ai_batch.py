@@ -0,0 +1,71 @@
+"""
+Compares one AI request per endpoint with batched requests (--ai-batch-size /
+--ai-batch-tokens) against the bundled mock of Ollama's /api/generate, reporting
+round trips, prompt tokens and wall time. Batched replies can be made
+malformed at random to exercise the per-endpoint fallback. No network is used.
+
+    python benchmarks/bench_ai_batch.py --endpoints 200 --batch-size 8
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import io
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Apimatic.usedAllAI import ollama  # noqa: E402
+from Apimatic.usedAllAI.mock_server import DETAILS, MockConfig, MockServer  # noqa: E402
+
+# 20ms per request plus 20us per prompt token
+MOCK = MockConfig(latency=0.02, prompt_rate=50000)
+
+
+def make_endpoints(n: int) -> List[Dict]:
+    rng = random.Random(7)
+    return [
+        {"method": "GET", "path": f"/items/{i}",
+         "source": f"def view_{i}():\n" + "\n".join(f"    x{j} = load({i}, {j})" for j in range(rng.randint(3, 30)))}
+        for i in range(n)
+    ]
+
+
+def run(endpoints: List[Dict], config: MockConfig, **options) -> Dict:
+    with MockServer(config) as mock:
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            ollama.enhance_with_ollama(endpoints, model="mock", host=mock.url, **options)
+        seconds = time.perf_counter() - t0
+    assert all(ep["ai_details"] == DETAILS for ep in endpoints), "an endpoint was not analyzed"
+    return dict(mock.stats.as_dict(), seconds=seconds)
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--endpoints", type=int, default=200)
+    p.add_argument("--concurrency", type=int, default=4)
+    p.add_argument("--batch-size", type=int, default=8)
+    p.add_argument("--batch-tokens", type=int, default=6000)
+    p.add_argument("--malformed-rate", type=float, default=0.1, help="Share of batched replies that are invalid JSON.")
+    args = p.parse_args()
+
+    config = MOCK._replace(malformed_rate=args.malformed_rate)
+    single = run(make_endpoints(args.endpoints), config, concurrency=args.concurrency)
+    batched = run(make_endpoints(args.endpoints), config, concurrency=args.concurrency,
+                  batch_size=args.batch_size, batch_tokens=args.batch_tokens)
+
+    print(f"endpoints={args.endpoints} concurrency={args.concurrency} batch-size={args.batch_size} "
+          f"batch-tokens={args.batch_tokens} malformed-rate={args.malformed_rate}")
+    print(f"{'':10} {'requests':>9} {'prompt tok':>11} {'compl. tok':>11} {'wall':>7}")
+    for name, s in (("single", single), ("batched", batched)):
+        print(f"{name:10} {s['requests']:9d} {s['prompt_tokens']:11d} {s['completion_tokens']:11d} {s['seconds']:6.2f}s")
+    print(f"round trips: {single['requests'] / batched['requests']:.1f}x fewer, "
+          f"prompt tokens: {single['prompt_tokens'] / batched['prompt_tokens']:.1f}x fewer")
+
+
+if __name__ == "__main__":
+    main()
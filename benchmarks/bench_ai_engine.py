@@ -0,0 +1,81 @@
+"""
+Measures the AI enhancement engine against a fake provider whose latency grows
+with the prompt length, comparing one request at a time with --ai-concurrency N,
+and longest-first scheduling with submitting endpoints in their original order.
+No network is used.
+
+    python benchmarks/bench_ai_engine.py --endpoints 60 --concurrency 8
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import io
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Apimatic.usedAllAI import engine  # noqa: E402
+
+
+def make_endpoints(n: int, seed: int) -> List[Dict]:
+    rng = random.Random(seed)
+    endpoints = []
+    for i in range(n):
+        # Mostly short handlers with a few long ones, as in real projects
+        lines = rng.choice([5] * 8 + [40, 120])
+        source = "\n".join(f"    value_{j} = compute({j})" for j in range(lines))
+        endpoints.append({"method": "GET", "path": f"/items/{i}", "source": f"def view_{i}():\n{source}"})
+    return endpoints
+
+
+def fake_provider(base: float, per_kb: float):
+    def analyze(source: str) -> Dict:
+        time.sleep(base + per_kb * len(source) / 1024)
+        return {"logic_explanation": f"{len(source)} chars", "query_params": [],
+                "request_body": {"description": "None.", "schema": {}}}
+    return analyze
+
+
+def run(endpoints: List[Dict], analyze, concurrency: int) -> float:
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine.enhance_endpoints(endpoints, analyze, "Fake", concurrency)
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--endpoints", type=int, default=60)
+    p.add_argument("--concurrency", type=int, default=8)
+    p.add_argument("--base-ms", type=float, default=20.0, help="Fixed latency of every request.")
+    p.add_argument("--per-kb-ms", type=float, default=60.0, help="Extra latency per KiB of source.")
+    p.add_argument("--seed", type=int, default=1)
+    args = p.parse_args()
+
+    analyze = fake_provider(args.base_ms / 1000, args.per_kb_ms / 1000)
+    serial = run(make_endpoints(args.endpoints, args.seed), analyze, 1)
+    ordered = make_endpoints(args.endpoints, args.seed)
+    parallel = run(ordered, analyze, args.concurrency)
+
+    # Same pool, but requests submitted in endpoint order
+    schedule = engine.longest_first
+    engine.longest_first = list
+    try:
+        fifo = run(make_endpoints(args.endpoints, args.seed), analyze, args.concurrency)
+    finally:
+        engine.longest_first = schedule
+
+    assert [ep["path"] for ep in ordered] == [f"/items/{i}" for i in range(args.endpoints)]
+    assert all(ep["ai_details"]["logic_explanation"] == f"{len(ep['source'])} chars" for ep in ordered)
+    print(f"endpoints={args.endpoints} concurrency={args.concurrency}")
+    print(f"serial:                    {serial:6.2f}s")
+    print(f"concurrent, original order:{fifo:6.2f}s  ({serial / fifo:.1f}x)")
+    print(f"concurrent, longest first: {parallel:6.2f}s  ({serial / parallel:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Measures the AI enhancement stage of each provider against the bundled mock
+server (Apimatic.usedAllAI.mock_server), under clean, failing and throttled
+conditions, and reports endpoints/s, p50/p95 request latency and retries.
+The transports are the ones the OpenAI, Groq and Ollama enhancers build,
+pointed at the mock. No network is used.
+
+    python benchmarks/bench_ai_pipeline.py --endpoints 200 --concurrency 8 --latency-ms 40
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import io
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Apimatic.usedAllAI.common import SYSTEM_PROMPT  # noqa: E402
+from Apimatic.usedAllAI.engine import estimate_tokens  # noqa: E402
+from Apimatic.usedAllAI.mock_server import DETAILS, MockConfig, MockServer  # noqa: E402
+from Apimatic.usedAllAI.providers import enhance  # noqa: E402
+from Apimatic.usedAllAI.scheduler import Limits, scheduler_for  # noqa: E402
+from Apimatic.usedAllAI.transport import OllamaTransport, OpenAICompatibleTransport, Transport, percentile  # noqa: E402
+
+PROVIDERS: Dict[str, Callable[[str, str], Transport]] = {
+    "openai": lambda url, model: OpenAICompatibleTransport(model, url + "/v1", "mock-key", name="openai", label="OpenAI"),
+    "groq": lambda url, model: OpenAICompatibleTransport(model, url + "/v1", "mock-key", name="groq", label="Groq"),
+    "ollama": lambda url, model: OllamaTransport(model, url, keep_alive=None),
+}
+
+
+class TimedTransport(Transport):
+    """Records the latency of every request the wrapped transport sends, failed ones included."""
+
+    def __init__(self, inner: Transport) -> None:
+        super().__init__(inner.model)
+        self.inner = inner
+        self.name, self.label, self.temperature = inner.name, inner.label, inner.temperature
+        self.latencies: List[float] = []
+        self._lock = threading.Lock()
+
+    def complete(self, system: str, user: str) -> str:
+        t0 = time.perf_counter()
+        try:
+            return self.inner.complete(system, user)
+        finally:
+            with self._lock:
+                self.latencies.append(time.perf_counter() - t0)
+
+    def last_usage(self):
+        return self.inner.last_usage()
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+def make_endpoints(n: int) -> List[Dict]:
+    return [{"method": "GET", "path": f"/items/{i}",
+             "source": f"def view_{i}(item_id):\n    item = db.get({i}, item_id)\n    return jsonify(item)"}
+            for i in range(n)]
+
+
+def scenarios(args: argparse.Namespace) -> Dict[str, MockConfig]:
+    base = MockConfig(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+                      token_rate=args.token_rate, retry_after=0.2)
+    return {
+        "clean": base,
+        "errors": base._replace(error_rate=args.error_rate),
+        "throttled": base._replace(throttle_rate=args.throttle_rate, burst_every=args.burst_every,
+                                   burst_length=args.burst_length),
+    }
+
+
+def run(provider: str, scenario: str, config: MockConfig, args: argparse.Namespace) -> Dict:
+    endpoints = make_endpoints(args.endpoints)
+    # Schedulers are shared per provider and model within a process, so every run gets its own model
+    model = f"mock-{scenario}"
+    limits = Limits(max_retries=args.max_retries)
+    with MockServer(config) as mock:
+        transport = TimedTransport(PROVIDERS[provider](mock.url, model))
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            enhance(endpoints, transport, concurrency=args.concurrency, limits=limits)
+        wall = time.perf_counter() - t0
+    failed = sum(1 for ep in endpoints if ep["ai_details"] != DETAILS)
+    scheduler = scheduler_for(transport.name, model, args.concurrency, limits, estimate_tokens(SYSTEM_PROMPT))
+    return {
+        "provider": provider, "scenario": scenario, "endpoints": len(endpoints), "wall_s": round(wall, 3),
+        "endpoints_per_s": round(len(endpoints) / wall, 1),
+        "p50_ms": round(percentile(transport.latencies, 0.5) * 1000, 1),
+        "p95_ms": round(percentile(transport.latencies, 0.95) * 1000, 1),
+        "requests": mock.stats.requests, "retries": scheduler.retries,
+        "failed": failed,
+    }
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--providers", nargs="*", default=list(PROVIDERS), choices=list(PROVIDERS))
+    p.add_argument("--endpoints", type=int, default=200)
+    p.add_argument("--concurrency", type=int, default=8)
+    p.add_argument("--max-retries", type=int, default=5)
+    p.add_argument("--latency-ms", type=float, default=40.0, help="Mock delay before the first token.")
+    p.add_argument("--jitter-ms", type=float, default=20.0, help="Extra mock delay, uniform in [0, N].")
+    p.add_argument("--token-rate", type=float, default=2000.0, help="Mock completion tokens per second.")
+    p.add_argument("--error-rate", type=float, default=0.05, help="Share of HTTP 500s in the 'errors' scenario.")
+    p.add_argument("--throttle-rate", type=float, default=0.05, help="Share of random 429s in the 'throttled' scenario.")
+    p.add_argument("--burst-every", type=float, default=1.0, help="Seconds between 429 bursts in the 'throttled' scenario.")
+    p.add_argument("--burst-length", type=float, default=0.1, help="Length of each 429 burst in seconds.")
+    p.add_argument("--json", default=None, metavar="FILE", help="Also write the results to FILE as JSON.")
+    args = p.parse_args()
+
+    results = []
+    print(f"{'provider':<8} {'scenario':<10} {'wall':>7} {'endp/s':>7} {'p50':>8} {'p95':>8} {'requests':>8} {'retries':>7} {'failed':>6}")
+    for provider in args.providers:
+        for scenario, config in scenarios(args).items():
+            r = run(provider, scenario, config, args)
+            results.append(r)
+            print(f"{provider:<8} {scenario:<10} {r['wall_s']:>6.2f}s {r['endpoints_per_s']:>7.1f} "
+                  f"{r['p50_ms']:>6.1f}ms {r['p95_ms']:>6.1f}ms {r['requests']:>8} {r['retries']:>7} {r['failed']:>6}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
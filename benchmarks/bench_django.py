@@ -0,0 +1,128 @@
+"""
+Compares the original Django extraction, which re-read and re-parsed the
+sibling views.py once per path() match, with the ROOT_URLCONF resolver, which
+parses every reachable module once, on a synthetic project.
+
+    python benchmarks/bench_django.py --apps 20 --routes 100
+"""
+from __future__ import annotations
+import argparse
+import ast
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Apimatic.parsers.django import PATH_RE, parse_django_routes  # noqa: E402
+from Apimatic.parsers.urlconf import resolve_urlconf_views  # noqa: E402
+from Apimatic.utils import iter_files  # noqa: E402
+
+VIEW = '''
+def view_{i}(request):
+    """Returns item {i}."""
+    return {{"id": {i}}}
+'''
+
+
+def build_project(root: Path, apps: int, routes: int) -> None:
+    (root / "proj").mkdir()
+    (root / "proj" / "__init__.py").write_text("", encoding="utf-8")
+    (root / "proj" / "settings.py").write_text('ROOT_URLCONF = "proj.urls"\n', encoding="utf-8")
+    includes = "".join(f'    path("app{a}/", include("app{a}.urls")),\n' for a in range(apps))
+    (root / "proj" / "urls.py").write_text(
+        f"from django.urls import include, path\n\nurlpatterns = [\n{includes}]\n", encoding="utf-8"
+    )
+    for a in range(apps):
+        app = root / f"app{a}"
+        app.mkdir()
+        (app / "__init__.py").write_text("", encoding="utf-8")
+        (app / "views.py").write_text("".join(VIEW.format(i=i) for i in range(routes)), encoding="utf-8")
+        paths = "".join(f'    path("items/{i}/", views.view_{i}),\n' for i in range(routes))
+        (app / "urls.py").write_text(
+            f"from django.urls import path\nfrom . import views\n\nurlpatterns = [\n{paths}]\n", encoding="utf-8"
+        )
+
+
+def get_source_from_views_file(views_file: Path, view_name: str) -> Optional[str]:
+    """Finds and returns the source code for a specific view function or class."""
+    if not views_file.exists():
+        return None
+    try:
+        text = views_file.read_text(encoding="utf-8", errors="ignore")
+        tree = ast.parse(text)
+        for node in ast.walk(tree):
+            # Check for both function and class definitions that match the view name
+            if isinstance(node, (ast.FunctionDef, ast.ClassDef)) and node.name == view_name:
+                return ast.get_source_segment(text, node)
+    except Exception:
+        # Silently fail on parsing errors for robust scanning
+        return None
+    return None
+
+
+def get_methods_from_class_source(source: str) -> List[str]:
+    """Inspects a class's source code to find HTTP methods (get, post, etc.)."""
+    methods = []
+    try:
+        tree = ast.parse(source)
+        # The ast.parse will wrap the code in a Module, so we check the first item in the body
+        class_node = tree.body[0]
+        if isinstance(class_node, ast.ClassDef):
+            for node in class_node.body:
+                if isinstance(node, ast.FunctionDef) and node.name.lower() in ["get", "post", "put", "patch", "delete"]:
+                    methods.append(node.name.upper())
+    except Exception:
+        pass
+    return methods if methods else ["ANY"]
+
+
+def per_route_views(root: Path) -> int:
+    """The original algorithm: a regex over every file, and views.py parsed again per match."""
+    found = 0
+    for path in iter_files(root, (".py",)):
+        text = path.read_text(encoding="utf-8", errors="ignore")
+        for match in PATH_RE.finditer(text):
+            source = get_source_from_views_file(path.parent / "views.py", match.group(2).split(".")[-1])
+            if source:
+                found += len(get_methods_from_class_source(source))
+    return found
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--apps", type=int, default=20, help="Number of Django apps to generate.")
+    p.add_argument("--routes", type=int, default=100, help="Routes (and views) per app.")
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        build_project(root, args.apps, args.routes)
+
+        t0 = time.perf_counter()
+        legacy = per_route_views(root)
+        legacy_time = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        views = resolve_urlconf_views(root)
+        resolve_time = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        resolved = parse_django_routes(root)
+        resolved_time = time.perf_counter() - t0
+
+        expected = args.apps * args.routes
+        assert legacy == expected, f"per-route scan found {legacy} of {expected} endpoints"
+        assert views is not None and len(views) == expected, "resolver missed views"
+        assert len(resolved) == expected, f"resolver found {len(resolved)} of {expected} endpoints"
+        assert resolved[0]["path"] == "/app0/items/0", resolved[0]["path"]
+        print(f"apps={args.apps} routes/app={args.routes} endpoints={expected}")
+        print(f"views.py parsed per route: {legacy_time:.3f}s")
+        print(f"ROOT_URLCONF resolver:     {resolved_time:.3f}s  ({legacy_time / resolved_time:.1f}x)")
+        print(f"  of which URL resolution: {resolve_time:.3f}s  ({legacy_time / resolve_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Measures the memory held by extracted endpoints: the compact Endpoint records
+returned by the parsers, which keep handler spans, against the plain dicts they
+replace, which held the text of every handler.
+
+    python benchmarks/bench_endpoints.py --files 100 --routes 50
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Apimatic.generator import generate_markdown  # noqa: E402
+from Apimatic.parsers import parse_flask_routes  # noqa: E402
+
+ROUTE = '''
+@app.route("/f{f}/items/{i}", methods=["GET", "POST", "PUT"])
+def item_{f}_{i}():
+    """Returns, creates or replaces item {i} of collection {f}."""
+    payload = request.get_json(silent=True) or {{}}
+    if request.method == "POST":
+        return {{"created": {i}, "payload": payload}}, 201
+    if request.method == "PUT":
+        return {{"replaced": {i}, "payload": payload}}
+    return {{"id": {i}, "collection": {f}}}
+'''
+
+
+def as_dicts(endpoints):
+    """The endpoint dicts parsers used to build: one text per view, shared by its methods."""
+    out = []
+    texts = {}
+    for ep in endpoints:
+        if id(ep.spans) not in texts:
+            texts[id(ep.spans)] = ep["handlers"]
+        handlers = texts[id(ep.spans)]
+        out.append({
+            "framework": ep["framework"], "file": ep["file"], "method": ep["method"], "path": ep["path"],
+            "handlers": handlers, "source": "\n\n".join(handlers), "summary": ep["summary"],
+            "ai_details": ep.get("ai_details"), "static_details": ep.get("static_details", False),
+        })
+    return out
+
+
+def measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - t0
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--files", type=int, default=100, help="Number of Flask files to generate.")
+    p.add_argument("--routes", type=int, default=50, help="Routes per file (three methods each).")
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        for f in range(args.files):
+            body = "".join(ROUTE.format(f=f, i=i) for i in range(args.routes))
+            (root / f"routes{f}.py").write_text("from flask import Flask, request\napp = Flask(__name__)\n" + body)
+
+        endpoints, compact, scan_time = measure(lambda: parse_flask_routes(root))
+        dicts, plain, _ = measure(lambda: as_dicts(endpoints))
+
+        t0 = time.perf_counter()
+        markdown = generate_markdown(list(endpoints))
+        md_time = time.perf_counter() - t0
+        assert markdown == generate_markdown(dicts), "Endpoint records render differently from dicts"
+
+        print(f"endpoints={len(endpoints)} scan={scan_time:.2f}s markdown={md_time:.2f}s")
+        print(f"Endpoint records: {compact / 2**20:7.1f} MiB")
+        print(f"plain dicts:      {plain / 2**20:7.1f} MiB  ({plain / compact:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
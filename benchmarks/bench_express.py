@@ -0,0 +1,73 @@
+"""
+Worst-case inputs for the Express scanner, at doubling sizes:
+
+- a minified bundle holding every route on a single line, with braces and
+  parentheses hidden inside strings, template literals, regex literals and
+  comments;
+- a router file whose routes all point at named controller functions.
+
+The time per route should stay flat if extraction is linear in the file size
+and named-handler lookup is O(1).
+
+    python benchmarks/bench_express.py --routes 2000 --steps 4
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Apimatic.parsers.express import find_full_handler_sources, find_routes  # noqa: E402
+from Apimatic.parsers.jsscan import JsSource  # noqa: E402
+
+ROUTE = (
+    "app.get('/r{i}',(req,res)=>{{const s=\"}}){{(\";const t=`x${{req.query.a||'}}'}}`;"
+    "if(/[}})]+/.test(s)){{res.json({{ok:1}})}}/* }}) */res.send(t)}});"
+)
+
+NAMED_ROUTE = "router.get('/n{i}', ctrl{i});\nfunction ctrl{i}(req, res) {{ res.json({{ id: {i} }}); }}\n"
+
+
+def build_bundle(routes: int) -> str:
+    return "".join(ROUTE.format(i=i) for i in range(routes))
+
+
+def build_named(routes: int) -> str:
+    return "".join(NAMED_ROUTE.format(i=i) for i in range(routes))
+
+
+def extract(text: str) -> List[List[str]]:
+    js = JsSource(text)
+    return [find_full_handler_sources(js, first, close) for _, _, first, close in find_routes(js)]
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--routes", type=int, default=2000, help="Routes in the smallest bundle.")
+    p.add_argument("--steps", type=int, default=4, help="How many times to double the bundle.")
+    args = p.parse_args()
+
+    for label, build, suffix in (
+        ("minified inline", build_bundle, "res.send(t)}"),
+        ("named handlers", build_named, "}); }"),
+    ):
+        print(label)
+        routes = args.routes
+        for _ in range(args.steps):
+            text = build(routes)
+            t0 = time.perf_counter()
+            found = extract(text)
+            elapsed = time.perf_counter() - t0
+
+            assert len(found) == routes, f"expected {routes} routes, found {len(found)}"
+            assert all(len(h) == 1 and h[0].endswith(suffix) for h in found), "handler span mismatch"
+            print(f"  routes={routes:>6} bytes={len(text):>9} time={elapsed:.3f}s  "
+                  f"per-route={1e6 * elapsed / routes:.1f}us")
+            routes *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Measures how AI enhancement throughput scales with --ollama-hosts, using
+instances of the bundled mock server that each process `--slots` requests at
+a time with a fixed latency, and checks failover by crashing one host in the
+middle of a run. No network is used.
+
+    python benchmarks/bench_ollama_hosts.py --hosts 4 --endpoints 120
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Apimatic.usedAllAI import ollama  # noqa: E402
+from Apimatic.usedAllAI.mock_server import DETAILS, MockConfig, MockServer  # noqa: E402
+
+
+def make_endpoints(n: int) -> List[Dict]:
+    return [{"method": "GET", "path": f"/items/{i}", "source": f"def view_{i}():\n    return load({i})"} for i in range(n)]
+
+
+def run(hosts: List[str], endpoints: List[Dict], slots: int, model: str) -> float:
+    # Each run gets its own model name: schedulers are shared per provider and model within a process
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        ollama.enhance_with_ollama(endpoints, model=model, hosts=hosts, parallel=slots, keep_alive=None)
+    elapsed = time.perf_counter() - t0
+    failed = [ep["path"] for ep in endpoints if ep.get("ai_details") != DETAILS]
+    assert not failed, f"{len(failed)} endpoints not analyzed, e.g. {failed[:3]}"
+    return elapsed
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--hosts", type=int, default=4, help="Largest number of mock hosts to use.")
+    p.add_argument("--endpoints", type=int, default=120)
+    p.add_argument("--slots", type=int, default=2, help="Parallel requests each mock host serves.")
+    p.add_argument("--latency-ms", type=float, default=50.0, help="Time each mock request takes.")
+    args = p.parse_args()
+
+    config = MockConfig(latency=args.latency_ms / 1000, slots=args.slots)
+    print(f"endpoints={args.endpoints} slots/host={args.slots} latency={args.latency_ms:.0f}ms")
+    base = None
+    for n in range(1, args.hosts + 1):
+        mocks = [MockServer(config).start() for _ in range(n)]
+        try:
+            elapsed = run([m.url for m in mocks], make_endpoints(args.endpoints), args.slots, f"mock-{n}")
+        finally:
+            for m in mocks:
+                m.stop()
+        base = base or elapsed
+        print(f"hosts={n}: {elapsed:6.2f}s  {args.endpoints / elapsed:7.1f} endpoints/s  ({base / elapsed:.1f}x)")
+
+    crash_after = args.endpoints // (2 * args.hosts)
+    mocks = [MockServer(config._replace(crash_after=crash_after) if i == 0 else config).start() for i in range(args.hosts)]
+    try:
+        elapsed = run([m.url for m in mocks], make_endpoints(args.endpoints), args.slots, "mock-failover")
+    finally:
+        for m in mocks:
+            m.stop()
+    print(f"hosts={args.hosts}, first host fails after {crash_after} requests: {elapsed:6.2f}s, "
+          f"served per host {[m.stats.ok for m in mocks]}, all endpoints analyzed")
+
+
+if __name__ == "__main__":
+    main()
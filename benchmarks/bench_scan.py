@@ -0,0 +1,132 @@
+"""
+Compares running the Flask, FastAPI and Django parsers one after another with
+the fused single-pass Python scanner on a synthetic project, serially and on a
+process pool. A single huge Flask module whose views all read the request
+times the static query-param and body extraction on its own.
+
+    python benchmarks/bench_scan.py --files 2000 --jobs 8 --huge-routes 3000
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Apimatic.parsers import PARSERS, scan_python_routes  # noqa: E402
+from Apimatic.scanner import ScanContext, default_jobs  # noqa: E402
+
+FRAMEWORKS = ["flask", "fastapi", "django"]
+
+FLASK_FILE = '''from flask import Flask
+app = Flask(__name__)
+
+@app.route("/items/{i}", methods=["GET", "POST"])
+def items_{i}():
+    return {{"id": {i}}}
+'''
+
+FASTAPI_FILE = '''from fastapi import APIRouter
+router = APIRouter()
+
+@router.get("/things/{i}")
+def thing_{i}(limit: int = 10):
+    return {{"id": {i}, "limit": limit}}
+'''
+
+HUGE_HEADER = "from flask import Flask, jsonify, request\napp = Flask(__name__)\n"
+
+HUGE_VIEW = '''
+@app.route("/huge/{i}", methods=["GET", "POST"])
+def huge_{i}():
+    limit = request.args.get("limit", 20, type=int)
+    tags = request.args.getlist("tag")
+    if request.method == "POST":
+        payload = request.get_json(silent=True) or {{}}
+        name = payload["name"]
+        return jsonify(id={i}, name=name, price=payload.get("price", 0.0)), 201
+    rows = [{{"id": n, "tags": tags}} for n in range(limit)]
+    return jsonify(rows)
+'''
+
+MODEL_FILE = '''class Model{i}:
+    """Plain data model."""
+
+    def save(self):
+        return {i}
+'''
+
+
+def build_project(root: Path, files: int) -> None:
+    for i in range(files):
+        pkg = root / f"pkg{i // 50}"
+        pkg.mkdir(exist_ok=True)
+        template = (FLASK_FILE, FASTAPI_FILE, MODEL_FILE)[i % 3]
+        (pkg / f"mod{i}.py").write_text(template.format(i=i), encoding="utf-8")
+        if i % 50 == 0:
+            (pkg / "views.py").write_text(f"def view_{i}(request):\n    return None\n", encoding="utf-8")
+            (pkg / "urls.py").write_text(f"urlpatterns = [path('v{i}/', views.view_{i})]\n", encoding="utf-8")
+
+
+def build_huge(root: Path, routes: int) -> None:
+    text = HUGE_HEADER + "".join(HUGE_VIEW.format(i=i) for i in range(routes))
+    (root / "app.py").write_text(text, encoding="utf-8")
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--files", type=int, default=2000, help="Number of Python files to generate.")
+    p.add_argument("--jobs", type=int, default=default_jobs(), help="Worker processes for the parallel run.")
+    p.add_argument("--huge-routes", type=int, default=3000,
+                   help="Request-reading views of the single huge module (0 to skip it).")
+    p.add_argument("--repeat", type=int, default=3, help="Best-of-N timing repetitions.")
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        build_project(root, args.files)
+
+        separate_best = fused_best = parallel_best = float("inf")
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            separate = {fw: PARSERS[fw](root) for fw in FRAMEWORKS}
+            separate_best = min(separate_best, time.perf_counter() - t0)
+
+            t0 = time.perf_counter()
+            serial_ctx = ScanContext()
+            fused = scan_python_routes(root, FRAMEWORKS, serial_ctx)
+            fused_best = min(fused_best, time.perf_counter() - t0)
+
+            t0 = time.perf_counter()
+            parallel = scan_python_routes(root, FRAMEWORKS, ScanContext(jobs=args.jobs))
+            parallel_best = min(parallel_best, time.perf_counter() - t0)
+
+        assert fused == separate, "fused scanner output differs from the separate parsers"
+        assert parallel == fused, "parallel scan output differs from the serial scan"
+        found = sum(len(v) for v in fused.values())
+        print(f"files={args.files} endpoints={found}")
+        print(f"prefilter: {serial_ctx.stats.skipped} of {serial_ctx.stats.files} files never parsed")
+        print(f"separate parsers: {separate_best:.3f}s")
+        print(f"fused scanner:    {fused_best:.3f}s  ({separate_best / fused_best:.2f}x)")
+        print(f"fused, {args.jobs} jobs:  {parallel_best:.3f}s  ({separate_best / parallel_best:.2f}x)")
+
+    if args.huge_routes:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            build_huge(root, args.huge_routes)
+            huge_best = float("inf")
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                huge = scan_python_routes(root, ["flask"], ScanContext())["flask"]
+                huge_best = min(huge_best, time.perf_counter() - t0)
+            assert len(huge) == 2 * args.huge_routes, f"huge module: found {len(huge)} endpoints"
+            assert all(ep["ai_details"]["query_params"] and ep["ai_details"]["request_body"]["schema"] for ep in huge), \
+                "huge module: request reads not extracted"
+            print(f"huge module, {args.huge_routes} request-reading views: {huge_best:.3f}s "
+                  f"({huge_best / len(huge) * 1e6:.0f}us per endpoint)")
+
+
+if __name__ == "__main__":
+    main()
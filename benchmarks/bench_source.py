@@ -0,0 +1,69 @@
+"""
+Slices every handler out of one Flask file with many routes, once with
+`ast.get_source_segment` (which re-splits the file per call) and once with the
+shared line-offset SourceIndex, then times the Express scanner on a file with
+the same number of routes. `ast.get_source_segment` is quadratic here, so it
+is timed on an evenly spaced sample of handlers and extrapolated.
+
+    python benchmarks/bench_source.py --routes 2000
+"""
+from __future__ import annotations
+import argparse
+import ast
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Apimatic.parsers.express import find_full_handler_sources, find_routes  # noqa: E402
+from Apimatic.parsers.jsscan import JsSource  # noqa: E402
+from Apimatic.scanner import SourceIndex  # noqa: E402
+
+FLASK_ROUTE = '''
+@app.route("/items/{i}", methods=["GET"])
+def item_{i}():
+    """Item {i} — naïve unicode keeps the byte/char column mapping honest."""
+    return {{"id": {i}}}
+'''
+
+EXPRESS_ROUTE = "app.get('/items/{i}', (req, res) => {{\n  res.json({{ id: {i} }});\n}});\n"
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--routes", type=int, default=2000, help="Routes in the generated file.")
+    p.add_argument("--sample", type=int, default=50, help="Handlers sliced with ast.get_source_segment.")
+    args = p.parse_args()
+
+    text = "from flask import Flask\napp = Flask(__name__)\n" + "".join(
+        FLASK_ROUTE.format(i=i) for i in range(args.routes)
+    )
+    funcs = [n for n in ast.walk(ast.parse(text)) if isinstance(n, ast.FunctionDef)]
+
+    step = max(1, len(funcs) // args.sample)
+    t0 = time.perf_counter()
+    slow = [ast.get_source_segment(text, n) for n in funcs[::step]]
+    slow_time = (time.perf_counter() - t0) * step
+
+    t0 = time.perf_counter()
+    index = SourceIndex(text)
+    fast = [index.segment(n) for n in funcs]
+    fast_time = time.perf_counter() - t0
+
+    assert fast[::step] == slow, "SourceIndex spans differ from ast.get_source_segment"
+    print(f"python: routes={args.routes} bytes={len(text.encode('utf-8'))}")
+    print(f"  ast.get_source_segment: {slow_time:.3f}s  (extrapolated from {len(slow)} calls)")
+    print(f"  SourceIndex.segment:    {fast_time:.4f}s  ({slow_time / fast_time:.0f}x)")
+
+    js_text = "".join(EXPRESS_ROUTE.format(i=i) for i in range(args.routes))
+    t0 = time.perf_counter()
+    js = JsSource(js_text)
+    handlers = [find_full_handler_sources(js, first, close) for _, _, first, close in find_routes(js)]
+    js_time = time.perf_counter() - t0
+    assert len(handlers) == args.routes
+    print(f"express: routes={args.routes} bytes={len(js_text)}  {js_time:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
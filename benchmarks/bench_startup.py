@@ -0,0 +1,84 @@
+"""
+Guards the CLI's cold-start cost. Runs `python -X importtime -c "import Apimatic.cli"`
+in fresh interpreters, reports the cumulative import time and the slowest
+modules, and fails if the budget is exceeded or if a parser, an AI provider
+or a provider SDK gets imported before it is selected.
+
+    python benchmarks/bench_startup.py --budget-ms 150
+"""
+from __future__ import annotations
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that must only be imported on demand
+LAZY_MODULES = (
+    "openai", "groq", "google.generativeai",
+    "Apimatic.usedAllAI.ollama", "Apimatic.usedAllAI.openAI",
+    "Apimatic.usedAllAI.googleGemini", "Apimatic.usedAllAI.groq",
+    "Apimatic.usedAllAI.providers", "Apimatic.usedAllAI.transport",
+    "Apimatic.usedAllAI.engine", "Apimatic.usedAllAI.response_cache",
+    "Apimatic.parsers.flask", "Apimatic.parsers.fastapi",
+    "Apimatic.parsers.django", "Apimatic.parsers.express",
+    "concurrent.futures.process",
+)
+
+
+def import_times(module: str) -> Dict[str, Tuple[int, int]]:
+    """module -> (self us, cumulative us) from one fresh `-X importtime` run."""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, cwd=ROOT,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{result.stderr}")
+    times: Dict[str, Tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative))
+    return times
+
+
+def wall_time(args: List[str]) -> float:
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, *args], capture_output=True, env=env, cwd=ROOT)
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--runs", type=int, default=5, help="Fresh interpreters to start; the best run counts.")
+    p.add_argument("--budget-ms", type=float, default=150.0, help="Maximum cumulative import time of Apimatic.cli.")
+    args = p.parse_args()
+
+    runs = [import_times("Apimatic.cli") for _ in range(args.runs)]
+    best = min(runs, key=lambda t: t["Apimatic.cli"][1])
+    total_ms = best["Apimatic.cli"][1] / 1000
+
+    print(f"import Apimatic.cli: {total_ms:.1f}ms (best of {args.runs}, budget {args.budget_ms:.0f}ms)")
+    print("slowest modules (self time):")
+    for name, (self_us, _) in sorted(best.items(), key=lambda kv: kv[1][0], reverse=True)[:10]:
+        print(f"  {self_us / 1000:6.1f}ms  {name}")
+    help_time = min(wall_time(["-m", "Apimatic.cli", "--help"]) for _ in range(args.runs))
+    print(f"python -m Apimatic.cli --help: {help_time * 1000:.0f}ms wall")
+
+    eager = sorted(m for m in LAZY_MODULES if any(m in run for run in runs))
+    if eager:
+        raise SystemExit(f"FAIL: imported at start-up: {', '.join(eager)}")
+    if total_ms > args.budget_ms:
+        raise SystemExit(f"FAIL: start-up import time {total_ms:.1f}ms exceeds {args.budget_ms:.0f}ms")
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Scan benchmark suite: runs `parse_*_routes`, `autodetect_frameworks` and
+`generate_markdown` on synthetic projects (benchmarks/synthetic.py) of
+doubling size for every framework, plus the pathological cases, and reports
+time, throughput, peak traced memory and the time per endpoint, which stays
+flat while the scan scales linearly.
+
+    python benchmarks/bench_suite.py --sizes 25 50 100 200 --output results.json
+    python benchmarks/bench_suite.py --compare results.json --threshold 0.25
+
+With --compare, results slower than the old file by more than the threshold
+are listed and the exit status is 1. Times are best-of --repeat; memory is
+measured in a separate run under tracemalloc, which slows the code it traces.
+"""
+from __future__ import annotations
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from synthetic import CASE_FRAMEWORKS, CASES, FRAMEWORKS, build  # noqa: E402
+from Apimatic import __version__  # noqa: E402
+from Apimatic.detect import _read_text_if_exists, autodetect_frameworks  # noqa: E402
+from Apimatic.generator import generate_markdown  # noqa: E402
+from Apimatic.parsers import PARSERS  # noqa: E402
+from Apimatic.scanner import PARSER_VERSION  # noqa: E402
+
+# Results slower than this share of the old time count as regressions under --compare
+DEFAULT_THRESHOLD = 0.25
+# Differences below this many seconds are noise, whatever the share
+MIN_REGRESSION_S = 0.005
+
+
+def measure(fn: Callable[[], object], repeat: int) -> Tuple[float, int, object]:
+    """(best wall time, peak traced bytes, result) of `fn`."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak, result
+
+
+def detect(root: Path) -> List[str]:
+    # Dependency files are cached per path; a run on a fresh project reads them
+    _read_text_if_exists.cache_clear()
+    return autodetect_frameworks(root)
+
+
+def bench_project(kind: str, files: int, routes: int, repeat: int) -> List[Dict]:
+    framework = CASE_FRAMEWORKS.get(kind, kind)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        project = build(root, kind, files, routes)
+        base = {"kind": kind, "framework": framework, "files": project.files, "routes": routes,
+                "bytes": project.bytes, "endpoints": project.endpoints}
+
+        parse = PARSERS[framework]
+        parse_s, parse_peak, endpoints = measure(lambda: parse(root), repeat)
+        assert len(endpoints) == project.endpoints, \
+            f"{kind}: parser found {len(endpoints)} endpoints, expected {project.endpoints}"
+
+        detect_s, detect_peak, detected = measure(lambda: detect(root), repeat)
+        assert framework in detected, f"{kind}: autodetection found {detected}, expected {framework}"
+
+        markdown_s, markdown_peak, _ = measure(lambda: generate_markdown(endpoints), repeat)
+
+    results = []
+    for stage, seconds, peak in (("parse", parse_s, parse_peak), ("detect", detect_s, detect_peak),
+                                 ("markdown", markdown_s, markdown_peak)):
+        r = dict(base, stage=stage, seconds=round(seconds, 6), peak_bytes=peak,
+                 endpoints_per_s=None, mb_per_s=None, us_per_endpoint=None)
+        # Detection reads dependency files only, its cost does not grow with the routes
+        if stage != "detect" and seconds:
+            r.update(endpoints_per_s=round(project.endpoints / seconds, 1),
+                     mb_per_s=round(project.bytes / 2**20 / seconds, 2),
+                     us_per_endpoint=round(seconds / project.endpoints * 1e6, 2))
+        results.append(r)
+    return results
+
+
+def _fmt(value, width: int, digits: int) -> str:
+    return f"{value:>{width}.{digits}f}" if value is not None else f"{'-':>{width}}"
+
+
+def result_key(r: Dict) -> str:
+    return f"{r['kind']}/{r['files']}x{r['routes']}/{r['stage']}"
+
+
+def compare(old: Dict, new: Dict, threshold: float) -> List[str]:
+    """Lines describing every result of `new` slower than in `old` beyond the threshold."""
+    before = {result_key(r): r for r in old["results"]}
+    regressions = []
+    for r in new["results"]:
+        prev = before.get(result_key(r))
+        if prev is None or not prev["seconds"]:
+            continue
+        ratio = r["seconds"] / prev["seconds"]
+        if ratio > 1 + threshold and r["seconds"] - prev["seconds"] > MIN_REGRESSION_S:
+            regressions.append(f"{result_key(r)}: {prev['seconds'] * 1000:.1f}ms -> {r['seconds'] * 1000:.1f}ms "
+                               f"({ratio:.2f}x)")
+    return regressions
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--frameworks", nargs="*", default=list(FRAMEWORKS), choices=list(FRAMEWORKS))
+    p.add_argument("--cases", nargs="*", default=list(CASES), choices=list(CASES))
+    p.add_argument("--sizes", nargs="*", type=int, default=[25, 50, 100, 200], help="Route files per project.")
+    p.add_argument("--routes", type=int, default=20, help="Routes per file.")
+    p.add_argument("--case-size", type=int, default=100,
+                   help="Route files the pathological cases are built from (huge and minified fold them into one).")
+    p.add_argument("--repeat", type=int, default=3, help="Best-of-N timing repetitions.")
+    p.add_argument("--output", default=None, metavar="FILE", help="Write the results to FILE as JSON.")
+    p.add_argument("--compare", default=None, metavar="FILE", help="Results file of an earlier run to compare with.")
+    p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                   help="Slowdown, as a share of the old time, reported as a regression.")
+    args = p.parse_args()
+
+    runs = [(fw, files) for fw in args.frameworks for files in args.sizes]
+    runs += [(case, args.case_size) for case in args.cases]
+    results = []
+    print(f"{'kind':<9} {'files':>5} {'endpoints':>9} {'stage':<8} {'time':>9} {'endp/s':>8} "
+          f"{'MB/s':>7} {'us/endp':>8} {'peak MB':>8}")
+    for kind, files in runs:
+        for r in bench_project(kind, files, args.routes, args.repeat):
+            results.append(r)
+            print(f"{r['kind']:<9} {r['files']:>5} {r['endpoints']:>9} {r['stage']:<8} {r['seconds'] * 1000:>7.1f}ms "
+                  f"{_fmt(r['endpoints_per_s'], 8, 0)} {_fmt(r['mb_per_s'], 7, 1)} {_fmt(r['us_per_endpoint'], 8, 1)} "
+                  f"{r['peak_bytes'] / 2**20:>8.2f}")
+
+    report = {
+        "apimatic_version": __version__,
+        "parser_version": PARSER_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "routes_per_file": args.routes,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Wrote {args.output}")
+    if args.compare:
+        old = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(old, report, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) against {args.compare} (threshold {args.threshold:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"No regressions against {args.compare} (threshold {args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
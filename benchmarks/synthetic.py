@@ -0,0 +1,235 @@
+"""
+Builds synthetic projects for the scan benchmarks: `files` route modules with
+`routes` routes each, for Flask, FastAPI, Django (a ROOT_URLCONF project with
+one app per file, urls.py plus views.py) and Express, and pathological cases:
+
+- huge: a single Flask module holding files x routes routes;
+- deep: Flask modules at the bottom of a directory chain `depth` levels deep;
+- minified: an Express bundle with every route on one line, with brackets
+  hidden in strings, template literals, regex literals and comments.
+
+Each project gets the dependency file autodetection looks for, and the
+generator reports how many endpoints the parsers should find in it.
+
+    python benchmarks/synthetic.py /tmp/project --kind django --files 50 --routes 20
+"""
+from __future__ import annotations
+import argparse
+import json
+from pathlib import Path
+from typing import Callable, Dict, NamedTuple, Tuple
+
+FRAMEWORKS = ("flask", "fastapi", "django", "express")
+CASES = ("huge", "deep", "minified")
+# The framework whose parser reads each pathological case
+CASE_FRAMEWORKS = {"huge": "flask", "deep": "flask", "minified": "express"}
+
+
+class Project(NamedTuple):
+    framework: str
+    files: int
+    bytes: int
+    endpoints: int
+
+
+FLASK_HEADER = "from flask import Flask, jsonify, request\n\napp = Flask(__name__)\n"
+FLASK_ROUTE = '''
+
+@app.route("/f{f}/items/{i}", methods={methods})
+def item_{f}_{i}():
+    """Lists, creates or replaces item {i} of collection {f}."""
+    limit = request.args.get("limit", 20, type=int)
+    if request.method == "POST":
+        payload = request.get_json(silent=True) or {{}}
+        return jsonify(created=payload.get("name"), limit=limit), 201
+    rows = [{{"id": n, "collection": {f}}} for n in range(limit)]
+    return jsonify(rows)
+'''
+
+FASTAPI_HEADER = '''from typing import List, Optional
+from fastapi import APIRouter, Query
+from pydantic import BaseModel, Field
+
+router = APIRouter()
+
+
+class Item{f}(BaseModel):
+    name: str = Field(..., description="Display name")
+    price: float
+    tags: List[str] = []
+'''
+FASTAPI_ROUTE = '''
+
+@router.{verb}("/f{f}/items/{i}")
+def item_{f}_{i}({params}):
+    """Reads or stores item {i} of collection {f}."""
+    return {{"id": {i}, "collection": {f}}}
+'''
+
+DJANGO_VIEWS_HEADER = "from django.http import JsonResponse\nfrom django.views import View\n"
+DJANGO_FUNCTION_VIEW = '''
+
+def view_{i}(request):
+    """Returns item {i}."""
+    page = int(request.GET.get("page", 1))
+    return JsonResponse({{"id": {i}, "page": page}})
+'''
+DJANGO_CLASS_VIEW = '''
+
+class Thing{i}View(View):
+    def get(self, request):
+        return JsonResponse({{"id": {i}}})
+
+    def post(self, request):
+        return JsonResponse({{"created": {i}}}, status=201)
+'''
+
+EXPRESS_HEADER = "const express = require('express');\nconst router = express.Router();\n"
+EXPRESS_INLINE = '''
+router.{verb}('/f{f}/items/{i}', async (req, res) => {{
+  const {{ page = 1, limit }} = req.query;
+  const item = await db.items.find({{ id: {i}, collection: {f}, page, limit }});
+  res.json(item);
+}});
+'''
+EXPRESS_NAMED = '''
+function handleItem{f}_{i}(req, res) {{
+  res.status(201).json({{ created: req.body.name, id: {i} }});
+}}
+router.post('/f{f}/items/{i}/copy', handleItem{f}_{i});
+'''
+MINIFIED_ROUTE = (
+    "router.get('/m/{i}',(q,s)=>{{const t=`){{${{q.params.id}}}}(`;/* ){{ */"
+    "if(/[)}}]+/.test(t))s.send(\"}}({{\");else s.json({{i:{i},p:'(('}})}});"
+)
+
+
+def _write(path: Path, text: str) -> int:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = text.encode("utf-8")
+    path.write_bytes(data)
+    return len(data)
+
+
+def flask_module(f: int, routes: int) -> Tuple[str, int]:
+    parts, endpoints = [FLASK_HEADER], 0
+    for i in range(routes):
+        methods = ["GET", "POST"] if i % 2 == 0 else ["GET"]
+        parts.append(FLASK_ROUTE.format(f=f, i=i, methods=json.dumps(methods)))
+        endpoints += len(methods)
+    return "".join(parts), endpoints
+
+
+def build_flask(root: Path, files: int, routes: int, depth: int = 1) -> Project:
+    size = _write(root / "requirements.txt", "flask\n")
+    endpoints = 0
+    for f in range(files):
+        text, n = flask_module(f, routes)
+        nested = Path(*(f"level{d}" for d in range(depth - 1))) if depth > 1 else Path()
+        size += _write(root / f"pkg{f // 50}" / nested / f"routes_{f}.py", text)
+        endpoints += n
+    return Project("flask", files, size, endpoints)
+
+
+def build_fastapi(root: Path, files: int, routes: int) -> Project:
+    size = _write(root / "requirements.txt", "fastapi\npydantic\n")
+    for f in range(files):
+        parts = [FASTAPI_HEADER.format(f=f)]
+        for i in range(routes):
+            if i % 2 == 0:
+                verb, params = "get", 'limit: int = 20, q: Optional[str] = Query(None, description="Search text")'
+            else:
+                verb, params = "post", f"item: Item{f}, dry_run: bool = False"
+            parts.append(FASTAPI_ROUTE.format(f=f, i=i, verb=verb, params=params))
+        size += _write(root / f"pkg{f // 50}" / f"api_{f}.py", "".join(parts))
+    return Project("fastapi", files, size, files * routes)
+
+
+def build_django(root: Path, files: int, routes: int) -> Project:
+    size = _write(root / "requirements.txt", "django\n")
+    size += _write(root / "manage.py", "import os\nos.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')\n")
+    size += _write(root / "project" / "__init__.py", "")
+    size += _write(root / "project" / "settings.py", "ROOT_URLCONF = 'project.urls'\nINSTALLED_APPS = []\n")
+    includes = "".join(f"    path('app{f}/', include('app{f}.urls')),\n" for f in range(files))
+    size += _write(root / "project" / "urls.py", f"from django.urls import include, path\n\nurlpatterns = [\n{includes}]\n")
+    endpoints = 0
+    for f in range(files):
+        app = root / f"app{f}"
+        views, patterns = [DJANGO_VIEWS_HEADER], []
+        for i in range(routes):
+            if i % 4 == 3:
+                views.append(DJANGO_CLASS_VIEW.format(i=i))
+                patterns.append(f"    path('things/{i}/', views.Thing{i}View.as_view()),\n")
+                endpoints += 2  # get and post
+            else:
+                views.append(DJANGO_FUNCTION_VIEW.format(i=i))
+                patterns.append(f"    path('items/{i}/', views.view_{i}),\n")
+                endpoints += 1
+        size += _write(app / "__init__.py", "")
+        size += _write(app / "views.py", "".join(views))
+        size += _write(app / "urls.py", "from django.urls import path\nfrom . import views\n\nurlpatterns = [\n" + "".join(patterns) + "]\n")
+    return Project("django", files, size, endpoints)
+
+
+def build_express(root: Path, files: int, routes: int) -> Project:
+    size = _write(root / "package.json", json.dumps({"dependencies": {"express": "^4.19.0"}}))
+    endpoints = 0
+    for f in range(files):
+        parts = [EXPRESS_HEADER]
+        for i in range(routes):
+            if i % 3 == 2:
+                parts.append(EXPRESS_NAMED.format(f=f, i=i))
+            else:
+                parts.append(EXPRESS_INLINE.format(f=f, i=i, verb=("get", "put")[i % 2]))
+            endpoints += 1
+        parts.append("\nmodule.exports = router;\n")
+        size += _write(root / "routes" / f"group{f // 50}" / f"items_{f}.js", "".join(parts))
+    return Project("express", files, size, endpoints)
+
+
+def build_huge(root: Path, files: int, routes: int) -> Project:
+    size = _write(root / "requirements.txt", "flask\n")
+    text, endpoints = flask_module(0, files * routes)
+    size += _write(root / "app.py", text)
+    return Project("flask", 1, size, endpoints)
+
+
+def build_deep(root: Path, files: int, routes: int, depth: int = 40) -> Project:
+    return build_flask(root, files, routes, depth)
+
+
+def build_minified(root: Path, files: int, routes: int) -> Project:
+    size = _write(root / "package.json", json.dumps({"dependencies": {"express": "^4.19.0"}}))
+    n = files * routes
+    # The router keeps its name: route objects are recognized as `app` or `router`.
+    # Kept out of dist/, which discovery skips like build output
+    bundle = "const express=require('express');const router=express.Router();" + "".join(MINIFIED_ROUTE.format(i=i) for i in range(n))
+    size += _write(root / "public" / "bundle.min.js", bundle + "module.exports=router;\n")
+    return Project("express", 1, size, n)
+
+
+BUILDERS: Dict[str, Callable[[Path, int, int], Project]] = {
+    "flask": build_flask, "fastapi": build_fastapi, "django": build_django, "express": build_express,
+    "huge": build_huge, "deep": build_deep, "minified": build_minified,
+}
+
+
+def build(root: Path, kind: str, files: int, routes: int) -> Project:
+    """Writes a `kind` project (a framework or a pathological case) under `root`."""
+    return BUILDERS[kind](root, files, routes)
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("root", help="Directory to write the project to.")
+    p.add_argument("--kind", choices=list(BUILDERS), default="flask")
+    p.add_argument("--files", type=int, default=50)
+    p.add_argument("--routes", type=int, default=20, help="Routes per file.")
+    args = p.parse_args()
+
+    project = build(Path(args.root), args.kind, args.files, args.routes)
+    print(f"{args.kind}: {project.files} route files, {project.bytes} bytes, {project.endpoints} endpoints expected")
+
+
+if __name__ == "__main__":
+    main()
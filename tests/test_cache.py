@@ -0,0 +1,109 @@
+import os
+
+from Apimatic.cache import ExtractionCache, content_hash
+from Apimatic.endpoint import Endpoint
+
+
+def write(path, text, mtime_ns=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+
+def store(cache, path, deps=()):
+    data = path.read_bytes()
+    ep = Endpoint("flask", path.name, "GET", "/items", [(str(path), 0, len(data))])
+    cache.store(path, content_hash(data), {"flask": [ep]}, deps)
+
+
+def test_hit_after_store_and_save(tmp_path):
+    path = write(tmp_path / "app.py", "def items(): pass\n")
+    cache = ExtractionCache(tmp_path, tmp_path / ".cache", 1)
+    store(cache, path)
+    cache.save()
+
+    found = ExtractionCache(tmp_path, tmp_path / ".cache", 1).lookup(path, ["flask"])
+    assert [ep["path"] for ep in found["flask"]] == ["/items"]
+    assert found["flask"][0]["source"] == "def items(): pass\n"
+
+
+def test_missing_matcher_results_are_a_miss(tmp_path):
+    path = write(tmp_path / "app.py", "def items(): pass\n")
+    cache = ExtractionCache(tmp_path, tmp_path / ".cache", 1)
+    store(cache, path)
+    assert cache.lookup(path, ["flask", "fastapi"]) is None
+
+
+def test_touched_file_is_a_hit_by_content_hash(tmp_path):
+    path = write(tmp_path / "app.py", "def items(): pass\n", mtime_ns=1_000_000_000)
+    cache = ExtractionCache(tmp_path, tmp_path / ".cache", 1)
+    store(cache, path)
+
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    assert cache.lookup(path, ["flask"]) is not None
+    assert cache.hits == 1
+
+
+def test_same_size_edit_is_a_miss(tmp_path):
+    path = write(tmp_path / "app.py", "def items(): pass\n", mtime_ns=1_000_000_000)
+    cache = ExtractionCache(tmp_path, tmp_path / ".cache", 1)
+    store(cache, path)
+
+    write(path, "def items(): PASS\n", mtime_ns=2_000_000_000)
+    assert cache.lookup(path, ["flask"]) is None
+    assert cache.misses == 1
+
+
+def test_edit_keeping_size_and_mtime_is_trusted(tmp_path):
+    # Size and mtime are the fast path; the content is not re-read when both match
+    path = write(tmp_path / "app.py", "def items(): pass\n", mtime_ns=1_000_000_000)
+    cache = ExtractionCache(tmp_path, tmp_path / ".cache", 1)
+    store(cache, path)
+
+    write(path, "def items(): PASS\n", mtime_ns=1_000_000_000)
+    assert cache.lookup(path, ["flask"]) is not None
+
+
+def test_parser_version_change_drops_entries(tmp_path):
+    path = write(tmp_path / "app.py", "def items(): pass\n")
+    cache = ExtractionCache(tmp_path, tmp_path / ".cache", 1)
+    store(cache, path)
+    cache.save()
+
+    assert ExtractionCache(tmp_path, tmp_path / ".cache", 2).lookup(path, ["flask"]) is None
+    assert ExtractionCache(tmp_path, tmp_path / ".cache", 1).lookup(path, ["flask"]) is not None
+
+
+def test_changed_dependency_is_a_miss(tmp_path):
+    urls = write(tmp_path / "app" / "urls.py", "urlpatterns = []\n")
+    views = write(tmp_path / "app" / "views.py", "def index(request): pass\n", mtime_ns=1_000_000_000)
+    cache = ExtractionCache(tmp_path, tmp_path / ".cache", 1)
+    store(cache, urls, [views])
+    assert cache.lookup(urls, ["flask"]) is not None
+
+    write(views, "def index(request): return 1\n", mtime_ns=2_000_000_000)
+    assert cache.lookup(urls, ["flask"]) is None
+
+
+def test_created_dependency_is_a_miss(tmp_path):
+    urls = write(tmp_path / "app" / "urls.py", "urlpatterns = []\n")
+    views = tmp_path / "app" / "views.py"
+    cache = ExtractionCache(tmp_path, tmp_path / ".cache", 1)
+    store(cache, urls, [views])
+    assert cache.lookup(urls, ["flask"]) is not None
+
+    write(views, "def index(request): pass\n")
+    assert cache.lookup(urls, ["flask"]) is None
+
+
+def test_save_drops_entries_of_deleted_files(tmp_path):
+    path = write(tmp_path / "app.py", "def items(): pass\n")
+    cache = ExtractionCache(tmp_path, tmp_path / ".cache", 1)
+    store(cache, path)
+    path.unlink()
+    cache.save()
+
+    write(path, "def items(): pass\n")
+    assert ExtractionCache(tmp_path, tmp_path / ".cache", 1).lookup(path, ["flask"]) is None
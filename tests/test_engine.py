@@ -0,0 +1,47 @@
+import threading
+import time
+
+from Apimatic.usedAllAI.engine import AbortEnhancement, enhance_endpoints
+
+DETAILS = {"logic_explanation": "ok", "query_params": [], "request_body": {"description": "None.", "schema": {}}}
+
+
+def endpoints(n):
+    return [{"method": "GET", "path": f"/e{i}", "source": f"def e{i}():\n    return {i}\n"} for i in range(n)]
+
+
+def test_abort_settles_every_endpoint():
+    started = threading.Event()
+
+    def analyze(source):
+        if not started.is_set():
+            started.set()
+            raise AbortEnhancement(ConnectionError("refused"), "Is the server running?")
+        # Holds the worker while the run is aborted
+        time.sleep(0.1)
+        return DETAILS
+
+    eps = enhance_endpoints(endpoints(6), analyze, "Mock", concurrency=1)
+    # Only the request the worker picked up before the abort goes through
+    notes = [ep["ai_details"]["logic_explanation"] for ep in eps]
+    assert notes.count("_Mock analysis failed: refused_") >= 5
+    assert set(notes) <= {"_Mock analysis failed: refused_", "ok"}
+
+
+def test_abort_settles_the_rest_of_a_batch():
+    # Both batches are in flight before one of them aborts the run
+    started = threading.Barrier(2)
+    aborted = threading.Lock()
+
+    def analyze_batch(sources):
+        started.wait()
+        if aborted.acquire(blocking=False):
+            raise AbortEnhancement(ConnectionError("refused"), "Is the server running?")
+        # Answers after the abort, and only for its first source
+        time.sleep(0.2)
+        return {next(iter(sources)): DETAILS}
+
+    eps = enhance_endpoints(endpoints(4), None, "Mock", concurrency=2, analyze_batch=analyze_batch, batch_size=2)
+    assert sum(ep["ai_details"] == DETAILS for ep in eps) == 1
+    assert all(ep["ai_details"]["logic_explanation"] == "_Mock analysis failed: refused_"
+               for ep in eps if ep["ai_details"] != DETAILS)
@@ -0,0 +1,60 @@
+from Apimatic.parsers.jsscan import JsSource, template_substitutions, tokenize
+
+
+def kinds(text):
+    return [(kind, text[start:end]) for kind, start, end in tokenize(text)]
+
+
+def closer_of(js, opener):
+    """Text from the opening bracket at offset `opener` to its closing bracket."""
+    idx = js.index_at(opener)
+    return js.text[js.tokens[idx][1]:js.tokens[js.closing[idx]][2]]
+
+
+def test_whitespace_and_comments_are_dropped():
+    assert kinds("a // b\n/* c */ d") == [("name", "a"), ("name", "d")]
+
+
+def test_regex_literal_after_operator_or_keyword():
+    assert ("regex", "/ab+c/g") in kinds("const re = /ab+c/g;")
+    assert ("regex", "/[/]}/") in kinds("return /[/]}/.test(s)")
+    assert ("regex", "/x/") in kinds("const f = () => /x/")
+
+
+def test_division_is_not_a_regex():
+    tokens = kinds("const half = total / 2 / count;")
+    assert all(kind != "regex" for kind, _ in tokens)
+    assert [value for kind, value in tokens if value == "/"] == ["/", "/"]
+    assert all(kind != "regex" for kind, _ in kinds("x = (a) / b / (c)"))
+
+
+def test_strings_and_templates_are_single_tokens():
+    assert kinds("'a}' \"b{\"") == [("str", "'a}'"), ("str", '"b{"')]
+    text = "`a ${ {b: `c${d}`} } e`"
+    assert kinds(text) == [("tmpl", text)]
+
+
+def test_brackets_inside_literals_do_not_affect_matching():
+    text = (
+        "function f(req) {\n"
+        "  const re = /[}{]/;  // } in a comment\n"
+        "  const s = '}' + \"{\";\n"
+        "  return `${ {a: '}'} } }`;\n"
+        "}\n"
+        "g();"
+    )
+    js = JsSource(text)
+    body = closer_of(js, text.index("{"))
+    assert body.startswith("{") and body.endswith("`;\n}")
+    assert closer_of(js, text.index("(")) == "(req)"
+
+
+def test_unbalanced_input_is_tolerated():
+    js = JsSource("a(b[c) }")
+    assert closer_of(js, 1) == "(b[c)"
+
+
+def test_template_substitutions():
+    text = "`x ${req.query.a} y ${ {b: 1}.b } z ${`n${q}`}`"
+    assert [text[s:e] for s, e in template_substitutions(text, 0)] == ["req.query.a", " {b: 1}.b ", "`n${q}`"]
+    assert template_substitutions("`plain`", 0) == []
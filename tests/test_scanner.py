@@ -0,0 +1,69 @@
+from Apimatic.cache import ExtractionCache
+from Apimatic.parsers import scan_python_routes
+from Apimatic.scanner import MIN_CHUNK_SIZE, PARSER_VERSION, ScanContext
+
+FRAMEWORKS = ["flask", "fastapi", "django"]
+
+FLASK = (
+    "from flask import Flask, request\n"
+    "app = Flask(__name__)\n"
+    "\n"
+    "@app.route('/f{i}', methods=['GET', 'POST'])\n"
+    "def f{i}():\n"
+    "    return request.args.get('page')\n"
+)
+FASTAPI = (
+    "from fastapi import APIRouter\n"
+    "router = APIRouter()\n"
+    "\n"
+    "@router.get('/a{i}')\n"
+    "def a{i}(limit: int = 10):\n"
+    "    return limit\n"
+)
+MODEL = "class Model{i}:\n    pass\n"
+
+
+def make_project(root, files):
+    for i in range(files):
+        pkg = root / f"pkg{i % 7}"
+        pkg.mkdir(exist_ok=True)
+        (pkg / f"mod{i}.py").write_text((FLASK, FASTAPI, MODEL)[i % 3].format(i=i), encoding="utf-8")
+        if i % 20 == 0:
+            (pkg / "views.py").write_text(f"def view_{i}(request):\n    return None\n", encoding="utf-8")
+            (pkg / "urls.py").write_text(f"urlpatterns = [path('v{i}/', views.view_{i})]\n", encoding="utf-8")
+    return root
+
+
+def records(found):
+    return {fw: [ep.to_record() for ep in endpoints] for fw, endpoints in found.items()}
+
+
+def test_parallel_scan_matches_serial_scan(tmp_path):
+    root = make_project(tmp_path, 4 * MIN_CHUNK_SIZE)
+    serial = scan_python_routes(root, FRAMEWORKS, ScanContext(jobs=1))
+    parallel = scan_python_routes(root, FRAMEWORKS, ScanContext(jobs=4))
+    assert records(parallel) == records(serial)
+    assert len(serial["flask"]) == 2 * len(serial["fastapi"])
+    assert serial["django"]
+
+
+def test_cached_scan_matches_fresh_scan(tmp_path):
+    root = make_project(tmp_path, 2 * MIN_CHUNK_SIZE)
+    fresh = scan_python_routes(root, FRAMEWORKS, ScanContext())
+
+    ctx = ScanContext(cache=ExtractionCache(root, root / ".cache", PARSER_VERSION), jobs=2)
+    scan_python_routes(root, FRAMEWORKS, ctx)
+    ctx.cache.save()
+    ctx = ScanContext(cache=ExtractionCache(root, root / ".cache", PARSER_VERSION))
+    cached = scan_python_routes(root, FRAMEWORKS, ctx)
+    assert ctx.stats.cached == ctx.stats.files
+    assert records(cached) == records(fresh)
+
+
+def test_prefilter_skips_files_without_markers(tmp_path):
+    root = make_project(tmp_path, 30)
+    ctx = ScanContext()
+    scan_python_routes(root, FRAMEWORKS, ctx)
+    # The 10 model files and 2 views.py mention no route decorator or path()
+    assert ctx.stats.skipped == 12
+    assert ctx.stats.parsed + ctx.stats.skipped == ctx.stats.files
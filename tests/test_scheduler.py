@@ -0,0 +1,111 @@
+import time
+from email.utils import formatdate
+
+import pytest
+
+from Apimatic.usedAllAI.scheduler import AdaptiveConcurrency, Limits, Scheduler, retry_after, scheduler_for
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def failing(errors, result="ok"):
+    """A request that raises `errors` one per call, then returns `result`."""
+    pending = list(errors)
+
+    def request():
+        if pending:
+            raise pending.pop(0)
+        return result
+    return request
+
+
+def test_retry_after_seconds_milliseconds_and_date():
+    assert retry_after(HTTPError(429, {"retry-after": "2"})) == 2.0
+    assert retry_after(HTTPError(429, {"retry-after-ms": "250", "retry-after": "9"})) == 0.25
+    assert 25 <= retry_after(HTTPError(429, {"retry-after": formatdate(time.time() + 30, usegmt=True)})) <= 30
+    assert retry_after(HTTPError(429, {"retry-after": "soon"})) is None
+    assert retry_after(HTTPError(429)) is None
+
+
+def test_additive_increase():
+    limiter = AdaptiveConcurrency(8)
+    limiter.limit = 4.0
+    # About +1 per `limit` successes
+    for _ in range(5):
+        limiter.acquire()
+        limiter.release()
+    assert int(limiter.limit) == 5
+
+
+def test_multiplicative_decrease_once_per_cooldown():
+    limiter = AdaptiveConcurrency(8, cooldown=60.0)
+    for _ in range(3):
+        limiter.acquire()
+        limiter.release(throttled=True)
+    assert limiter.limit == 4.0
+    assert limiter.lowest == 4
+
+
+def test_limit_stays_within_bounds():
+    limiter = AdaptiveConcurrency(2, cooldown=0.0)
+    for _ in range(5):
+        limiter.acquire()
+        limiter.release(throttled=True)
+    assert limiter.limit == 1.0
+    for _ in range(20):
+        limiter.acquire()
+        limiter.release()
+    assert limiter.limit == 2.0
+
+
+def test_throttled_request_waits_for_retry_after():
+    scheduler = Scheduler(4)
+    t0 = time.monotonic()
+    assert scheduler.call(failing([HTTPError(429, {"retry-after-ms": "100"})])) == "ok"
+    assert time.monotonic() - t0 >= 0.1
+    assert (scheduler.retries, scheduler.throttled) == (1, 1)
+    assert scheduler.concurrency.limit < 4
+
+
+def test_retry_after_pauses_other_requests():
+    scheduler = Scheduler(4)
+    scheduler._pause(0.1)
+    t0 = time.monotonic()
+    scheduler.call(lambda: None)
+    assert time.monotonic() - t0 >= 0.1
+
+
+def test_transient_error_is_retried_without_throttling(monkeypatch):
+    monkeypatch.setattr("Apimatic.usedAllAI.scheduler.backoff", lambda attempt: 0.0)
+    scheduler = Scheduler(4)
+    assert scheduler.call(failing([HTTPError(503), TimeoutError()])) == "ok"
+    assert (scheduler.retries, scheduler.throttled) == (2, 0)
+    assert scheduler.concurrency.limit == 4
+
+
+def test_client_errors_are_not_retried():
+    scheduler = Scheduler(4)
+    with pytest.raises(HTTPError):
+        scheduler.call(failing([HTTPError(400)]))
+    assert scheduler.retries == 0
+
+
+def test_gives_up_after_max_retries(monkeypatch):
+    monkeypatch.setattr("Apimatic.usedAllAI.scheduler.backoff", lambda attempt: 0.0)
+    scheduler = Scheduler(4, Limits(max_retries=2))
+    with pytest.raises(HTTPError):
+        scheduler.call(failing([HTTPError(500)] * 3))
+    assert scheduler.retries == 2
+
+
+def test_scheduler_is_shared_only_with_the_same_settings():
+    scheduler = scheduler_for("test", "model", 4, Limits(tpm=6000), 100.0)
+    assert scheduler_for("test", "model", 4, Limits(tpm=6000), 100.0) is scheduler
+    assert scheduler_for("test", "model", 8, Limits(tpm=6000), 100.0).concurrency.limit == 8
+    assert scheduler_for("test", "model", 4, Limits(tpm=3000), 100.0).tokens.rate == 50.0
+    assert scheduler_for("test", "model", 4, Limits(tpm=6000), 0.0).overhead_tokens == 0.0
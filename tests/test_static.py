@@ -0,0 +1,107 @@
+import ast
+
+from Apimatic.parsers import parse_flask_routes
+from Apimatic.parsers.static import ModelIndex, express_details, fastapi_details, flask_details
+
+
+def function(source):
+    tree = ast.parse(source)
+    return tree, next(node for node in tree.body if isinstance(node, ast.FunctionDef))
+
+
+def query_names(details):
+    return [param["name"] for param in details["query_params"]]
+
+
+def test_fastapi_query_params_and_model_body():
+    tree, node = function(
+        "class Item(BaseModel):\n"
+        "    name: str\n"
+        "    price: float = 0.0\n"
+        "\n"
+        "def create(item_id: int, item: Item, q: Optional[str] = None,\n"
+        "           limit: int = Query(10, description='Page size'), request: Request = None):\n"
+        "    pass\n"
+    )
+    details = fastapi_details(node, "/items/{item_id}", ModelIndex(tree))
+    assert details["logic_explanation"] == ""
+    # Path parameters and injected objects are not query parameters
+    assert details["query_params"] == [
+        {"name": "q", "description": "Optional.", "type": "string"},
+        {"name": "limit", "description": "Page size. Defaults to `10`.", "type": "integer"},
+    ]
+    assert details["request_body"]["description"] == "JSON object matching the `Item` model."
+    assert details["request_body"]["schema"]["properties"] == {"name": {"type": "string"}, "price": {"type": "number"}}
+    assert details["request_body"]["schema"]["required"] == ["name"]
+
+
+def test_flask_query_args_and_json_fields():
+    source = (
+        "def view():\n"
+        "    limit = request.args.get('limit', 20, type=int)\n"
+        "    tags = request.args.getlist('tag')\n"
+        "    q = request.args['q']\n"
+        "    data = request.get_json()\n"
+        "    name = data['name']\n"
+        "    price = data.get('price', 1.5)\n"
+    )
+    _, node = function(source)
+    details = flask_details(node, source)
+    assert details["query_params"] == [
+        {"name": "limit", "description": "Defaults to `20`.", "type": "integer"},
+        {"name": "tag", "description": "Optional.", "type": "array"},
+        {"name": "q", "description": "Required.", "type": "string"},
+    ]
+    assert details["request_body"] == {
+        "description": "JSON body.",
+        "schema": {"type": "object", "properties": {"name": {}, "price": {"type": "number"}}, "required": ["name"]},
+    }
+
+
+def test_flask_view_without_request_has_no_params():
+    source = "def view():\n    return 'ok'\n"
+    _, node = function(source)
+    assert flask_details(node, source) == {
+        "logic_explanation": "", "query_params": [], "request_body": {"description": "None.", "schema": {}},
+    }
+
+
+def test_flask_methods_get_their_own_details(tmp_path):
+    (tmp_path / "app.py").write_text(
+        "@app.route('/items', methods=['GET', 'POST'])\n"
+        "def items():\n"
+        "    return request.args.get('page')\n",
+        encoding="utf-8",
+    )
+    get, post = parse_flask_routes(tmp_path)
+    assert get["static_details"] and post["static_details"]
+    get["ai_details"]["query_params"].append({"name": "extra"})
+    assert query_names(post["ai_details"]) == ["page"]
+
+
+def test_express_member_index_and_destructured_reads():
+    details = express_details(
+        "(req, res) => {\n"
+        "  const { page, size: pageSize } = req.query;\n"
+        "  const sort = req.query['sort'];\n"
+        "  save(req.body.name, req.body?.price);\n"
+        "}"
+    )
+    assert query_names(details) == ["page", "size", "sort"]
+    assert details["request_body"]["schema"]["properties"] == {"name": {}, "price": {}}
+
+
+def test_express_reads_inside_template_literals():
+    details = express_details(
+        "function (request, res) {\n"
+        "  res.send(`Hi ${request.query.name}, ${request.body?.city ?? `in ${request.query['zone']}`}`);\n"
+        "}"
+    )
+    assert query_names(details) == ["name", "zone"]
+    assert details["request_body"]["schema"]["properties"] == {"city": {}}
+
+
+def test_express_whole_body():
+    details = express_details("(req, res) => res.json(save(req.body))")
+    assert details["query_params"] == []
+    assert details["request_body"]["schema"] == {"type": "object"}
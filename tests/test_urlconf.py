@@ -0,0 +1,130 @@
+from Apimatic.cache import ExtractionCache
+from Apimatic.parsers import parse_django_routes, resolve_django_routes
+from Apimatic.scanner import PARSER_VERSION, ScanContext
+
+FILES = {
+    "manage.py": "",
+    "mysite/__init__.py": "",
+    "mysite/settings.py": "ROOT_URLCONF = 'mysite.urls'\n",
+    "mysite/urls.py": (
+        "from django.urls import include, path, re_path\n"
+        "from blog import views as blog_views\n"
+        "\n"
+        "api_patterns = [path('items/', blog_views.items)]\n"
+        "\n"
+        "urlpatterns = [\n"
+        "    path('', blog_views.home),\n"
+        "    path('blog/', include('blog.urls')),\n"
+        "    path('api/v1/', include(api_patterns)),\n"
+        "    re_path(r'^legacy/(?P<slug>[-\\w]+)/$', blog_views.home),\n"
+        "]\n"
+    ),
+    "blog/__init__.py": "",
+    "blog/urls.py": (
+        "from django.urls import include, path\n"
+        "from . import views\n"
+        "\n"
+        "urlpatterns = [\n"
+        "    path('', views.PostList.as_view()),\n"
+        "    path('<int:pk>/', views.post_detail),\n"
+        "    path('comments/', include('blog.comments.urls')),\n"
+        "]\n"
+    ),
+    "blog/views.py": (
+        "def home(request): pass\n"
+        "def items(request): pass\n"
+        "def post_detail(request, pk): pass\n"
+        "\n"
+        "class PostList:\n"
+        "    def get(self, request): pass\n"
+        "    def post(self, request): pass\n"
+    ),
+    "blog/comments/__init__.py": "",
+    "blog/comments/urls.py": (
+        "from django.urls import path\n"
+        "from .views import recent\n"
+        "\n"
+        "urlpatterns = [path('recent/', recent)]\n"
+    ),
+    "blog/comments/views.py": "def recent(request): pass\n",
+}
+
+
+def make_project(root, files=FILES):
+    for rel, text in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    return root
+
+
+def routes(endpoints):
+    return sorted((ep["method"], ep["path"], ep["file"]) for ep in endpoints)
+
+
+def test_include_prefixes_compose(tmp_path):
+    endpoints = resolve_django_routes(make_project(tmp_path))
+    assert routes(endpoints) == sorted([
+        ("ANY", "/", "blog/views.py"),
+        ("GET", "/blog", "blog/views.py"),
+        ("POST", "/blog", "blog/views.py"),
+        ("ANY", "/blog/<int:pk>", "blog/views.py"),
+        ("ANY", "/blog/comments/recent", "blog/comments/views.py"),
+        ("ANY", "/api/v1/items", "blog/views.py"),
+        ("ANY", "/legacy/(?P<slug>[-\\w]+)", "blog/views.py"),
+    ])
+
+
+def test_views_resolve_to_their_source(tmp_path):
+    endpoints = resolve_django_routes(make_project(tmp_path))
+    detail = next(ep for ep in endpoints if ep["path"] == "/blog/<int:pk>")
+    assert detail["source"] == "def post_detail(request, pk): pass"
+
+
+def test_without_root_urlconf_each_urls_py_is_read_alone(tmp_path):
+    files = {rel: text for rel, text in FILES.items() if rel != "mysite/settings.py"}
+    root = make_project(tmp_path, files)
+    assert resolve_django_routes(root) is None
+    # blog/urls.py on its own, without the /blog prefix
+    assert ("ANY", "/<int:pk>", "blog/views.py") in routes(parse_django_routes(root))
+
+
+def test_include_cycles_terminate(tmp_path):
+    files = dict(FILES)
+    files["blog/comments/urls.py"] = (
+        "from django.urls import include, path\n"
+        "from .views import recent\n"
+        "\n"
+        "urlpatterns = [path('recent/', recent), path('again/', include('mysite.urls'))]\n"
+    )
+    endpoints = resolve_django_routes(make_project(tmp_path, files))
+    assert ("ANY", "/blog/comments/recent", "blog/comments/views.py") in routes(endpoints)
+
+
+def test_warm_run_reuses_the_cached_resolution(tmp_path):
+    root = make_project(tmp_path)
+
+    def run():
+        ctx = ScanContext(cache=ExtractionCache(root, root / ".cache", PARSER_VERSION))
+        endpoints = parse_django_routes(root, ctx)
+        ctx.cache.save()
+        return routes(endpoints), ctx.stats
+
+    cold, stats = run()
+    assert stats.parsed == 1 and stats.files == len(FILES)
+    warm, stats = run()
+    assert warm == cold
+    assert stats.cached == stats.files and stats.parsed == 0
+
+    # A module the URLconf includes but that did not exist yet
+    (root / "mysite" / "urls.py").write_text(
+        FILES["mysite/urls.py"] + "urlpatterns += [path('shop/', include('shop.urls'))]\n", encoding="utf-8")
+    with_shop, _ = run()
+    assert ("ANY", "/shop/cart", "shop/views.py") not in with_shop
+    make_project(root, {
+        "shop/urls.py": "from django.urls import path\nfrom .views import cart\n\nurlpatterns = [path('cart/', cart)]\n",
+        "shop/views.py": "def cart(request): pass\n",
+    })
+    with_shop, stats = run()
+    assert ("ANY", "/shop/cart", "shop/views.py") in with_shop
+    assert stats.parsed == 1